@@ -0,0 +1,177 @@
+# 15puzzle/batch.py
+# 批量求最优解：给关卡目录预先算好最优提示路径，也可以跑 Korf 的 100 个标准测试局面
+# 盘面可以是任意尺寸（--size 3x3 教学关、5x5 专家关），默认 4x4
+#   - 每个进程 mmap 同一个模式数据库文件（物理内存里只有一份），用 FastIDAStar 逐题求解
+#   - 结果按输入顺序产出，每题一个 dict：走法、步数、节点数、耗时、启发式
+#   - 默认不打印任何东西；quiet=False 时每解完一题往 stderr 打一行进度
+#
+# 输入每行一个局面，width*height 个数字（0 为空格，目标是 0..n-1），空白或逗号分隔；
+# 行首多一个编号（Korf 的 korf100.txt 就是这样）也可以，# 开头的行是注释
+# 走法用空格移动的方向表示：U 上、D 下、L 左、R 右
+#
+#   python batch.py korf100.txt -o result.jsonl --workers 4
+#   python batch.py levels.txt --pattern 5-5-5 -o result.csv
+#   python batch.py tutorial.txt --size 3x3
+
+import argparse
+import csv
+import json
+import multiprocessing as mp
+import os
+import sys
+import time
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from ida import FastIDAStar
+from patterndb import DEFAULT_PATTERNS, AdditivePDB, default_path, load_databases, load_or_build, presets_for
+
+MOVE_LETTERS = "UDLR"
+CSV_FIELDS = ["index", "length", "path", "nodes", "time", "heuristic"]
+
+# 工作进程里的搜索引擎，由 _init_worker 创建
+_engine = None
+_heuristic = None
+
+
+def parse_instance(line: str, n: int = 16) -> Tuple[int, ...]:
+    values = [int(x) for x in line.replace(",", " ").split()]
+    if len(values) == n + 1:
+        values = values[1:]
+    if sorted(values) != list(range(n)):
+        raise ValueError(f"局面必须是 0..{n - 1} 的排列: {line.strip()}")
+    return tuple(values)
+
+
+def read_instances(filename: str, n: int = 16) -> List[Tuple[int, ...]]:
+    with open(filename, "r", encoding="utf-8") as f:
+        return [parse_instance(line, n) for line in f if line.strip() and not line.lstrip().startswith("#")]
+
+
+def heuristic_name(pattern: Optional[str]) -> str:
+    return f"additive {pattern}" if pattern else "manhattan+lc"
+
+
+def _init_worker(pdb_path: Optional[str], name: str, width: int = 4, height: int = 4):
+    global _engine, _heuristic
+    _engine = FastIDAStar(width, height, pdb=AdditivePDB(load_databases(pdb_path)[0]) if pdb_path else None)
+    _heuristic = name
+
+
+def _solve_one(task: Tuple[int, Sequence[int]]) -> dict:
+    index, state = task
+    moves = _engine.solve(state)
+    return {
+        "index": index,
+        "state": list(state),
+        "path": None if moves is None else "".join(MOVE_LETTERS[m] for m in moves),
+        "length": None if moves is None else len(moves),
+        "nodes": _engine.nodes_explored,
+        "time": round(_engine.elapsed, 4),
+        "heuristic": _heuristic,
+    }
+
+
+def iter_solve(states: Iterable[Sequence[int]], pattern: Optional[str] = "auto", workers: int = 0,
+               quiet: bool = True, width: int = 4, height: int = 4) -> Iterator[dict]:
+    """
+    按输入顺序逐题产出最优解；无解的局面 path 和 length 为 None
+    pattern: patterndb.SIZE_PRESETS 里该尺寸的分组名，"auto" 取 DEFAULT_PATTERNS，None 表示只用曼哈顿 + 线性冲突
+    workers: 进程数，0 表示 CPU 核数；1 表示在当前进程内求解
+    """
+    if pattern == "auto":
+        pattern = DEFAULT_PATTERNS.get((width, height))
+    pdb_path = None
+    if pattern:
+        groups = presets_for(width, height).get(pattern)
+        if groups is None:
+            raise ValueError(f"{width}x{height} 没有名为 {pattern} 的分组")
+        # 先在主进程里把表准备好（没有就构建并存盘），工作进程只负责 mmap
+        pdb_path = default_path(groups, width, height)
+        load_or_build(groups, pdb_path, width, height, verbose=not quiet)
+    name = heuristic_name(pattern)
+    tasks = ((i, tuple(s)) for i, s in enumerate(states, 1))
+    workers = workers or os.cpu_count() or 1
+
+    if workers == 1:
+        _init_worker(pdb_path, name, width, height)
+        results = map(_solve_one, tasks)
+        pool = None
+    else:
+        pool = mp.get_context().Pool(workers, _init_worker, (pdb_path, name, width, height))
+        results = pool.imap(_solve_one, tasks)
+    try:
+        for result in results:
+            if not quiet:
+                length = "无解" if result["length"] is None else f"{result['length']} 步"
+                print(f"#{result['index']}: {length}, {result['nodes']} 节点, {result['time']:.2f} 秒", file=sys.stderr)
+            yield result
+    finally:
+        if pool is not None:
+            pool.terminate()
+            pool.join()
+
+
+def solve_batch(states: Iterable[Sequence[int]], pattern: Optional[str] = "auto", workers: int = 0,
+                quiet: bool = True, width: int = 4, height: int = 4) -> List[dict]:
+    """iter_solve 的列表版本"""
+    return list(iter_solve(states, pattern, workers, quiet, width, height))
+
+
+def summarize(results: Sequence[dict]) -> dict:
+    solved = [r for r in results if r["length"] is not None]
+    return {
+        "count": len(results),
+        "solved": len(solved),
+        "total_length": sum(r["length"] for r in solved),
+        "total_nodes": sum(r["nodes"] for r in results),
+        "total_time": sum(r["time"] for r in results),
+    }
+
+
+def write_results(results: Iterable[dict], out, fmt: str = "jsonl") -> List[dict]:
+    """写出结果，返回写过的结果列表"""
+    written = []
+    if fmt == "csv":
+        writer = csv.writer(out)
+        writer.writerow(CSV_FIELDS)
+    for res in results:
+        if fmt == "csv":
+            writer.writerow([res[field] if res[field] is not None else "" for field in CSV_FIELDS])
+        else:
+            out.write(json.dumps(res, ensure_ascii=False, separators=(",", ":")))
+            out.write("\n")
+        out.flush()
+        written.append(res)
+    return written
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="十五数码批量求最优解")
+    parser.add_argument("input", help="局面文件，每行一个局面")
+    parser.add_argument("-o", "--output", help="输出文件，默认标准输出")
+    parser.add_argument("--format", choices=["jsonl", "csv"], help="输出格式，默认按输出文件后缀判断")
+    parser.add_argument("--workers", type=int, default=0, help="进程数，默认 CPU 核数")
+    parser.add_argument("--size", default="4x4", help="盘面尺寸 宽x高，如 3x3、4x4、5x5")
+    parser.add_argument("--pattern", default="auto",
+                        help="加性模式数据库的分组（见 patterndb.SIZE_PRESETS），auto 按尺寸选，none 只用曼哈顿 + 线性冲突")
+    parser.add_argument("--quiet", action="store_true", help="不打印进度和汇总")
+    args = parser.parse_args(argv)
+
+    fmt = args.format or ("csv" if args.output and args.output.endswith(".csv") else "jsonl")
+    width, height = map(int, args.size.lower().split("x"))
+    pattern = None if args.pattern == "none" else args.pattern
+    start = time.time()
+    results = iter_solve(read_instances(args.input, width * height), pattern, args.workers, args.quiet, width, height)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8", newline="") as out:
+            written = write_results(results, out, fmt)
+    else:
+        written = write_results(results, sys.stdout, fmt)
+    if not args.quiet:
+        summary = summarize(written)
+        print(f"解出 {summary['solved']}/{summary['count']} 题, 总步数 {summary['total_length']}, "
+              f"总节点 {summary['total_nodes']}, 总耗时 {time.time() - start:.1f} 秒", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+# 15puzzle/bidirectional.py
+# 双向 MM 搜索（Holte 等，"Bidirectional Search That Is Guaranteed to Meet in the Middle"）
+#
+#   - 正向从初始局面出发，启发值是到目标的估计；反向从目标出发，启发值是到初始局面的估计，
+#     两边各用一个 FastIDAStar 当求值器（successor_heuristics 增量算出所有后继的 h）
+#   - 节点的优先级 pr = max(g + h, 2g)：任何一边都不会扩展 g 超过最优解一半的节点，两边在中间相遇
+#   - 每次扩展 pr 最小的那一边；生成的子节点如果在另一边出现过，g 正 + g 反 就是一条解，记为上界 U
+#   - U <= max(C, 正向 fmin, 反向 fmin, 正向 gmin + 反向 gmin + 1) 时 U 就是最优解长度（C 为两边最小的 pr）
+#
+# 存储都是整数：局面用 sliding.py 压成一个 int；每边一个 dict，局面 -> (g, 是否已扩展, 空格位置, 走法) 压成一个 int，
+# 空格位置占 (n-1).bit_length() 位，任意尺寸的盘面都放得下；
+# 开放表是三个惰性删除的堆（按 pr、f、g），堆元素也是一个 int：(值 << 8 | g) << 局面位数 | 局面，
+# 出堆时 g 对不上或已扩展的就是过期元素，直接丢掉
+#
+# 模式数据库只针对空格在左上角的目标，所以只有正向能用；反向用曼哈顿 + 线性冲突（对任意目标都成立）
+#
+#   python bidirectional.py
+
+import heapq
+import time
+from typing import List, Optional, Sequence
+
+from ida import OPPOSITE, FastIDAStar
+from sliding import SlidingPuzzle
+
+ROOT = 4    # 根节点的"走法"
+
+
+class _Frontier:
+    """一个方向的搜索状态"""
+
+    def __init__(self, evaluator: FastIDAStar, key_bits: int, blank_bits: int):
+        self.evaluator = evaluator
+        self.key_bits = key_bits
+        self.key_mask = (1 << key_bits) - 1
+        # 局面 -> g << g_shift | 已扩展 << (g_shift - 1) | 空格 << 3 | 走法
+        self.seen = {}
+        self.g_shift = blank_bits + 4
+        self.closed = 1 << (blank_bits + 3)
+        self.pr_heap = []
+        self.f_heap = []
+        self.g_heap = []
+        self.expanded = 0
+        self.generated = 0
+
+    def push(self, key: int, g: int, h: int):
+        shift = self.key_bits
+        low = (g << shift) | key
+        heapq.heappush(self.pr_heap, (max(g + h, 2 * g) << (shift + 8)) | low)
+        heapq.heappush(self.f_heap, ((g + h) << (shift + 8)) | low)
+        heapq.heappush(self.g_heap, (g << (shift + 8)) | low)
+
+    def _top(self, heap: List[int]) -> Optional[int]:
+        """丢掉过期元素，返回堆顶的值（pr/f/g），空堆返回 None"""
+        shift, mask, seen = self.key_bits, self.key_mask, self.seen
+        closed, g_shift = self.closed, self.g_shift
+        while heap:
+            item = heap[0]
+            info = seen[item & mask]
+            if not info & closed and info >> g_shift == (item >> shift) & 0xFF:
+                return item >> (shift + 8)
+            heapq.heappop(heap)
+        return None
+
+    def bounds(self):
+        """(最小 pr, 最小 f, 最小 g)，开放表为空时都是 None"""
+        return self._top(self.pr_heap), self._top(self.f_heap), self._top(self.g_heap)
+
+    def pop(self) -> int:
+        """取出 pr 最小（同 pr 时 g 最小）的局面并标记为已扩展；调用前 bounds() 已清理过堆顶"""
+        key = heapq.heappop(self.pr_heap) & self.key_mask
+        self.seen[key] |= self.closed
+        self.expanded += 1
+        return key
+
+
+class MMSearch:
+    """
+    width x height 滑块拼图的双向 MM 搜索，pdb 为正向用的加性模式数据库（None 只用曼哈顿 + 线性冲突）
+    走法编号和 FastIDAStar 一致
+    """
+
+    def __init__(self, width: int = 4, height: int = 4, goal: Optional[Sequence[int]] = None, pdb=None):
+        self.width = width
+        self.height = height
+        self.puzzle = SlidingPuzzle(width, height, goal)
+        self.goal = self.puzzle.goal
+        self.forward_evaluator = FastIDAStar(width, height, self.goal, pdb)
+        self.blank_bits = (self.puzzle.n - 1).bit_length()
+        self.blank_mask = (1 << self.blank_bits) - 1
+        self.nodes_explored = 0
+        self.nodes_generated = 0
+        self.expanded = (0, 0)
+        self.stored = 0
+        self.elapsed = 0.0
+
+    def is_solvable(self, state: Sequence[int]) -> bool:
+        return self.puzzle.is_solvable(state)
+
+    def solve(self, state: Sequence[int]) -> Optional[List[int]]:
+        """返回最优走法，无解返回 None"""
+        state = tuple(state)
+        start_time = time.time()
+        try:
+            if not self.is_solvable(state):
+                return None
+            return self._solve(state)
+        finally:
+            self.elapsed = time.time() - start_time
+
+    def _solve(self, state):
+        puzzle = self.puzzle
+        start_key = puzzle.pack(state)
+        if start_key == puzzle.goal_key:
+            return []
+        key_bits = puzzle.bits * puzzle.n
+        blank_mask = self.blank_mask
+        forward = _Frontier(self.forward_evaluator, key_bits, self.blank_bits)
+        backward = _Frontier(FastIDAStar(self.width, self.height, state), key_bits, self.blank_bits)
+        g_shift = forward.g_shift
+        for side, key, root in ((forward, start_key, state), (backward, puzzle.goal_key, self.goal)):
+            side.seen[key] = (root.index(0) << 3) | ROOT
+            side.push(key, 0, side.evaluator.heuristic(root))
+
+        best, meet = None, None
+        while True:
+            pr_f, f_f, g_f = forward.bounds()
+            pr_b, f_b, g_b = backward.bounds()
+            if pr_f is None or pr_b is None:
+                break
+            if best is not None and best <= max(min(pr_f, pr_b), f_f, f_b, g_f + g_b + 1):
+                break
+            side, other = (forward, backward) if pr_f <= pr_b else (backward, forward)
+            key = side.pop()
+            g = (side.seen[key] >> g_shift) + 1
+            blank = (side.seen[key] >> 3) & blank_mask
+            for d, new, h in side.evaluator.successor_heuristics(puzzle.unpack(key)):
+                child = puzzle.move(key, blank, new)
+                info = side.seen.get(child)
+                if info is not None and info >> g_shift <= g:
+                    continue
+                side.seen[child] = (g << g_shift) | (new << 3) | d
+                side.push(child, g, h)
+                side.generated += 1
+                info = other.seen.get(child)
+                if info is not None and (best is None or g + (info >> g_shift) < best):
+                    best, meet = g + (info >> g_shift), child
+
+        self.expanded = (forward.expanded, backward.expanded)
+        self.nodes_explored = forward.expanded + backward.expanded
+        self.nodes_generated = forward.generated + backward.generated
+        self.stored = len(forward.seen) + len(backward.seen)
+        if meet is None:
+            return None
+        return self._trace(forward.seen, meet)[::-1] + [OPPOSITE[d] for d in self._trace(backward.seen, meet)]
+
+    def _trace(self, seen: dict, key: int) -> List[int]:
+        """从 key 沿父指针走回根，返回一路上的走法（从 key 往根的顺序）"""
+        puzzle = self.puzzle
+        moves = []
+        info = seen[key]
+        while info & 7 != ROOT:
+            d = info & 7
+            blank = (info >> 3) & self.blank_mask
+            moves.append(d)
+            key = puzzle.move(key, blank, puzzle.neighbors[OPPOSITE[d]][blank])
+            info = seen[key]
+        return moves
+
+
+def compare(state: Sequence[int], width: int = 4, height: int = 4, pdb=None) -> dict:
+    """同一个正向启发式下对比单向 IDA* 和双向 MM 的节点数，两者的解长度必须一样"""
+    ida = FastIDAStar(width, height, pdb=pdb)
+    ida_path = ida.solve(state)
+    mm = MMSearch(width, height, pdb=pdb)
+    mm_path = mm.solve(state)
+    if (ida_path is None) != (mm_path is None) or (ida_path is not None and len(ida_path) != len(mm_path)):
+        raise AssertionError(f"解长度不一致: IDA* {ida_path}, MM {mm_path}")
+    if mm_path is not None and mm.puzzle.apply(state, mm_path) != mm.goal:
+        raise AssertionError("MM 的走法没有到达目标")
+    result = {
+        "length": None if ida_path is None else len(ida_path),
+        "ida_nodes": ida.nodes_explored, "ida_time": ida.elapsed,
+        "mm_nodes": mm.nodes_explored, "mm_expanded": mm.expanded, "mm_generated": mm.nodes_generated,
+        "mm_stored": mm.stored, "mm_time": mm.elapsed,
+    }
+    print(f"{result['length']} 步: IDA* {ida.nodes_explored} 节点 {ida.elapsed:.2f} 秒 | "
+          f"MM 扩展 {mm.nodes_explored}（正向 {mm.expanded[0]}，反向 {mm.expanded[1]}），"
+          f"存 {mm.stored} 个局面 {mm.elapsed:.2f} 秒")
+    return result
+
+
+if __name__ == "__main__":
+    boards = [
+        (4, 2, 0, 11, 3, 6, 5, 7, 1, 9, 13, 10, 12, 14, 8, 15),
+        (2, 13, 0, 6, 9, 4, 7, 10, 5, 15, 11, 3, 8, 12, 14, 1),
+    ]
+    for board in boards:
+        compare(board)
@@ -0,0 +1,364 @@
+# 15puzzle/ida.py
+# 不分配内存的 IDA* 内核：整个搜索只有一块可变的盘面，沿路径原地移动、回溯时原地撤销
+#
+#   - 显式栈代替递归：每层只记下空格位置、走到第几个后继、父节点的启发值，栈是预先分配好的列表
+#   - 曼哈顿距离按被移动的那一个数字增量更新
+#   - 线性冲突按行/列增量更新：每一行（列）用一个整数键描述"哪些格子里放着属于本行的数字、
+#     它们的目标列是多少"（每格 3 位），键 -> 冲突值预先查表；空格上下移动只改两行的键，左右移动只改两列
+#     冲突值取 2 * (属于本行的数字个数 - 目标列的最长递增子序列)，这是可采纳的，两两计数会高估
+#   - 模式数据库只重新排名被移动数字所在的那一组
+#   - 先算子节点的启发值，超过限制直接剪掉，不去改盘面
+#
+#   python ida.py
+
+import time
+from typing import List, Optional, Sequence, Tuple
+
+from patterndb import DIRECTIONS, AdditivePDB, neighbor_table
+
+MAX_DEPTH = 256
+CHECK_EVERY = 0x3FFF    # 每隔这么多节点看一次是否被取消
+OPPOSITE = [1, 0, 3, 2]
+VERTICAL = (0, 1)
+
+
+def permutation_parity(state: Sequence[int], width: int) -> int:
+    """逆序数的奇偶性；宽度为偶数时再加上空格所在行，走一步不会改变这个值"""
+    tiles = [t for t in state if t]
+    inversions = 0
+    for i, a in enumerate(tiles):
+        for b in tiles[i + 1:]:
+            if a > b:
+                inversions += 1
+    if width % 2 == 0:
+        inversions += list(state).index(0) // width
+    return inversions % 2
+
+
+def _line_conflicts(values: Sequence[int]) -> int:
+    """一行里各数字的目标列（按当前位置排列），返回 2 * (个数 - 最长递增子序列)"""
+    best = []
+    for v in values:
+        length = 1 + max((best[j] for j in range(len(best)) if values[j] < v), default=0)
+        best.append(length)
+    return 2 * (len(values) - max(best, default=0))
+
+
+def _conflict_table(length: int, bits: int) -> List[int]:
+    """键的每 bits 位是一格：0 表示不属于本行，否则为目标列 + 1"""
+    mask = (1 << bits) - 1
+    table = []
+    for key in range(1 << (bits * length)):
+        values = [(key >> (bits * i)) & mask for i in range(length)]
+        table.append(_line_conflicts([v for v in values if v]))
+    return table
+
+
+class FastIDAStar:
+    """
+    width x height 的滑块拼图 IDA*，h = max(曼哈顿 + 线性冲突, 加性模式数据库)
+    走法编号是空格移动的方向 0-3（上、下、左、右），与 resolver.py 的 move_names 对应
+    """
+
+    def __init__(self, width: int = 4, height: int = 4, goal: Optional[Sequence[int]] = None,
+                 pdb: Optional[AdditivePDB] = None, max_depth: int = MAX_DEPTH):
+        n = width * height
+        self.width = width
+        self.height = height
+        self.n = n
+        self.goal = tuple(goal) if goal is not None else tuple(range(n))
+        self.pdb = pdb
+        self.max_depth = max_depth
+        self.stop = None        # 有 is_set() 的对象（如 multiprocessing.Event），置位后搜索尽快返回
+        self.nodes_explored = 0
+        self.iterations = 0
+        self.elapsed = 0.0
+
+        goal_pos = [0] * n
+        for pos, tile in enumerate(self.goal):
+            goal_pos[tile] = pos
+        self.manhattan = [[0] * n] + [
+            [abs(p // width - goal_pos[t] // width) + abs(p % width - goal_pos[t] % width) for p in range(n)]
+            for t in range(1, n)]
+
+        # 行键在前（height 个），列键在后（width 个）
+        bits = max(width, height).bit_length()
+        row_code = [[0] * n for _ in range(n)]
+        col_code = [[0] * n for _ in range(n)]
+        for t in range(1, n):
+            gr, gc = divmod(goal_pos[t], width)
+            for p in range(n):
+                r, c = divmod(p, width)
+                if r == gr:
+                    row_code[t][p] = (gc + 1) << (bits * c)
+                if c == gc:
+                    col_code[t][p] = (gr + 1) << (bits * r)
+        self.codes = (row_code, col_code)
+        self.conflicts = (_conflict_table(width, bits), _conflict_table(height, bits))
+
+        # succ[blank][last]：(方向, 空格新位置, 冲突值会变的两条线, 行/列, 数字所在的另一条线)，
+        # 已去掉撤销上一步的走法；last=4 表示根节点。数字沿另一条线移动时顺序不变，只需改键
+        nb = neighbor_table(width, height)
+        self.succ = []
+        for blank in range(n):
+            entries = []
+            for d in range(len(DIRECTIONS)):
+                new = nb[d][blank]
+                if new < 0:
+                    continue
+                if d in VERTICAL:
+                    entries.append((d, new, new // width, blank // width, 0, height + blank % width))
+                else:
+                    entries.append((d, new, height + new % width, height + blank % width, 1, blank // width))
+            self.succ.append([tuple(e for e in entries if e[0] != OPPOSITE[last]) for last in range(4)]
+                             + [tuple(entries)])
+
+        # 每个数字所属的模式组，-1 表示不在任何组里
+        self.group_of = [-1] * n
+        self.groups = []
+        if pdb is not None:
+            for gi, db in enumerate(pdb.dbs):
+                for t in db.tiles:
+                    self.group_of[t] = gi
+                self.groups.append((db.tiles, db.factors, db.table))
+
+        # 搜索状态与预分配的栈
+        self.board = [0] * n
+        self.where = [0] * n
+        self.keys = [0] * (width + height)
+        self.group_h = [0] * len(self.groups)
+        self.path = [0] * max_depth
+        self.blank_stack = [0] * max_depth
+        self.kids_stack = [()] * (max_depth + 1)
+        self.index_stack = [0] * (max_depth + 1)
+        self.md_stack = [0] * max_depth
+        self.lc_stack = [0] * max_depth
+        self.pdb_stack = [0] * max_depth
+        self.group_stack = [0] * max_depth
+
+    def is_solvable(self, state: Sequence[int]) -> bool:
+        return permutation_parity(state, self.width) == permutation_parity(self.goal, self.width)
+
+    def _rank(self, gi: int) -> int:
+        tiles, factors, table = self.groups[gi]
+        where = self.where
+        used = 0
+        index = 0
+        for t, f in zip(tiles, factors):
+            p = where[t]
+            index += (p - (used & ((1 << p) - 1)).bit_count()) * f
+            used |= 1 << p
+        return int(table[index])
+
+    def _load(self, state: Sequence[int]):
+        """把 state 放到工作盘面上，算出各项启发值"""
+        n = self.n
+        if sorted(state) != list(range(n)):
+            raise ValueError(f"状态必须是 0..{n - 1} 的排列")
+        board, where = self.board, self.where
+        for pos, tile in enumerate(state):
+            board[pos] = tile
+            where[tile] = pos
+        self.blank = where[0]
+        self.md = sum(self.manhattan[t][p] for p, t in enumerate(state))
+        row_code, col_code = self.codes
+        keys = self.keys
+        for i in range(len(keys)):
+            keys[i] = 0
+        for p, t in enumerate(state):
+            keys[p // self.width] += row_code[t][p]
+            keys[self.height + p % self.width] += col_code[t][p]
+        rows, cols = self.conflicts
+        self.lc = (sum(rows[k] for k in keys[:self.height]) + sum(cols[k] for k in keys[self.height:]))
+        for gi in range(len(self.groups)):
+            self.group_h[gi] = self._rank(gi)
+        self.pdb_h = sum(self.group_h)
+
+    def heuristic(self, state: Sequence[int]) -> int:
+        self._load(state)
+        return max(self.md + self.lc, self.pdb_h)
+
+    def successor_heuristics(self, state: Sequence[int]) -> List[Tuple[int, int, int]]:
+        """
+        state 每个后继的 (方向, 空格新位置, 启发值)，和 _search 一样增量计算、不改盘面
+        给逐个局面求值的搜索（如 bidirectional.py 的 MM）用
+        """
+        self._load(state)
+        board, where, keys, group_h = self.board, self.where, self.keys, self.group_h
+        codes, conflicts, group_of = self.codes, self.conflicts, self.group_of
+        blank, md, lc, pdb_h = self.blank, self.md, self.lc, self.pdb_h
+        result = []
+        for d, new, la, lb, ci, _ in self.succ[blank][4]:
+            tile = board[new]
+            mt = self.manhattan[tile]
+            code = codes[ci][tile]
+            table = conflicts[ci]
+            ka, kb = keys[la], keys[lb]
+            h = (md + mt[blank] - mt[new]
+                 + lc + table[ka - code[new]] + table[kb + code[blank]] - table[ka] - table[kb])
+            gi = group_of[tile]
+            if gi >= 0:
+                where[tile] = blank
+                child_pdb = pdb_h - group_h[gi] + self._rank(gi)
+                where[tile] = new
+            else:
+                child_pdb = pdb_h
+            result.append((d, new, max(h, child_pdb)))
+        return result
+
+    def _search(self, bound: int, last: int = 4):
+        """
+        一次深度限制为 bound 的迭代，last 为到达当前盘面的上一步（不走回头路）
+        找到返回 (路径长度, bound)，否则返回 (-1, 下一个限制)，被取消返回 (-2, None)
+        """
+        board, where, keys, group_h = self.board, self.where, self.keys, self.group_h
+        manhattan, codes, conflicts, groups, group_of = \
+            self.manhattan, self.codes, self.conflicts, self.groups, self.group_of
+        succ = self.succ
+        path, blank_stack, kids_stack, index_stack = self.path, self.blank_stack, self.kids_stack, self.index_stack
+        md_stack, lc_stack, pdb_stack, group_stack = self.md_stack, self.lc_stack, self.pdb_stack, self.group_stack
+        max_depth = self.max_depth
+        stop = self.stop
+        blank, md, lc, pdb_h = self.blank, self.md, self.lc, self.pdb_h
+        nodes = 0
+        next_bound = None
+        g = 0
+        kids_stack[0] = succ[blank][last]
+        index_stack[0] = 0
+
+        while True:
+            kids = kids_stack[g]
+            i = index_stack[g]
+            if i == len(kids):
+                if g == 0:
+                    break
+                # 撤销第 g-1 层的走法
+                g -= 1
+                _, new, la, lb, ci, lp = kids_stack[g][index_stack[g] - 1]
+                old = blank_stack[g]
+                tile = board[old]
+                board[blank] = tile
+                board[old] = 0
+                where[tile] = blank
+                code = codes[ci][tile]
+                keys[la] += code[blank]
+                keys[lb] -= code[old]
+                code = codes[1 - ci][tile]
+                keys[lp] += code[blank] - code[old]
+                gi = group_of[tile]
+                if gi >= 0:
+                    group_h[gi] = group_stack[g]
+                blank = old
+                md = md_stack[g]
+                lc = lc_stack[g]
+                pdb_h = pdb_stack[g]
+                continue
+            index_stack[g] = i + 1
+            d, new, la, lb, ci, lp = kids[i]
+            tile = board[new]
+            nodes += 1
+            if not nodes & CHECK_EVERY and stop is not None and stop.is_set():
+                # 盘面停在搜索中途，下次 _load 会重新放置
+                self.nodes_explored += nodes
+                return -2, None
+
+            mt = manhattan[tile]
+            child_md = md + mt[blank] - mt[new]
+            code = codes[ci][tile]
+            table = conflicts[ci]
+            ka, kb = keys[la], keys[lb]
+            na, nb = ka - code[new], kb + code[blank]
+            child_lc = lc + table[na] + table[nb] - table[ka] - table[kb]
+            h = child_md + child_lc
+            gi = group_of[tile]
+            if gi >= 0:
+                where[tile] = blank
+                tiles, factors, pdb_table = groups[gi]
+                used = 0
+                index = 0
+                for t, f in zip(tiles, factors):
+                    p = where[t]
+                    index += (p - (used & ((1 << p) - 1)).bit_count()) * f
+                    used |= 1 << p
+                value = int(pdb_table[index])
+                child_pdb = pdb_h - group_h[gi] + value
+                if child_pdb > h:
+                    h = child_pdb
+            else:
+                child_pdb = pdb_h
+
+            f = g + 1 + h
+            if f > bound or g + 1 >= max_depth:
+                if f > bound and (next_bound is None or f < next_bound):
+                    next_bound = f
+                if gi >= 0:
+                    where[tile] = new
+                continue
+
+            # 走这一步
+            board[blank] = tile
+            board[new] = 0
+            where[tile] = blank
+            keys[la] = na
+            keys[lb] = nb
+            code = codes[1 - ci][tile]
+            keys[lp] += code[blank] - code[new]
+            if gi >= 0:
+                group_stack[g] = group_h[gi]
+                group_h[gi] = value
+            md_stack[g] = md
+            lc_stack[g] = lc
+            pdb_stack[g] = pdb_h
+            blank_stack[g] = blank
+            path[g] = d
+            blank, md, lc, pdb_h = new, child_md, child_lc, child_pdb
+            g += 1
+            if h == 0:
+                self.nodes_explored += nodes
+                return g, bound
+            kids_stack[g] = succ[new][d]
+            index_stack[g] = 0
+
+        self.nodes_explored += nodes
+        return -1, next_bound
+
+    def search_bound(self, state: Sequence[int], bound: int, last: int = 4):
+        """只跑一次限制为 bound 的迭代：返回 (走法序列或 None, 下一个限制)"""
+        self._load(state)
+        length, next_bound = self._search(bound, last)
+        if length >= 0:
+            return self.path[:length], bound
+        return None, next_bound
+
+    def solve(self, state: Sequence[int], max_bound: Optional[int] = None) -> Optional[List[int]]:
+        """返回最优走法序列（空格的移动方向），无解或超过 max_bound 返回 None"""
+        start = time.time()
+        self.nodes_explored = 0
+        self.iterations = 0
+        try:
+            if not self.is_solvable(state):
+                return None
+            bound = self.heuristic(state)
+            if bound == 0:
+                return []
+            while bound is not None and (max_bound is None or bound <= max_bound):
+                self.iterations += 1
+                self._load(state)
+                length, bound = self._search(bound)
+                if length >= 0:
+                    return self.path[:length]
+            return None
+        finally:
+            self.elapsed = time.time() - start
+
+
+if __name__ == "__main__":
+    from patterndb import PRESETS, load_or_build
+
+    # 从目标随机走 50 步的局面（最优 42 步）
+    state = (2, 13, 0, 6, 9, 4, 7, 10, 5, 15, 11, 3, 8, 12, 14, 1)
+    for name, pdb in (("曼哈顿 + 线性冲突", None), ("6-6-3 加性模式数据库", load_or_build(PRESETS["6-6-3"]))):
+        engine = FastIDAStar(pdb=pdb)
+        moves = engine.solve(state)
+        print(f"{name}: {len(moves)} 步, {engine.nodes_explored} 节点, {engine.iterations} 次迭代, "
+              f"{engine.elapsed:.2f} 秒, {engine.nodes_explored / engine.elapsed:.0f} 节点/秒")
@@ -0,0 +1,161 @@
+# 15puzzle/parallel.py
+# 多进程 IDA*：线程受 GIL 限制，纯 Python 的搜索开多少线程都只用一个核
+#
+#   - 主进程先广度优先展开到 frontier_depth 层（默认 8，去掉重复局面，约几百到上千个），
+#     每个局面连同到达它的走法就是一个任务，比只按根节点的 2-4 个邻居分活均匀得多
+#   - 每一轮所有进程用同一个限制 bound；各任务返回自己的下一个限制，主进程取最小值作为下一轮的 bound
+#   - 同一轮里找到的解长度都等于 bound，一定最优：第一个解回来就置位共享的 Event，
+#     其他进程每隔几千个节点检查一次，尽快返回
+#   - 进程池在多轮之间常驻；模式数据库文件在每个进程里 mmap，物理内存只有一份
+#
+#   python parallel.py [进程数]
+
+import multiprocessing as mp
+import os
+import sys
+import time
+from typing import List, Optional, Sequence, Tuple
+
+from ida import FastIDAStar
+from patterndb import AdditivePDB, load_databases
+from sliding import SlidingPuzzle
+
+FRONTIER_DEPTH = 8
+
+# 工作进程里的搜索引擎，由 _init_worker 创建
+_engine = None
+
+
+def _init_worker(pdb_path: Optional[str], width: int, height: int, goal: Tuple[int, ...], stop):
+    global _engine
+    pdb = AdditivePDB(load_databases(pdb_path)[0]) if pdb_path else None
+    _engine = FastIDAStar(width, height, goal, pdb)
+    _engine.stop = stop
+
+
+def _search_task(task):
+    """(局面, 前缀走法, bound) -> (完整走法或 None, 下一个限制, 节点数)"""
+    state, prefix, bound = task
+    if _engine.stop.is_set():
+        return None, None, 0
+    _engine.nodes_explored = 0
+    moves, next_bound = _engine.search_bound(state, bound - len(prefix), prefix[-1] if prefix else 4)
+    if moves is not None:
+        return list(prefix) + moves, bound, _engine.nodes_explored
+    if next_bound is not None:
+        next_bound += len(prefix)
+    return None, next_bound, _engine.nodes_explored
+
+
+def expand_frontier(state: Sequence[int], depth: int, width: int = 4, height: int = 4,
+                    goal: Optional[Sequence[int]] = None):
+    """
+    广度优先展开到 depth 层，返回 (第 depth 层的 [(局面, 走法)], 更浅处找到的最优解或 None)
+    在更浅的层出现过的局面不再保留：经过它的解一定不是最优的。展开时局面用整数编码，去重集合小得多
+    """
+    puzzle = SlidingPuzzle(width, height, goal)
+    key = puzzle.pack(state)
+    layer = [(key, list(state).index(0), ())]
+    seen = {key}
+    for _ in range(depth):
+        next_layer = []
+        for key, blank, moves in layer:
+            for d, child, new in puzzle.successors(key, blank):
+                if child in seen:
+                    continue
+                seen.add(child)
+                if child == puzzle.goal_key:
+                    return [], list(moves + (d,))
+                next_layer.append((child, new, moves + (d,)))
+        layer = next_layer
+    return [(puzzle.unpack(key), moves) for key, _, moves in layer], None
+
+
+class ParallelIDAStar:
+    """
+    进程池 IDA*，pdb_path 为 patterndb 存的加性模式数据库文件（None 只用曼哈顿 + 线性冲突）
+    用完要 close()，或者用 with
+    """
+
+    def __init__(self, pdb_path: Optional[str] = None, width: int = 4, height: int = 4,
+                 goal: Optional[Sequence[int]] = None, workers: Optional[int] = None,
+                 frontier_depth: int = FRONTIER_DEPTH):
+        pdb = AdditivePDB(load_databases(pdb_path)[0]) if pdb_path else None
+        self.engine = FastIDAStar(width, height, goal, pdb)
+        self.width = width
+        self.height = height
+        self.frontier_depth = frontier_depth
+        self.workers = workers or os.cpu_count() or 1
+        self.nodes_explored = 0
+        self.iterations = 0
+        self.frontier_size = 0
+        self.elapsed = 0.0
+        ctx = mp.get_context()
+        self.stop = ctx.Event()
+        self.pool = ctx.Pool(self.workers, _init_worker, (pdb_path, width, height, self.engine.goal, self.stop))
+
+    def solve(self, state: Sequence[int]) -> Optional[List[int]]:
+        """返回最优走法序列（空格的移动方向），无解返回 None"""
+        start = time.time()
+        self.nodes_explored = 0
+        self.iterations = 0
+        try:
+            return self._solve(tuple(state))
+        finally:
+            self.elapsed = time.time() - start
+
+    def _solve(self, state: Tuple[int, ...]) -> Optional[List[int]]:
+        engine = self.engine
+        if not engine.is_solvable(state):
+            return None
+        if engine.heuristic(state) == 0:
+            return []
+        frontier, solution = expand_frontier(state, self.frontier_depth, self.width, self.height, engine.goal)
+        if solution is not None:
+            return solution
+        self.frontier_size = len(frontier)
+        f_values = [len(moves) + engine.heuristic(s) for s, moves in frontier]
+        bound = max(engine.heuristic(state), min(f_values))
+
+        while True:
+            self.iterations += 1
+            tasks = [(s, moves, bound) for (s, moves), f in zip(frontier, f_values) if f <= bound]
+            next_bound = min((f for f in f_values if f > bound), default=None)
+            self.stop.clear()
+            for moves, task_bound, nodes in self.pool.imap_unordered(_search_task, tasks):
+                self.nodes_explored += nodes
+                if moves is not None:
+                    if solution is None:
+                        solution = moves
+                        self.stop.set()
+                elif task_bound is not None and (next_bound is None or task_bound < next_bound):
+                    next_bound = task_bound
+            if solution is not None:
+                return solution
+            if next_bound is None:
+                return None
+            bound = next_bound
+
+    def close(self):
+        self.pool.close()
+        self.pool.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+if __name__ == "__main__":
+    from patterndb import PRESETS, default_path, load_or_build
+
+    groups = PRESETS["6-6-3"]
+    load_or_build(groups, verbose=True)
+    # 从目标随机走 300 步的局面（最优 46 步）
+    state = (4, 5, 10, 6, 12, 1, 8, 15, 11, 3, 2, 7, 14, 13, 9, 0)
+    workers = int(sys.argv[1]) if len(sys.argv) > 1 else None
+    with ParallelIDAStar(default_path(groups), workers=workers) as search:
+        moves = search.solve(state)
+        print(f"{search.workers} 个进程: {len(moves)} 步, {search.nodes_explored} 节点, {search.iterations} 次迭代, "
+              f"{search.frontier_size} 个任务/轮, {search.elapsed:.2f} 秒")
@@ -0,0 +1,338 @@
+# 15puzzle/patterndb.py
+# 加性模式数据库（additive disjoint PDB）
+#
+# 模式 = 一组数字（不含空格），表里存"只计这组数字的移动次数"时到目标的最少步数。
+# 各组互不相交时，各表的值可以直接相加，仍然是可采纳的启发式（比对整行取 max 强得多）。
+#
+# 索引：k 个数字所在位置的有序排列，按字典序排名压成 [0, n!/(n-k)!) 里的整数，
+#       距离存在 uint8 数组里（6 个数字的表 5765760 字节），不再用 -1 填充的元组当 dict 的键
+# 构建：状态是 (模式位置, 空格位置)，空格和非模式数字交换代价 0，和模式数字交换代价 1，
+#       按代价分层做 0-1 BFS：先把当前代价内空格能走到的状态全部展开，再生成下一层。
+#       每层的状态放在 NumPy 数组里整体展开、排名、去重，不逐个状态循环
+# 存盘：多张表写进一个带版本号的二进制文件，加载时 mmap 成只读数组，
+#       多个进程打开同一个文件共享同一份物理页，启动只要几毫秒
+#
+#   python patterndb.py 6-6-3
+#   python patterndb.py 5-5-5-5-4 5x5
+
+import mmap
+import os
+import struct
+import sys
+import time
+from math import perm
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# 目标状态为 tuple(range(16))（空格在左上角），这些分组在目标里都是相连的块
+PRESETS = {
+    "5-5-5": [[1, 2, 3, 5, 6], [4, 8, 9, 12, 13], [7, 10, 11, 14, 15]],
+    "6-6-3": [[1, 2, 3, 5, 6, 7], [9, 10, 11, 13, 14, 15], [4, 8, 12]],
+}
+
+# 其他尺寸的分组，目标同样是 0..n-1；3x3 的 "8" 把 8 个数字放进一张表（36 万条），就是精确的距离
+SIZE_PRESETS = {
+    (3, 3): {
+        "4-4": [[1, 2, 4, 5], [3, 6, 7, 8]],
+        "8": [[1, 2, 3, 4, 5, 6, 7, 8]],
+    },
+    (4, 4): PRESETS,
+    (5, 5): {
+        "5-5-5-5-4": [[1, 2, 3, 6, 7], [4, 8, 9, 13, 14], [5, 10, 11, 15, 20], [12, 16, 17, 21, 22],
+                      [18, 19, 23, 24]],
+    },
+}
+DEFAULT_PATTERNS = {(3, 3): "8", (4, 4): "6-6-3", (5, 5): "5-5-5-5-4"}
+
+UNSEEN = 255
+# 构建时 seen 数组每个 (排名, 空格位置) 一个字节，再加上每层展开的临时数组；超过这个数就在分配前拒绝。
+# 4x4 的 6 个数字 9200 万、5x5 的 5 个数字 1.6 亿都在范围内；
+# 4x4 的 7 个数字要 9.2 亿（seen 900MB，构建峰值还要翻几倍），8 个数字要 83 亿（8GB 以上）
+MAX_BUILD_STATES = 1 << 28
+
+# 文件格式：文件头 | 目标状态 n 字节 | 每张表的目录项 | 各张表的数据（8 字节对齐）
+FILE_MAGIC = b"15PD"
+FILE_VERSION = 1
+FILE_HEADER = struct.Struct("<4sHBBH")      # magic, version, width, height, 表的个数
+ENTRY = struct.Struct("<BBQQ")              # 数字个数 k, 是否加性, 数据偏移, 数据长度（后跟 k 字节的数字）
+DEFAULT_DIR = os.path.dirname(os.path.abspath(__file__))
+# (dr, dc)：上、下、左、右，与 resolver.py 的 moves 顺序相同
+DIRECTIONS = [(-1, 0), (1, 0), (0, -1), (0, 1)]
+
+
+def neighbor_table(width: int, height: int) -> List[List[int]]:
+    """nb[d][pos]：空格从 pos 朝方向 d 移动后的位置，出界为 -1"""
+    table = []
+    for dr, dc in DIRECTIONS:
+        row = []
+        for pos in range(width * height):
+            r, c = divmod(pos, width)
+            r, c = r + dr, c + dc
+            row.append(r * width + c if 0 <= r < height and 0 <= c < width else -1)
+        table.append(row)
+    return table
+
+
+def rank_factors(n: int, k: int) -> List[int]:
+    """第 i 个数字的位权：后面 k-1-i 个数字在剩余 n-1-i 个位置上的排列数"""
+    return [perm(n - 1 - i, k - 1 - i) for i in range(k)]
+
+
+def rank_positions(positions: Sequence[int], factors: Sequence[int]) -> int:
+    """k 个不同位置的字典序排名：每个位置减去前面比它小的位置个数"""
+    used = 0
+    index = 0
+    for p, f in zip(positions, factors):
+        index += (p - (used & ((1 << p) - 1)).bit_count()) * f
+        used |= 1 << p
+    return index
+
+
+def _rank_array(pos: np.ndarray, factors: Sequence[int]) -> np.ndarray:
+    """rank_positions 的批量版本，pos 为 (m,k) 数组"""
+    index = np.zeros(len(pos), dtype=np.int64)
+    for i, f in enumerate(factors):
+        c = pos[:, i].astype(np.int64)
+        for j in range(i):
+            c -= pos[:, j] < pos[:, i]
+        index += c * f
+    return index
+
+
+def check_pattern_size(tiles: Sequence[int], width: int = 4, height: int = 4):
+    """构建状态数超过 MAX_BUILD_STATES 时抛 ValueError"""
+    n = width * height
+    states = perm(n, len(tiles)) * n
+    if states > MAX_BUILD_STATES:
+        raise ValueError(f"{width}x{height} 上 {len(tiles)} 个数字的模式有 {states} 个构建状态，"
+                         f"超过上限 {MAX_BUILD_STATES}，请把分组拆小")
+
+
+def build_pattern_table(tiles: Sequence[int], width: int = 4, height: int = 4,
+                        goal: Optional[Sequence[int]] = None, verbose: bool = False) -> np.ndarray:
+    """0-1 BFS 构建一个模式的距离表，返回长度 n!/(n-k)! 的 uint8 数组"""
+    n = width * height
+    goal = tuple(goal) if goal is not None else tuple(range(n))
+    k = len(tiles)
+    if 0 in tiles or len(set(tiles)) != k:
+        raise ValueError(f"模式数字不能包含空格且不能重复: {tiles}")
+    check_pattern_size(tiles, width, height)
+    factors = rank_factors(n, k)
+    size = perm(n, k)
+    nb = np.array(neighbor_table(width, height), dtype=np.int64)
+    bits = np.int64(1) << np.arange(n, dtype=np.int64)
+
+    dist = np.full(size, UNSEEN, dtype=np.uint8)
+    # 状态编号 = 排名 * n + 空格位置
+    seen = np.zeros(size * n, dtype=bool)
+
+    def fresh(pos, blank, ids=None):
+        """去掉见过的和重复的状态，并标记为见过"""
+        if ids is None:
+            ids = _rank_array(pos, factors) * n + blank
+        keep = ~seen[ids]
+        ids, pos, blank = ids[keep], pos[keep], blank[keep]
+        ids, first = np.unique(ids, return_index=True)
+        seen[ids] = True
+        return pos[first], blank[first], ids
+
+    start = time.time()
+    pos = np.array([[goal.index(t) for t in tiles]], dtype=np.int8)
+    blank = np.array([goal.index(0)], dtype=np.int64)
+    pos, blank, ids = fresh(pos, blank)
+    cost = 0
+    while len(blank):
+        # 当前代价：空格在非模式格子里自由移动（代价 0），一直展开到没有新状态
+        layer_ids = [ids]
+        next_pos, next_blank, next_ids = [], [], []
+        while len(blank):
+            occupied = bits[pos.astype(np.int64)].sum(axis=1)
+            target = nb[:, blank].T                                   # (m,4)
+            valid = target >= 0
+            hit = valid & ((occupied[:, None] >> np.maximum(target, 0)) & 1 == 1)
+            r0, d0 = np.nonzero(valid & ~hit)
+            zero_pos, zero_blank = pos[r0], target[r0, d0]
+            # 和模式数字交换：该数字移到原空格位置，代价 +1
+            r1, d1 = np.nonzero(hit)
+            if len(r1):
+                p1, t1 = pos[r1], target[r1, d1]
+                which = np.argmax(p1 == t1[:, None], axis=1)
+                p1[np.arange(len(r1)), which] = blank[r1]
+                ids1 = _rank_array(p1, factors) * n + t1
+                keep = ~seen[ids1]
+                next_pos.append(p1[keep])
+                next_blank.append(t1[keep])
+                next_ids.append(ids1[keep])
+            pos, blank, ids = fresh(zero_pos, zero_blank)
+            layer_ids.append(ids)
+
+        ranks = np.concatenate(layer_ids) // n
+        ranks = ranks[dist[ranks] == UNSEEN]
+        dist[ranks] = cost
+        if verbose:
+            print(f"  cost {cost}: {len(np.unique(ranks))} patterns, {time.time() - start:.1f}s")
+        cost += 1
+        if not next_pos:
+            break
+        pos, blank, ids = fresh(np.concatenate(next_pos), np.concatenate(next_blank), np.concatenate(next_ids))
+    return dist
+
+
+class PatternDB:
+    """一个模式的距离表；table 可以是内存里的数组，也可以是 mmap 出来的只读视图"""
+
+    def __init__(self, tiles: Sequence[int], table, width: int = 4, height: int = 4, additive: bool = True):
+        self.tiles = tuple(tiles)
+        self.width = width
+        self.height = height
+        self.additive = additive
+        self.factors = rank_factors(width * height, len(self.tiles))
+        self.table = table
+
+    @classmethod
+    def build(cls, tiles: Sequence[int], width: int = 4, height: int = 4,
+              goal: Optional[Sequence[int]] = None, verbose: bool = False) -> "PatternDB":
+        return cls(tiles, build_pattern_table(tiles, width, height, goal, verbose), width, height)
+
+    def __len__(self) -> int:
+        return len(self.table)
+
+    def index(self, where: Sequence[int]) -> int:
+        """where[tile] 为数字所在位置"""
+        return rank_positions([where[t] for t in self.tiles], self.factors)
+
+    def lookup(self, state: Sequence[int]) -> int:
+        """state 为按位置排列的数字"""
+        where = [0] * len(state)
+        for pos, tile in enumerate(state):
+            where[tile] = pos
+        return int(self.table[self.index(where)])
+
+
+class AdditivePDB:
+    """不相交模式数据库的和"""
+
+    def __init__(self, dbs: Iterable[PatternDB]):
+        self.dbs = list(dbs)
+        tiles = [t for db in self.dbs for t in db.tiles]
+        if len(tiles) != len(set(tiles)):
+            raise ValueError("加性模式数据库的各组数字必须互不相交")
+
+    @classmethod
+    def build(cls, groups: Sequence[Sequence[int]], width: int = 4, height: int = 4,
+              goal: Optional[Sequence[int]] = None, verbose: bool = False) -> "AdditivePDB":
+        # 先检查所有分组，不要建完前面的大表才发现后面的建不出来
+        for tiles in groups:
+            check_pattern_size(tiles, width, height)
+        dbs = []
+        for tiles in groups:
+            start = time.time()
+            dbs.append(PatternDB.build(tiles, width, height, goal))
+            if verbose:
+                print(f"模式 {list(tiles)}: {len(dbs[-1])} 条, 耗时 {time.time() - start:.2f} 秒")
+        return cls(dbs)
+
+    def __call__(self, state: Sequence[int]) -> int:
+        where = [0] * len(state)
+        for pos, tile in enumerate(state):
+            where[tile] = pos
+        return sum(int(db.table[db.index(where)]) for db in self.dbs)
+
+
+def save_databases(path: str, dbs: Sequence[PatternDB], goal: Optional[Sequence[int]] = None):
+    """把若干张表写进一个文件（先写临时文件再改名，其他进程不会读到写了一半的文件）"""
+    width, height = dbs[0].width, dbs[0].height
+    n = width * height
+    goal = bytes(goal if goal is not None else range(n))
+    directory = sum(ENTRY.size + len(db.tiles) for db in dbs)
+    offset = FILE_HEADER.size + n + directory
+    entries = []
+    for db in dbs:
+        offset = (offset + 7) & ~7
+        entries.append(ENTRY.pack(len(db.tiles), db.additive, offset, len(db.table)) + bytes(db.tiles))
+        offset += len(db.table)
+
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(FILE_HEADER.pack(FILE_MAGIC, FILE_VERSION, width, height, len(dbs)))
+        f.write(goal)
+        f.write(b"".join(entries))
+        for db, entry in zip(dbs, entries):
+            start = ENTRY.unpack_from(entry)[2]
+            f.write(bytes(start - f.tell()))
+            f.write(np.asarray(db.table, dtype=np.uint8).tobytes())
+    os.replace(tmp, path)
+
+
+def load_databases(path: str) -> Tuple[List[PatternDB], Tuple[int, ...]]:
+    """mmap 打开文件，返回 (各张表, 目标状态)；表是只读的 uint8 视图，不复制数据"""
+    with open(path, "rb") as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    if len(mm) < FILE_HEADER.size:
+        raise ValueError(f"{path} 不是模式数据库文件")
+    magic, version, width, height, count = FILE_HEADER.unpack_from(mm, 0)
+    if magic != FILE_MAGIC:
+        raise ValueError(f"{path} 不是模式数据库文件")
+    if version != FILE_VERSION:
+        raise ValueError(f"{path} 的版本 {version} 与当前版本 {FILE_VERSION} 不兼容")
+    n = width * height
+    pos = FILE_HEADER.size
+    goal = tuple(mm[pos:pos + n])
+    pos += n
+    dbs = []
+    for _ in range(count):
+        if pos + ENTRY.size > len(mm):
+            raise ValueError(f"{path} 已损坏")
+        k, additive, offset, length = ENTRY.unpack_from(mm, pos)
+        pos += ENTRY.size
+        tiles = tuple(mm[pos:pos + k])
+        pos += k
+        if offset + length > len(mm) or length != perm(n, k):
+            raise ValueError(f"{path} 已损坏")
+        table = np.frombuffer(mm, dtype=np.uint8, count=length, offset=offset)
+        dbs.append(PatternDB(tiles, table, width, height, bool(additive)))
+    return dbs, goal
+
+
+def presets_for(width: int, height: int) -> dict:
+    """某个尺寸可用的分组，没有预设时为空"""
+    return SIZE_PRESETS.get((width, height), {})
+
+
+def default_path(groups: Sequence[Sequence[int]], width: int = 4, height: int = 4) -> str:
+    name = "-".join(str(len(tiles)) for tiles in groups)
+    return os.path.join(DEFAULT_DIR, f"additive_{width}x{height}_{name}.pdb")
+
+
+def load_or_build(groups: Sequence[Sequence[int]], path: Optional[str] = None, width: int = 4, height: int = 4,
+                  goal: Optional[Sequence[int]] = None, verbose: bool = False) -> AdditivePDB:
+    """文件存在且分组、目标一致就直接 mmap，否则构建后存盘"""
+    path = path or default_path(groups, width, height)
+    goal = tuple(goal) if goal is not None else tuple(range(width * height))
+    try:
+        dbs, file_goal = load_databases(path)
+        if file_goal == goal and [db.tiles for db in dbs] == [tuple(t) for t in groups] \
+                and all(db.additive and (db.width, db.height) == (width, height) for db in dbs):
+            return AdditivePDB(dbs)
+        if verbose:
+            print(f"{path} 与要求的分组/目标不一致，重新构建")
+    except FileNotFoundError:
+        pass
+    except ValueError as e:
+        if verbose:
+            print(f"{e}，重新构建")
+    heuristic = AdditivePDB.build(groups, width, height, goal, verbose)
+    save_databases(path, heuristic.dbs, goal)
+    return heuristic
+
+
+if __name__ == "__main__":
+    name = sys.argv[1] if len(sys.argv) > 1 else "5-5-5"
+    width, height = map(int, sys.argv[2].split("x")) if len(sys.argv) > 2 else (4, 4)
+    start = time.time()
+    heuristic = load_or_build(presets_for(width, height)[name], width=width, height=height, verbose=True)
+    print(f"{name} 共 {sum(len(db) for db in heuristic.dbs)} 字节, 加载耗时 {time.time() - start:.3f} 秒")
+    if (width, height) == (4, 4):
+        korf1 = (14, 13, 15, 7, 11, 12, 9, 5, 6, 0, 2, 1, 4, 8, 10, 3)  # Korf 100 第 1 题，最优 57 步
+        print(f"Korf #1 启发值: {heuristic(korf1)}")
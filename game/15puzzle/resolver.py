@@ -1,22 +1,43 @@
+import os
 import time
 from collections import deque
+from math import perm
 from typing import List, Tuple, Optional
-from concurrent.futures import ThreadPoolExecutor, as_completed
-import threading
+
+import numpy as np
+
+from bidirectional import MMSearch
+from ida import FastIDAStar, permutation_parity
+from parallel import ParallelIDAStar
+from transposition import DEFAULT_BITS, TranspositionTable
+from patterndb import (DEFAULT_PATTERNS, PatternDB, default_path, load_databases, load_or_build, presets_for,
+                       rank_factors, rank_positions, save_databases)
+from sliding import SlidingPuzzle, parse_board
+
+# 按行划分的模式数据库（每一步都计数，取 max），存盘后重启直接 mmap
+ROW_PATTERNS = [[0, 1, 2, 3], [4, 5, 6, 7], [8, 9, 10, 11]]
+ROW_PDB_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "rows_4x4.pdb")
 
 
 class PatternDatabase:
     """模式数据库：预计算部分拼图的精确解"""
 
-    def __init__(self, pattern_tiles: List[int], size: int = 4):
+    def __init__(self, pattern_tiles: List[int], size: int = 4, table=None):
         """
         :param pattern_tiles: 参与模式的数字列表，如[0,1,2,3]
         :param size: 拼图大小
+        :param table: 已有的距离表（按模式数字位置排名的 uint8 数组），给定时不再构建
         """
         self.pattern_tiles = set(pattern_tiles)
+        self.tiles = sorted(self.pattern_tiles)
         self.size = size
-        self.db = {}
-        self._build_database()
+        self.factors = rank_factors(size * size, len(self.tiles))
+        if table is None:
+            self.db = {}
+            self._build_database()
+            table = self._to_table()
+            self.db = None
+        self.table = table
 
     def _build_database(self):
         """使用BFS构建模式数据库"""
@@ -24,7 +45,7 @@ class PatternDatabase:
         start = time.time()
 
         # 目标状态（只关心pattern_tiles中的数字）
-        goal = self._extract_pattern(tuple(range(16)))
+        goal = self._extract_pattern(tuple(range(self.size * self.size)))
 
         # BFS从目标状态反向搜索
         queue = deque([(goal, 0)])
@@ -83,197 +104,93 @@ class PatternDatabase:
 
         return neighbors
 
-    def lookup(self, state: Tuple[int]) -> int:
-        """查询状态到目标的距离"""
-        pattern = self._extract_pattern(state)
-        return self.db.get(pattern, 0)
-
-
-class BidirectionalIDAstar:
-    """双向IDA*搜索"""
-
-    def __init__(self, initial: Tuple[int], goal: Tuple[int], heuristic_func):
-        self.initial = initial
-        self.goal = goal
-        self.heuristic = heuristic_func
-        self.size = 4
-        self.nodes_explored = 0
-        self.solution_found = False
-        self.solution_path = []
-        self.lock = threading.Lock()
-
-    def _get_neighbors(self, state: Tuple[int], last_move: Optional[int] = None):
-        """获取后继状态"""
-        zero_pos = state.index(0)
-        zero_row, zero_col = divmod(zero_pos, self.size)
-        neighbors = []
-
-        moves = [(-1, 0), (1, 0), (0, -1), (0, 1)]
-
-        for move_idx, (dr, dc) in enumerate(moves):
-            if last_move is not None:
-                if (
-                    (move_idx == 0 and last_move == 1)
-                    or (move_idx == 1 and last_move == 0)
-                    or (move_idx == 2 and last_move == 3)
-                    or (move_idx == 3 and last_move == 2)
-                ):
-                    continue
-
-            new_row, new_col = zero_row + dr, zero_col + dc
-            if 0 <= new_row < self.size and 0 <= new_col < self.size:
-                new_pos = new_row * self.size + new_col
-                state_list = list(state)
-                state_list[zero_pos], state_list[new_pos] = (
-                    state_list[new_pos],
-                    state_list[zero_pos],
-                )
-                neighbors.append((tuple(state_list), move_idx))
-
-        return neighbors
-
-    def _search(
-        self,
-        state: Tuple[int],
-        g: int,
-        bound: int,
-        path: List[int],
-        forward_table: dict,
-        backward_table: dict,
-        is_forward: bool,
-    ):
-        """单向搜索"""
-        with self.lock:
-            if self.solution_found:
-                return True, bound
-            self.nodes_explored += 1
-
-        h = self.heuristic(state)
-        f = g + h
-
-        if f > bound:
-            return False, f
+    def _to_table(self) -> np.ndarray:
+        """把 BFS 得到的 dict 压成按位置排名的稠密数组"""
+        table = np.zeros(perm(self.size * self.size, len(self.tiles)), dtype=np.uint8)
+        for pattern, dist in self.db.items():
+            table[rank_positions([pattern.index(t) for t in self.tiles], self.factors)] = dist
+        return table
 
-        # 检查是否在另一方向的搜索表中
-        opposite_table = backward_table if is_forward else forward_table
-        if state in opposite_table:
-            # 找到交汇点
-            with self.lock:
-                if not self.solution_found:
-                    self.solution_found = True
-                    self.solution_path = path
-            return True, bound
-
-        # 转换表剪枝
-        current_table = forward_table if is_forward else backward_table
-        if state in current_table and current_table[state] <= g:
-            return False, float("inf")
-        current_table[state] = g
-
-        min_next = float("inf")
-        last_move = path[-1] if path else None
+    def to_pattern_db(self) -> PatternDB:
+        return PatternDB(self.tiles, self.table, self.size, self.size, additive=False)
 
-        for next_state, move in self._get_neighbors(state, last_move):
-            path.append(move)
-            found, next_bound = self._search(
-                next_state,
-                g + 1,
-                bound,
-                path,
-                forward_table,
-                backward_table,
-                is_forward,
-            )
-            if found:
-                return True, bound
-            min_next = min(min_next, next_bound)
-            path.pop()
-
-        return False, min_next
-
-    def solve(self, max_iterations: int = 50):
-        """执行双向搜索"""
-        bound_forward = self.heuristic(self.initial)
-        bound_backward = self.heuristic(self.goal)
-
-        for iteration in range(max_iterations):
-            if self.solution_found:
-                break
-
-            forward_table = {}
-            backward_table = {}
-            path_forward = []
-            path_backward = []
-
-            # 前向搜索
-            found_f, next_f = self._search(
-                self.initial,
-                0,
-                bound_forward,
-                path_forward,
-                forward_table,
-                backward_table,
-                True,
-            )
-
-            if found_f:
-                return self.solution_path
-
-            # 后向搜索
-            found_b, next_b = self._search(
-                self.goal,
-                0,
-                bound_backward,
-                path_backward,
-                backward_table,
-                forward_table,
-                False,
-            )
-
-            if found_b:
-                return self.solution_path
-
-            bound_forward = next_f
-            bound_backward = next_b
-
-        return None
+    def lookup(self, state: Tuple[int]) -> int:
+        """查询状态到目标的距离"""
+        return int(self.table[rank_positions([state.index(t) for t in self.tiles], self.factors)])
+
+
+def load_row_databases(path: Optional[str] = ROW_PDB_FILE) -> List[PatternDatabase]:
+    """按行的模式数据库：文件可用就 mmap 加载，否则构建并存盘（path 为 None 时不读写文件）"""
+    if path is not None:
+        try:
+            dbs, goal = load_databases(path)
+            if goal == tuple(range(16)) and [list(db.tiles) for db in dbs] == ROW_PATTERNS \
+                    and not any(db.additive for db in dbs):
+                return [PatternDatabase(db.tiles, 4, db.table) for db in dbs]
+        except (FileNotFoundError, ValueError):
+            pass
+    print("\n初始化模式数据库...")
+    dbs = [PatternDatabase(tiles, 4) for tiles in ROW_PATTERNS]
+    if path is not None:
+        save_databases(path, [db.to_pattern_db() for db in dbs])
+    return dbs
 
 
 class AdvancedFifteenPuzzleSolver:
     """高级十五数码求解器 - 整合所有优化"""
 
-    def __init__(self, initial_state: List[List[int]]):
-        self.initial = self._flatten(initial_state)
-        self.goal = tuple(range(16))
-        self.size = 4
+    def __init__(self, initial_state: List[List[int]], pdb_file: Optional[str] = ROW_PDB_FILE,
+                 heuristic: str = "rows", pattern: Optional[str] = None, tt_bits: int = DEFAULT_BITS):
+        """
+        :param initial_state: 任意 width x height 的盘面（3x3、4x4、5x5 ...），目标是 0..n-1，空格在左上角
+        :param pdb_file: 模式数据库文件，存在就直接加载，不存在就构建后写入；None 表示每次都重新构建
+        :param heuristic: 'rows' (按行的模式数据库取 max，只有 4x4 有), 'additive' (不相交加性模式数据库求和)
+        :param pattern: 加性模式数据库的分组，见 patterndb.SIZE_PRESETS（4x4 的 '5-5-5'、'6-6-3'，
+                        3x3 的 '4-4'、'8'，5x5 的 '5-5-5-5-4'），默认按尺寸取 DEFAULT_PATTERNS
+        :param tt_bits: 置换表有 2^tt_bits 个桶（每桶两个槽），大小固定，跨迭代保留
+        """
+        self.width, self.height, self.initial = parse_board(initial_state)
+        self.n = self.width * self.height
+        self.puzzle = SlidingPuzzle(self.width, self.height)
+        self.goal = self.puzzle.goal
         self.moves = [(-1, 0), (1, 0), (0, -1), (0, 1)]
         self.move_names = ["上", "下", "左", "右"]
         self.nodes_explored = 0
+        self.tt = TranspositionTable(self.n, tt_bits)
+        self.heuristic_mode = heuristic
+        self.pattern = pattern or DEFAULT_PATTERNS.get((self.width, self.height))
+        self.stats = {}
 
         # 预计算曼哈顿距离
         self._precompute_manhattan()
 
-        # 构建模式数据库（分成多个小模式）
-        print("\n初始化模式数据库...")
-        self.pattern_dbs = [
-            PatternDatabase([0, 1, 2, 3], 4),  # 第一行
-            PatternDatabase([4, 5, 6, 7], 4),  # 第二行
-            PatternDatabase([8, 9, 10, 11], 4),  # 第三行
-        ]
+        if heuristic == "additive":
+            # 每张表只计自己那组数字的移动，各表相加
+            groups = presets_for(self.width, self.height).get(self.pattern)
+            if groups is None:
+                raise ValueError(f"{self.width}x{self.height} 没有名为 {self.pattern} 的分组")
+            self.pattern_dbs = []
+            self.additive = load_or_build(groups, width=self.width, height=self.height, verbose=True)
+        elif heuristic == "rows":
+            # 模式数据库（按行分成多个小模式），其他尺寸只用曼哈顿 + 线性冲突
+            self.pattern_dbs = load_row_databases(pdb_file) if (self.width, self.height) == (4, 4) else []
+            self.additive = None
+        else:
+            raise ValueError(f"未知的启发式: {heuristic}")
 
     def _flatten(self, state: List[List[int]]) -> Tuple[int]:
         return tuple(val for row in state for val in row)
 
     def _to_2d(self, state: Tuple[int]) -> List[List[int]]:
-        return [list(state[i : i + 4]) for i in range(0, 16, 4)]
+        return self.puzzle.to_rows(state)
 
     def _precompute_manhattan(self):
         self.manhattan_table = {}
-        for num in range(16):
+        for num in range(self.n):
             self.manhattan_table[num] = {}
-            goal_row, goal_col = divmod(num, 4)
-            for pos in range(16):
-                curr_row, curr_col = divmod(pos, 4)
+            goal_row, goal_col = divmod(num, self.width)
+            for pos in range(self.n):
+                curr_row, curr_col = divmod(pos, self.width)
                 self.manhattan_table[num][pos] = abs(curr_row - goal_row) + abs(
                     curr_col - goal_col
                 )
@@ -288,41 +205,45 @@ class AdvancedFifteenPuzzleSolver:
     def _linear_conflict(self, state: Tuple[int]) -> int:
         conflict = 0
 
+        w, h = self.width, self.height
+
         # 行冲突
-        for row in range(4):
-            for col1 in range(4):
-                pos1 = row * 4 + col1
+        for row in range(h):
+            for col1 in range(w):
+                pos1 = row * w + col1
                 tile1 = state[pos1]
-                if tile1 == 0 or tile1 // 4 != row:
+                if tile1 == 0 or tile1 // w != row:
                     continue
-                for col2 in range(col1 + 1, 4):
-                    pos2 = row * 4 + col2
+                for col2 in range(col1 + 1, w):
+                    pos2 = row * w + col2
                     tile2 = state[pos2]
-                    if tile2 == 0 or tile2 // 4 != row:
+                    if tile2 == 0 or tile2 // w != row:
                         continue
-                    if tile1 % 4 > tile2 % 4:
+                    if tile1 % w > tile2 % w:
                         conflict += 2
 
         # 列冲突
-        for col in range(4):
-            for row1 in range(4):
-                pos1 = row1 * 4 + col
+        for col in range(w):
+            for row1 in range(h):
+                pos1 = row1 * w + col
                 tile1 = state[pos1]
-                if tile1 == 0 or tile1 % 4 != col:
+                if tile1 == 0 or tile1 % w != col:
                     continue
-                for row2 in range(row1 + 1, 4):
-                    pos2 = row2 * 4 + col
+                for row2 in range(row1 + 1, h):
+                    pos2 = row2 * w + col
                     tile2 = state[pos2]
-                    if tile2 == 0 or tile2 % 4 != col:
+                    if tile2 == 0 or tile2 % w != col:
                         continue
-                    if tile1 // 4 > tile2 // 4:
+                    if tile1 // w > tile2 // w:
                         conflict += 2
 
         return conflict
 
     def _pattern_database_heuristic(self, state: Tuple[int]) -> int:
         """使用模式数据库的启发式（可采纳的）"""
-        return max(db.lookup(state) for db in self.pattern_dbs)
+        if self.additive is not None:
+            return self.additive(state)
+        return max((db.lookup(state) for db in self.pattern_dbs), default=0)
 
     def _heuristic(self, state: Tuple[int]) -> int:
         """超强启发式：综合多种启发式的最大值"""
@@ -332,7 +253,7 @@ class AdvancedFifteenPuzzleSolver:
 
     def _get_neighbors(self, state: Tuple[int], last_move: Optional[int] = None):
         zero_pos = state.index(0)
-        zero_row, zero_col = divmod(zero_pos, 4)
+        zero_row, zero_col = divmod(zero_pos, self.width)
         neighbors = []
 
         for move_idx, (dr, dc) in enumerate(self.moves):
@@ -346,8 +267,8 @@ class AdvancedFifteenPuzzleSolver:
                     continue
 
             new_row, new_col = zero_row + dr, zero_col + dc
-            if 0 <= new_row < 4 and 0 <= new_col < 4:
-                new_pos = new_row * 4 + new_col
+            if 0 <= new_row < self.height and 0 <= new_col < self.width:
+                new_pos = new_row * self.width + new_col
                 state_list = list(state)
                 state_list[zero_pos], state_list[new_pos] = (
                     state_list[new_pos],
@@ -358,10 +279,10 @@ class AdvancedFifteenPuzzleSolver:
         return neighbors
 
     def _ida_search(
-        self, state: Tuple[int], g: int, bound: int, path: List[int], trans_table: dict
+        self, state: Tuple[int], g: int, bound: int, path: List[int], key: int, parent_h: float = float("inf")
     ) -> Tuple[bool, int]:
         self.nodes_explored += 1
-        h = self._heuristic(state)
+        h = max(self._heuristic(state), self.tt.get(key))
         f = g + h
 
         if f > bound:
@@ -370,17 +291,17 @@ class AdvancedFifteenPuzzleSolver:
         if h == 0:
             return True, f
 
-        if state in trans_table and trans_table[state] <= g:
-            return False, float("inf")
-        trans_table[state] = g
-
         min_next = float("inf")
         last_move = path[-1] if path else None
+        zero_pos = state.index(0)
+        zobrist = self.tt.zobrist
 
         for next_state, move in self._get_neighbors(state, last_move):
+            new_pos = next_state.index(0)
+            tile = state[new_pos]
             path.append(move)
             found, next_bound = self._ida_search(
-                next_state, g + 1, bound, path, trans_table
+                next_state, g + 1, bound, path, key ^ zobrist[tile][new_pos] ^ zobrist[tile][zero_pos], h
             )
 
             if found:
@@ -389,86 +310,54 @@ class AdvancedFifteenPuzzleSolver:
             min_next = min(min_next, next_bound)
             path.pop()
 
+        # 子树里没有解：到目标至少还要 min_next - g 步（退回父节点那一步没有展开，用父节点的启发值兜底）
+        lower = min(min_next, g + 1 + parent_h) - g
+        if lower != float("inf"):
+            self.tt.put(key, int(lower), bound - g)
         return False, min_next
 
-    def _is_solvable(self) -> bool:
-        inversions = 0
-        state = [x for x in self.initial if x != 0]
-
-        for i in range(len(state)):
-            for j in range(i + 1, len(state)):
-                if state[i] > state[j]:
-                    inversions += 1
-
-        zero_row = self.initial.index(0) // 4
+    def _permutation_parity(self, state: Tuple[int]) -> int:
+        """逆序数（宽度为偶数时再加空格所在行）的奇偶性，每一步都保持不变"""
+        return permutation_parity(state, self.width)
 
-        if (zero_row % 2 == 0 and inversions % 2 == 1) or (
-            zero_row % 2 == 1 and inversions % 2 == 0
-        ):
-            return True
-        return False
+    def _is_solvable(self) -> bool:
+        # 与目标状态的奇偶性相同才能到达（目标的空格在左上角）
+        return self._permutation_parity(self.initial) == self._permutation_parity(self.goal)
 
-    def solve_parallel(self, num_workers: int = 4) -> Optional[List[str]]:
-        """并行IDA*搜索：多个线程探索不同分支"""
+    def solve_parallel(self, num_workers: Optional[int] = None) -> Optional[List[str]]:
+        """并行IDA*：多个进程分担深度 8 的所有局面，每轮共享同一个限制，找到解后通知其他进程停下"""
         print("\n使用并行IDA*搜索...")
-        print(f"工作线程数: {num_workers}")
 
         if not self._is_solvable():
             print("该问题无解！")
             return None
 
         start_time = time.time()
-        bound = self._heuristic(self.initial)
-
-        solution = [None]
-        solution_lock = threading.Lock()
-
-        def worker_search(worker_id: int, initial_moves: List[int]):
-            """工作线程"""
-            path = list(initial_moves)
-            trans_table = {}
-
-            # 从初始移动开始搜索
-            state = self.initial
-            g = 0
-            for move in initial_moves:
-                neighbors = self._get_neighbors(state)
-                state = next(s for s, m in neighbors if m == move)
-                g += 1
-
-            found, _ = self._ida_search(state, g, bound, path, trans_table)
-
-            if found:
-                with solution_lock:
-                    if solution[0] is None:
-                        solution[0] = path
-
-        # 获取初始的多个分支
-        initial_neighbors = self._get_neighbors(self.initial)
-
-        with ThreadPoolExecutor(max_workers=num_workers) as executor:
-            futures = []
-            for i, (_, move) in enumerate(initial_neighbors):
-                future = executor.submit(worker_search, i, [move])
-                futures.append(future)
-
-            for future in as_completed(futures):
-                if solution[0] is not None:
-                    break
-
-        if solution[0]:
-            elapsed = time.time() - start_time
-            print(f"✓ 找到解！")
-            print(f"  步数: {len(solution[0])}")
-            print(f"  耗时: {elapsed:.3f} 秒")
-            return [self.move_names[move] for move in solution[0]]
-
-        return None
+        pdb_path = None
+        if self.additive is not None:
+            pdb_path = default_path(presets_for(self.width, self.height)[self.pattern], self.width, self.height)
+        with ParallelIDAStar(pdb_path, self.width, self.height, workers=num_workers) as search:
+            print(f"工作进程数: {search.workers}")
+            path = search.solve(self.initial)
+        self.nodes_explored = search.nodes_explored
+
+        if path is None:
+            return None
+        elapsed = time.time() - start_time
+        self.stats = {"method": "parallel", "heuristic": self.heuristic_mode, "length": len(path),
+                      "nodes": search.nodes_explored, "time": elapsed}
+        print(f"✓ 找到解！")
+        print(f"  步数: {len(path)}")
+        print(f"  迭代: {search.iterations}（每轮 {search.frontier_size} 个任务）")
+        print(f"  总探索节点: {search.nodes_explored}")
+        print(f"  耗时: {elapsed:.3f} 秒")
+        return [self.move_names[move] for move in path]
 
     def solve(self, method: str = "ida") -> Optional[List[str]]:
         """
         求解十五数码
-        :param method: 'ida' (标准IDA*), 'bidirectional' (双向IDA*), 'parallel' (并行IDA*)
+        :param method: 'ida' (标准IDA*), 'fast' (原地修改盘面、增量启发式的 IDA*),
+                       'bidirectional' (双向 MM), 'parallel' (多进程IDA*)
         """
         print("=" * 70)
         print("开始求解十五数码问题（高级版）")
@@ -485,49 +374,77 @@ class AdvancedFifteenPuzzleSolver:
         if method == "parallel":
             return self.solve_parallel()
 
+        elif method == "fast":
+            print(f"\n使用增量 IDA*（曼哈顿 + 线性冲突{'，加性模式数据库' if self.additive else ''}）...")
+            engine = FastIDAStar(self.width, self.height, pdb=self.additive)
+            path = engine.solve(self.initial)
+            self.nodes_explored = engine.nodes_explored
+            if path is None:
+                return None
+            elapsed = time.time() - start_time
+            self.stats = {"method": method, "heuristic": self.heuristic_mode, "length": len(path),
+                          "nodes": engine.nodes_explored, "time": elapsed}
+            print(f"✓ 找到解！")
+            print(f"  步数: {len(path)}")
+            print(f"  迭代: {engine.iterations}")
+            print(f"  总探索节点: {engine.nodes_explored}")
+            print(f"  耗时: {elapsed:.3f} 秒")
+            print(f"  速度: {engine.nodes_explored / max(engine.elapsed, 1e-9):.0f} 节点/秒")
+            return [self.move_names[move] for move in path]
+
         elif method == "bidirectional":
-            print("\n使用双向IDA*搜索...")
-            bidirectional = BidirectionalIDAstar(
-                self.initial, self.goal, self._heuristic
-            )
-            path = bidirectional.solve()
+            print(f"\n使用双向 MM 搜索（正向{'加性模式数据库' if self.additive else '曼哈顿 + 线性冲突'}，反向曼哈顿 + 线性冲突）...")
+            bidirectional = MMSearch(self.width, self.height, self.goal, pdb=self.additive)
+            path = bidirectional.solve(self.initial)
+            self.nodes_explored = bidirectional.nodes_explored
 
-            if path:
+            if path is not None:
                 elapsed = time.time() - start_time
+                self.stats = {"method": method, "heuristic": self.heuristic_mode, "length": len(path),
+                              "nodes": bidirectional.nodes_explored, "time": elapsed}
                 print(f"✓ 找到解！")
                 print(f"  步数: {len(path)}")
-                print(f"  探索节点: {bidirectional.nodes_explored}")
+                print(f"  扩展节点: {bidirectional.nodes_explored}（正向 {bidirectional.expanded[0]}，"
+                      f"反向 {bidirectional.expanded[1]}）")
+                print(f"  保存局面: {bidirectional.stored}")
                 print(f"  耗时: {elapsed:.3f} 秒")
                 return [self.move_names[move] for move in path]
             return None
 
         else:  # 标准IDA*
-            print(f"\n使用增强IDA*搜索（模式数据库 + 线性冲突）...")
+            print(f"\n使用增强IDA*搜索（模式数据库 + 线性冲突，启发式: {self.heuristic_mode}）...")
             bound = self._heuristic(self.initial)
             path = []
 
             print(f"初始启发式估计: {bound} 步\n")
 
+            key = self.tt.hash(self.initial)
             iteration = 0
             while True:
                 iteration += 1
-                trans_table = {}
                 nodes_before = self.nodes_explored
+                hits_before = self.tt.hits
 
                 print(f"迭代 {iteration}: 深度限制 = {bound}", end=" ")
 
                 found, next_bound = self._ida_search(
-                    self.initial, 0, bound, path, trans_table
+                    self.initial, 0, bound, path, key
                 )
 
                 nodes_this_iter = self.nodes_explored - nodes_before
-                print(f"| 节点: {nodes_this_iter} | 表: {len(trans_table)}")
+                print(f"| 节点: {nodes_this_iter} | 置换表命中: {self.tt.hits - hits_before}")
 
                 if found:
                     elapsed = time.time() - start_time
+                    tt = self.tt.info()
+                    self.stats = {"method": method, "heuristic": self.heuristic_mode, "length": len(path),
+                                  "nodes": self.nodes_explored, "time": elapsed,
+                                  "tt_hits": tt["hits"], "tt_hit_rate": tt["hit_rate"]}
                     print(f"\n✓ 找到解！")
                     print(f"  步数: {len(path)}")
                     print(f"  总探索节点: {self.nodes_explored}")
+                    print(f"  置换表: 命中 {tt['hits']}/{tt['probes']} ({tt['hit_rate']:.1%})，"
+                          f"{tt['slots']} 个槽，覆盖 {tt['replaced']} 次")
                     print(f"  耗时: {elapsed:.3f} 秒")
                     print(f"  速度: {self.nodes_explored/elapsed:.0f} 节点/秒")
 
@@ -545,11 +462,27 @@ class AdvancedFifteenPuzzleSolver:
         print()
 
 
+def compare_heuristics(initial_state: List[List[int]], modes=("rows", "additive"),
+                       pattern: Optional[str] = None) -> List[dict]:
+    """用不同的启发式分别求解同一个局面，打印并返回各自的步数、节点数和耗时"""
+    results = []
+    for mode in modes:
+        solver = AdvancedFifteenPuzzleSolver(initial_state, heuristic=mode, pattern=pattern)
+        solver.solve(method="ida")
+        results.append(solver.stats)
+    print(f"\n{'启发式':<10}{'步数':>6}{'节点':>12}{'耗时(秒)':>10}")
+    for r in results:
+        print(f"{r['heuristic']:<12}{r['length']:>6}{r['nodes']:>14}{r['time']:>11.3f}")
+    return results
+
+
 # 测试代码
 if __name__ == "__main__":
     # 困难问题测试
     print("测试困难问题（约30-40步）")
-    difficult_state = [[5, 1, 2, 4], [9, 6, 3, 8], [13, 15, 10, 11], [14, 0, 7, 12]]
+    # 目标是空格在左上角的 0..15；这是空格在右下角版本的 [[5,1,2,4],[9,6,3,8],[13,15,10,11],[14,0,7,12]]
+    # 旋转 180 度并把数字 t 换成 16-t 后的等价局面，最优步数不变
+    difficult_state = [[4, 9, 0, 2], [5, 6, 1, 3], [8, 13, 10, 7], [12, 14, 15, 11]]
 
     solver = AdvancedFifteenPuzzleSolver(difficult_state)
 
@@ -568,9 +501,9 @@ if __name__ == "__main__":
     # 重置节点计数器
     solver.nodes_explored = 0
 
-    # 方法2: 双向IDA*
+    # 方法2: 双向 MM
     print("\n" + "=" * 70)
-    print("方法 2: 双向IDA*")
+    print("方法 2: 双向 MM")
     print("=" * 70)
     solution2 = solver.solve(method="bidirectional")
     if solution2:
@@ -580,13 +513,28 @@ if __name__ == "__main__":
             else f"\n解法: {' -> '.join(solution2)}"
         )
 
+    # 方法3: 启发式对比（按行取 max vs 加性模式数据库），42 步的局面
+    print("\n" + "=" * 70)
+    print("方法 3: 启发式对比")
+    print("=" * 70)
+    compare_heuristics([[2, 13, 0, 6], [9, 4, 7, 10], [5, 15, 11, 3], [8, 12, 14, 1]])
+
     # 简单测试
     print("\n\n" + "=" * 70)
     print("测试简单问题")
     print("=" * 70)
-    simple_state = [[1, 2, 3, 4], [5, 6, 7, 8], [9, 10, 11, 12], [13, 14, 0, 15]]
+    simple_state = [[1, 0, 2, 3], [4, 5, 6, 7], [8, 9, 10, 11], [12, 13, 14, 15]]
 
     solver_simple = AdvancedFifteenPuzzleSolver(simple_state)
     solution = solver_simple.solve(method="ida")
     if solution:
         print(f"\n解法: {' -> '.join(solution)}")
+
+    # 其他尺寸：3x3（八数码）用 8 个数字一张的模式数据库，就是精确距离
+    print("\n\n" + "=" * 70)
+    print("测试 3x3")
+    print("=" * 70)
+    solver_small = AdvancedFifteenPuzzleSolver([[1, 2, 6], [7, 8, 5], [0, 4, 3]], heuristic="additive")
+    solution = solver_small.solve(method="fast")
+    if solution:
+        print(f"\n解法: {' -> '.join(solution)}")
@@ -0,0 +1,96 @@
+# 15puzzle/sliding.py
+# 任意 width x height 的滑块拼图：局面压成一个整数
+#
+#   每格占 bits 位（能放下 n-1 的最少位数），第 pos 格放在第 bits*pos 位开始，空格为 0
+#     3x3:  9 格 x 4 位 = 36 位
+#     4x4: 16 格 x 4 位 = 64 位
+#     5x5: 25 格 x 5 位 = 125 位
+#   一个 125 位的 int 约 44 字节，同样局面的 25 元组要 250 多字节，放进集合/字典时省得多，哈希也更快
+#   走一步只改两格：取出数字，在原位置异或掉，在空格位置或上
+#
+# 目标状态默认是 0..n-1（空格在左上角），和 patterndb、ida 一致
+
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+from ida import permutation_parity
+from patterndb import DIRECTIONS, neighbor_table
+
+
+def parse_board(rows: Sequence[Sequence[int]]) -> Tuple[int, int, Tuple[int, ...]]:
+    """二维盘面 -> (width, height, 按行展开的局面)"""
+    height = len(rows)
+    width = len(rows[0]) if height else 0
+    if width < 2 or height < 2 or any(len(row) != width for row in rows):
+        raise ValueError("盘面必须是至少 2x2 的矩形")
+    state = tuple(v for row in rows for v in row)
+    if sorted(state) != list(range(width * height)):
+        raise ValueError(f"盘面必须是 0..{width * height - 1} 的排列")
+    return width, height, state
+
+
+class SlidingPuzzle:
+    """盘面几何 + 整数编码的局面"""
+
+    def __init__(self, width: int = 4, height: int = 4, goal: Optional[Sequence[int]] = None):
+        self.width = width
+        self.height = height
+        self.n = n = width * height
+        self.bits = (n - 1).bit_length()
+        self.mask = (1 << self.bits) - 1
+        self.goal = tuple(goal) if goal is not None else tuple(range(n))
+        self.goal_key = self.pack(self.goal)
+        self.neighbors = neighbor_table(width, height)
+        self.shifts = [self.bits * pos for pos in range(n)]
+
+    def pack(self, state: Sequence[int]) -> int:
+        key = 0
+        bits = self.bits
+        for pos, tile in enumerate(state):
+            key |= tile << (bits * pos)
+        return key
+
+    def unpack(self, key: int) -> Tuple[int, ...]:
+        bits, mask = self.bits, self.mask
+        return tuple((key >> (bits * pos)) & mask for pos in range(self.n))
+
+    def tile_at(self, key: int, pos: int) -> int:
+        return (key >> self.shifts[pos]) & self.mask
+
+    def blank_of(self, key: int) -> int:
+        mask, shifts = self.mask, self.shifts
+        for pos in range(self.n):
+            if not (key >> shifts[pos]) & mask:
+                return pos
+        raise ValueError("局面里没有空格")
+
+    def move(self, key: int, blank: int, new: int) -> int:
+        """空格从 blank 移到 new（new 上的数字移到 blank）"""
+        shifts = self.shifts
+        tile = (key >> shifts[new]) & self.mask
+        return key ^ (tile << shifts[new]) ^ (tile << shifts[blank])
+
+    def successors(self, key: int, blank: int) -> Iterator[Tuple[int, int, int]]:
+        """产出 (方向, 新局面, 空格新位置)"""
+        for d in range(len(DIRECTIONS)):
+            new = self.neighbors[d][blank]
+            if new >= 0:
+                yield d, self.move(key, blank, new), new
+
+    def is_solvable(self, state: Sequence[int]) -> bool:
+        return permutation_parity(state, self.width) == permutation_parity(self.goal, self.width)
+
+    def apply(self, state: Sequence[int], moves: Sequence[int]) -> Tuple[int, ...]:
+        """按走法（空格的移动方向）走完，返回最后的局面；走出边界抛 ValueError"""
+        board = list(state)
+        blank = board.index(0)
+        for d in moves:
+            new = self.neighbors[d][blank]
+            if new < 0:
+                raise ValueError(f"走法 {d} 出界")
+            board[blank], board[new] = board[new], 0
+            blank = new
+        return tuple(board)
+
+    def to_rows(self, state: Sequence[int]) -> List[List[int]]:
+        w = self.width
+        return [list(state[i:i + w]) for i in range(0, self.n, w)]
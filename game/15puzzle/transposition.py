@@ -0,0 +1,105 @@
+# 15puzzle/transposition.py
+# 固定大小的置换表：内存在创建时一次分配好，搜多深都不会再涨
+#
+#   - 键是 64 位 Zobrist 哈希：每个 (数字, 位置) 一个随机数，局面的哈希是各项异或，
+#     走一步只要异或掉数字的旧位置、异或上新位置
+#   - 值是"这个局面到目标至少还要几步"：子树搜完没找到解时，子节点 f 的最小值减去 g 就是一个更紧的下界。
+#     这个值只和局面有关、和本轮的限制无关，所以跨迭代一直有效，不用每轮清空；
+#     同一轮里再次碰到同一个局面时 g + 下界一定超过限制，重复的子树自然被剪掉
+#   - 每个桶两个槽：0 号按剩余深度（bound - g，越大子树越大）优先保留，1 号总是覆盖，
+#     深的结果不会被大量浅层节点冲掉，新的结果也总有地方放
+
+import random
+from array import array
+from typing import Sequence
+
+DEFAULT_BITS = 20   # 2^20 个桶，每桶 2 槽，约 20MB
+MAX_VALUE = 255
+
+
+class TranspositionTable:
+    """Zobrist 哈希 -> (下界, 剩余深度)；get 查不到返回 0（任何局面都满足的下界）"""
+
+    def __init__(self, n: int = 16, bits: int = DEFAULT_BITS, seed: int = 15):
+        rng = random.Random(seed)
+        self.zobrist = [[rng.getrandbits(64) for _ in range(n)] for _ in range(n)]
+        self.bits = bits
+        self.mask = (1 << bits) - 1
+        size = 2 << bits
+        self.keys = array("Q", bytes(8 * size))
+        self.values = bytearray(size)
+        self.depths = bytearray(size)
+        self.probes = 0
+        self.hits = 0
+        self.stores = 0
+        self.replaced = 0
+
+    def __len__(self) -> int:
+        """已经用掉的槽数"""
+        return len(self.keys) - self.keys.count(0)
+
+    def hash(self, state: Sequence[int]) -> int:
+        zobrist = self.zobrist
+        key = 0
+        for pos, tile in enumerate(state):
+            if tile:
+                key ^= zobrist[tile][pos]
+        return key
+
+    def get(self, key: int) -> int:
+        self.probes += 1
+        i = (key & self.mask) << 1
+        keys = self.keys
+        if keys[i] == key:
+            self.hits += 1
+            return self.values[i]
+        if keys[i + 1] == key:
+            self.hits += 1
+            return self.values[i + 1]
+        return 0
+
+    def put(self, key: int, value: int, depth: int):
+        i = (key & self.mask) << 1
+        keys, values, depths = self.keys, self.values, self.depths
+        value = min(value, MAX_VALUE)
+        depth = min(depth, MAX_VALUE)
+        self.stores += 1
+        if keys[i] == key:
+            values[i] = max(values[i], value)
+            depths[i] = max(depths[i], depth)
+            return
+        if not keys[i]:
+            keys[i], values[i], depths[i] = key, value, depth
+            return
+        if keys[i + 1] == key:
+            value = max(values[i + 1], value)
+            depth = max(depths[i + 1], depth)
+            if depth < depths[i]:
+                values[i + 1] = value
+                depths[i + 1] = depth
+                return
+        elif keys[i + 1]:
+            self.replaced += 1
+        if depth >= depths[i]:
+            # 新结果更深：占 0 号槽，原来的降到 1 号槽
+            keys[i + 1], values[i + 1], depths[i + 1] = keys[i], values[i], depths[i]
+            keys[i], values[i], depths[i] = key, value, depth
+        else:
+            keys[i + 1], values[i + 1], depths[i + 1] = key, value, depth
+
+    def clear(self):
+        size = len(self.keys)
+        self.keys = array("Q", bytes(8 * size))
+        self.values = bytearray(size)
+        self.depths = bytearray(size)
+        self.probes = self.hits = self.stores = self.replaced = 0
+
+    def info(self) -> dict:
+        return {
+            "slots": len(self.keys),
+            "probes": self.probes,
+            "hits": self.hits,
+            "hit_rate": self.hits / self.probes if self.probes else 0.0,
+            "stores": self.stores,
+            "replaced": self.replaced,
+        }
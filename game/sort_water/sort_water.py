@@ -43,9 +43,25 @@ class WaterSortSolver:
         return color_count
 
     def change_puzzle(self, bottles: list[list[int]]):
+        for bottle in bottles:
+            if len(bottle) > self.max_capacity or any(not 1 <= c <= 15 for c in bottle):
+                raise ValueError(f"每个瓶子最多 {self.max_capacity} 格，颜色必须在 1-15 之间: {bottle}")
         self.initial_state = [list(b) for b in bottles]
         self.color_count = self._count_colors()
 
+        # 压缩编码：整个局面是一个 int，每格 4 位（颜色 1-15，0 为空），每个瓶子 max_capacity 格
+        # 0 号瓶子放在最高位，瓶内从瓶底到瓶口由高到低，
+        # 这样两个局面比较大小和 list[list[int]] 的字典序一样，A* 堆里同 f 值的出队顺序不变
+        cap = self.max_capacity
+        count = len(bottles)
+        self.bottle_bits = 4 * cap
+        self.bottle_mask = (1 << self.bottle_bits) - 1
+        self.shifts = [self.bottle_bits * (count - 1 - i) for i in range(count)]
+        # ones[k]：最低 k 格每格为 1，乘上颜色就是 k 格同色
+        self.ones = [sum(1 << (4 * s) for s in range(k)) for k in range(cap + 1)]
+        # bottom_ones[k]：瓶底起 k 格每格为 1，单色瓶子 == 颜色 * bottom_ones[长度]
+        self.bottom_ones = [self.ones[k] << (4 * (cap - k)) for k in range(cap + 1)]
+
     def gen_some_valid_puzzle(self, count: int = 100):
         for _ in range(count):
             puzzle = self.gen_new_puzzle()
@@ -288,22 +304,181 @@ class WaterSortSolver:
         moves.sort(reverse=True)
         return [(i, j) for _, i, j in moves]
 
+    def encode(self, bottles: list[list[int]]) -> int:
+        """list[list[int]] -> 压缩的 int"""
+        cap = self.max_capacity
+        state = 0
+        for bottle, shift in zip(bottles, self.shifts):
+            for s, color in enumerate(bottle):
+                state |= color << (shift + 4 * (cap - 1 - s))
+        return state
+
+    def decode(self, state: int) -> list[list[int]]:
+        """压缩的 int -> list[list[int]]"""
+        cap = self.max_capacity
+        bottles = []
+        for shift in self.shifts:
+            field = (state >> shift) & self.bottle_mask
+            bottle = []
+            for s in range(cap):
+                color = (field >> (4 * (cap - 1 - s))) & 15
+                if not color:
+                    break
+                bottle.append(color)
+            bottles.append(bottle)
+        return bottles
+
+    def _top_of(self, field: int):
+        """单个瓶子（压缩）的 (长度, 顶部颜色, 顶部同色数量)，空瓶为 (0, 0, 0)"""
+        if not field:
+            return 0, 0, 0
+        # 颜色不为 0，最低的非零位一定落在瓶口那一格
+        low = ((field & -field).bit_length() - 1) & ~3
+        length = self.max_capacity - low // 4
+        color = (field >> low) & 15
+        count = 1
+        while count < length and (field >> (low + 4 * count)) & 15 == color:
+            count += 1
+        return length, color, count
+
+    def is_valid_pour_packed(self, state: int, from_idx: int, to_idx: int):
+        """is_valid_pour 的压缩版本"""
+        from_field = (state >> self.shifts[from_idx]) & self.bottle_mask
+        to_field = (state >> self.shifts[to_idx]) & self.bottle_mask
+        if not from_field or to_field & 15:
+            return False
+        if not to_field:
+            return True
+        from_low = ((from_field & -from_field).bit_length() - 1) & ~3
+        to_low = ((to_field & -to_field).bit_length() - 1) & ~3
+        return (from_field >> from_low) & 15 == (to_field >> to_low) & 15
+
+    def pour_packed(self, state: int, from_idx: int, to_idx: int):
+        """pour_water 的压缩版本：只做几次移位和加减，返回 (新局面, 倒了几份)"""
+        cap = self.max_capacity
+        from_shift, to_shift = self.shifts[from_idx], self.shifts[to_idx]
+        length, color, count = self._top_of((state >> from_shift) & self.bottle_mask)
+        to_field = (state >> to_shift) & self.bottle_mask
+        to_length = cap - (((to_field & -to_field).bit_length() - 1) >> 2) if to_field else 0
+        count = min(count, cap - to_length)
+        block = color * self.ones[count]
+        state -= block << (from_shift + 4 * (cap - length))
+        state += block << (to_shift + 4 * (cap - to_length - count))
+        return state, count
+
+    def is_solved_packed(self, state: int):
+        """is_solved 的压缩版本：每个瓶子要么空，要么满且单色"""
+        full, mask = self.ones[self.max_capacity], self.bottle_mask
+        for shift in self.shifts:
+            field = (state >> shift) & mask
+            if field and field != (field & 15) * full:
+                return False
+        return True
+
+    def get_heuristic_packed(self, state: int):
+        """get_heuristic 的压缩版本，值完全相同"""
+        full, mask, bits = self.ones[self.max_capacity], self.bottle_mask, self.bottle_bits
+        spread = 0          # 每个瓶子里不同颜色的个数之和
+        all_colors = 0
+        layers = 0
+        incomplete = 0
+        for shift in self.shifts:
+            field = (state >> shift) & mask
+            if not field:
+                continue
+            complete = field == (field & 15) * full
+            if not complete:
+                incomplete += 1
+            # 从瓶口往下数，每种颜色第一次出现时上面压着 above 层
+            low = ((field & -field).bit_length() - 1) & ~3
+            colors = 0
+            above = 0
+            while low < bits:
+                color = (field >> low) & 15
+                if not (colors >> color) & 1:
+                    colors |= 1 << color
+                    spread += 1
+                    if not complete:
+                        layers += above
+                above += 1
+                low += 4
+            all_colors |= colors
+
+        h = (spread - all_colors.bit_count()) * 2 + layers
+        h += incomplete * 0.5
+        return h
+
+    def get_priority_moves_packed(self, state: int):
+        """get_priority_moves 的压缩版本，每个瓶子只解析一次，排序结果相同"""
+        cap, mask, full = self.max_capacity, self.bottle_mask, self.ones[self.max_capacity]
+        lengths, tops, counts, singles, completes = [], [], [], [], []
+        for shift in self.shifts:
+            field = (state >> shift) & mask
+            length, color, count = self._top_of(field)
+            lengths.append(length)
+            tops.append(color)
+            counts.append(count)
+            singles.append(length > 0 and field == color * self.bottom_ones[length])
+            completes.append(length == cap and field == color * full)
+
+        moves = []
+        n = len(lengths)
+        for i in range(n):
+            if not lengths[i] or completes[i]:
+                continue
+            from_color, from_count = tops[i], counts[i]
+            for j in range(n):
+                if i == j:
+                    continue
+                # is_valid_pour
+                if lengths[j] >= cap or (lengths[j] and tops[j] != from_color):
+                    continue
+                # is_useful_move（规则 5 在倒水合法时不会触发）
+                if completes[j]:
+                    continue
+                if not lengths[j] and singles[i] and lengths[i] == cap:
+                    continue
+                if singles[i] and singles[j] and lengths[j] + from_count < cap:
+                    continue
+
+                priority = 0
+                can_pour = min(from_count, cap - lengths[j])
+                if lengths[j]:
+                    total = lengths[j] + can_pour
+                    if total == cap:
+                        priority += 1000
+                    elif total > cap * 0.75:
+                        priority += 500
+                    priority += 200
+                if lengths[i] == from_count:
+                    priority += 300
+                if not lengths[j]:
+                    if singles[i] and lengths[i] == cap:
+                        priority += 10
+                    else:
+                        priority += 150
+                priority += can_pour * 10
+                if singles[i]:
+                    priority += 100
+
+                moves.append((priority, i, j))
+
+        moves.sort(reverse=True)
+        return [(i, j) for _, i, j in moves]
+
     def solve(self, max_steps=500000, time_limit=300):
-        """使用A*算法求解，增加时间和步数限制"""
+        """使用A*算法求解，增加时间和步数限制；局面全程用压缩的 int，路径靠父指针回溯"""
 
         start_time = time.time()
 
-        initial_h = self.get_heuristic(self.initial_state)
-        heap = [(initial_h, 0, self.initial_state, [])]
-        visited = {self.state_to_tuple(self.initial_state)}
+        start = self.encode(self.initial_state)
+        heap = [(self.get_heuristic_packed(start), 0, start)]
+        parents = {start: None}  # 局面 -> (上一个局面, 从, 到, 份数)，同时充当 visited
 
         steps = 0
-        max_queue_size = 0
-        best_complete = 0
 
         while heap:
             steps += 1
-            max_queue_size = max(max_queue_size, len(heap))
 
             # 检查时间限制
             elapsed = time.time() - start_time
@@ -314,35 +489,36 @@ class WaterSortSolver:
             if steps > max_steps:
                 return None
 
-            _, cost, current_state, path = heappop(heap)
+            _, cost, current_state = heappop(heap)
             # 检查是否完成
-            if self.is_solved(current_state):
-                elapsed = time.time() - start_time
-                return path
-
-            # 跟踪最佳状态
-            complete = self.count_complete_bottles(current_state)
-            if complete > best_complete:
-                best_complete = complete
+            if self.is_solved_packed(current_state):
+                return self._trace_path(parents, current_state)
 
             # 生成后继状态
-            priority_moves = self.get_priority_moves(current_state)
+            priority_moves = self.get_priority_moves_packed(current_state)
 
             # 限制分支因子，只探索前N个最优移动
             for i, j in priority_moves[:15]:  # 只取前15个最优移动
-                new_state, count = self.pour_water(current_state, i, j)
-                state_tuple = self.state_to_tuple(new_state)
+                new_state, count = self.pour_packed(current_state, i, j)
 
-                if state_tuple not in visited:
-                    visited.add(state_tuple)
+                if new_state not in parents:
+                    parents[new_state] = (current_state, i, j, count)
                     new_cost = cost + 1
-                    h = self.get_heuristic(new_state)
+                    h = self.get_heuristic_packed(new_state)
                     f = new_cost + h
-                    new_path = path + [(i, j, count)]
-                    heappush(heap, (f, new_cost, new_state, new_path))
+                    heappush(heap, (f, new_cost, new_state))
 
         return None
 
+    def _trace_path(self, parents: dict, state: int):
+        """沿父指针回溯出 [(from, to, count), ...]"""
+        path = []
+        while parents[state] is not None:
+            state, i, j, count = parents[state]
+            path.append((i, j, count))
+        path.reverse()
+        return path
+
     def print_solution(self, solution, verbose=True):
         """打印解决方案"""
         if solution is None:
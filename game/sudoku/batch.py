@@ -0,0 +1,130 @@
+# sudoku/batch.py
+# 批量评分：流式读取题库文件，按块分发给进程池，按输入顺序输出每题一行的结果
+#
+#   python batch.py puzzle.txt -o result.jsonl
+#   python batch.py pack.txt -o result.csv --format csv --workers 8 --chunk-size 500
+
+import argparse
+import csv
+import json
+import sys
+from typing import Iterable, Iterator, List
+
+from pool import imap_ordered, iter_chunks
+from scorer import parse_sudoku_line, print_strategy_report, solve_with_logic, technique_counts
+
+CSV_FIELDS = ["index", "solved", "level", "steps", "techniques", "error"]
+
+
+def iter_puzzle_lines(filename: str) -> Iterator[str]:
+    """逐行读取题库，跳过空行，不把整个文件读进内存"""
+    with open(filename, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield line
+
+
+def grade_line(line: str) -> dict:
+    """评分一道题，返回紧凑结果；格式错误的行记录 error 而不中断整批"""
+    try:
+        puzzle = parse_sudoku_line(line)
+    except ValueError as e:
+        return {"solved": False, "level": 0, "steps": 0, "techniques": {}, "error": str(e)}
+    solved, level, steps = solve_with_logic(puzzle, incremental=True)
+    return {
+        "solved": solved,
+        "level": level,
+        "steps": len(steps),
+        "techniques": technique_counts(steps),
+    }
+
+
+def grade_chunk(lines: List[str]) -> List[dict]:
+    return [grade_line(line) for line in lines]
+
+
+def grade_file(filename: str, workers: int = 0, chunk_size: int = 256) -> Iterator[dict]:
+    """
+    按输入顺序逐题产出评分结果
+    workers: 进程数，0 表示 CPU 核数；1 表示在当前进程内评分
+    同时在途的块数有上限，内存占用与文件大小无关
+    """
+    chunks = iter_chunks(iter_puzzle_lines(filename), chunk_size)
+    index = 0
+    for results in imap_ordered(grade_chunk, chunks, workers):
+        for result in results:
+            index += 1
+            yield {"index": index, **result}
+
+
+def stats_chunk(lines: List[str]) -> dict:
+    """一块题目的各技巧调用统计（格式错误的行跳过），格式同 solve_with_logic 的 stats"""
+    stats = {}
+    for line in lines:
+        try:
+            puzzle = parse_sudoku_line(line)
+        except ValueError:
+            continue
+        solve_with_logic(puzzle, incremental=True, stats=stats)
+    return stats
+
+
+def collect_file_stats(filename: str, workers: int = 0, chunk_size: int = 256) -> dict:
+    """和 grade_file 一样流式分块交给进程池，各块的统计在主进程里累加"""
+    total = {}
+    chunks = iter_chunks(iter_puzzle_lines(filename), chunk_size)
+    for stats in imap_ordered(stats_chunk, chunks, workers):
+        for name, entry in stats.items():
+            acc = total.setdefault(name, {"calls": 0, "skipped": 0, "hits": 0, "time": 0.0})
+            for key, value in entry.items():
+                acc[key] += value
+    return total
+
+
+def write_results(results: Iterable[dict], out, fmt: str = "jsonl") -> int:
+    """写出结果，返回题目数"""
+    count = 0
+    if fmt == "csv":
+        writer = csv.writer(out)
+        writer.writerow(CSV_FIELDS)
+        for res in results:
+            techniques = json.dumps(res["techniques"], ensure_ascii=False, separators=(",", ":"))
+            # error 列为空表示这一行正常解析；格式错误的行不能和"逻辑解不出"的题混在一起
+            writer.writerow([res["index"], int(res["solved"]), res["level"], res["steps"], techniques,
+                             res.get("error", "")])
+            count += 1
+    else:
+        for res in results:
+            out.write(json.dumps(res, ensure_ascii=False, separators=(",", ":")))
+            out.write("\n")
+            count += 1
+    return count
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="数独题库批量评分")
+    parser.add_argument("input", help="题库文件，每行一道题")
+    parser.add_argument("-o", "--output", help="输出文件，默认标准输出")
+    parser.add_argument("--format", choices=["jsonl", "csv"], help="输出格式，默认按输出文件后缀判断")
+    parser.add_argument("--workers", type=int, default=0, help="进程数，默认 CPU 核数")
+    parser.add_argument("--chunk-size", type=int, default=256, help="每个任务包含的题目数")
+    parser.add_argument("--report", action="store_true", help="只统计各技巧的调用次数、命中率和耗时")
+    args = parser.parse_args(argv)
+
+    if args.report:
+        print_strategy_report(collect_file_stats(args.input, workers=args.workers, chunk_size=args.chunk_size))
+        return
+
+    fmt = args.format or ("csv" if args.output and args.output.endswith(".csv") else "jsonl")
+    results = grade_file(args.input, workers=args.workers, chunk_size=args.chunk_size)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8", newline="") as out:
+            count = write_results(results, out, fmt)
+        print(f"graded {count} puzzles -> {args.output}", file=sys.stderr)
+    else:
+        write_results(results, sys.stdout, fmt)
+
+
+if __name__ == "__main__":
+    main()
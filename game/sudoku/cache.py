@@ -0,0 +1,147 @@
+# sudoku/cache.py
+# 评分缓存：同一道题反复评分时直接返回上次的结果
+#   - 内存 LRU 层 + 可选的 sqlite 文件层，先查内存，再查文件，都没有才调用 solve_with_logic
+#   - 键是题目本身的紧凑编码（41 字节，每格 4 位），不用规范形：
+#     同构的题逐步求解的 steps 不一定相同，而且规范形本身要几毫秒，比简单题的评分还慢
+#   - scorer.GRADER_VERSION 加一或技巧列表变了（增删或调整顺序），文件层会自动清空
+#
+#   python cache.py puzzle.txt [cache.sqlite]
+
+import json
+import sqlite3
+import sys
+import time
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+from scorer import (GRADER_VERSION, Grid, STRATEGY_NAMES, get_puzzle_statistics, read_sudoku_file,
+                    solve_with_logic)
+
+# 写入文件层的评分器版本：技巧名只能发现增删和换序，技巧行为的改动靠 scorer.GRADER_VERSION 手动加一
+CACHE_VERSION = f"{GRADER_VERSION}:" + ",".join(STRATEGY_NAMES)
+
+GradeResult = Tuple[bool, int, List[str], dict]
+
+
+def puzzle_key(g: Grid) -> bytes:
+    """把 81 格压成 41 字节（两格一个字节），不同的题键一定不同"""
+    flat = [v for row in g for v in row]
+    flat.append(0)
+    return bytes((flat[i] << 4) | flat[i + 1] for i in range(0, 82, 2))
+
+
+class GradeCache:
+    """
+    评分结果缓存，值为 (solved, level, steps, statistics)
+    返回的 steps / statistics 是缓存里的同一个对象，调用方不要修改
+    """
+
+    def __init__(self, maxsize: int = 100000, path: Optional[str] = None):
+        self.maxsize = maxsize
+        self.memory = OrderedDict()
+        self.hits = 0        # 内存层命中
+        self.disk_hits = 0   # 文件层命中
+        self.misses = 0      # 重新评分
+        self.conn = None
+        if path is not None:
+            self._open(path)
+
+    def _open(self, path: str):
+        conn = sqlite3.connect(path)
+        conn.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT)")
+        conn.execute("CREATE TABLE IF NOT EXISTS grades (key BLOB PRIMARY KEY, solved INTEGER, level INTEGER,"
+                     " steps TEXT, stats TEXT) WITHOUT ROWID")
+        row = conn.execute("SELECT value FROM meta WHERE name = 'grader'").fetchone()
+        if row is None or row[0] != CACHE_VERSION:
+            conn.execute("DELETE FROM grades")
+            conn.execute("INSERT OR REPLACE INTO meta (name, value) VALUES ('grader', ?)", (CACHE_VERSION,))
+            conn.commit()
+        self.conn = conn
+
+    def __len__(self) -> int:
+        return len(self.memory)
+
+    def lookup(self, g: Grid) -> GradeResult:
+        key = puzzle_key(g)
+        memory = self.memory
+        result = memory.get(key)
+        if result is not None:
+            memory.move_to_end(key)
+            self.hits += 1
+            return result
+
+        row = None
+        if self.conn is not None:
+            row = self.conn.execute("SELECT solved, level, steps, stats FROM grades WHERE key = ?",
+                                    (key,)).fetchone()
+        if row is not None:
+            self.disk_hits += 1
+            result = (bool(row[0]), row[1], json.loads(row[2]), json.loads(row[3]))
+        else:
+            self.misses += 1
+            solved, level, steps = solve_with_logic(g, incremental=True)
+            result = (solved, level, steps, get_puzzle_statistics(g))
+            if self.conn is not None:
+                self.conn.execute("INSERT OR REPLACE INTO grades (key, solved, level, steps, stats)"
+                                  " VALUES (?, ?, ?, ?, ?)",
+                                  (key, int(solved), level, json.dumps(steps, ensure_ascii=False),
+                                   json.dumps(result[3])))
+
+        memory[key] = result
+        if len(memory) > self.maxsize:
+            memory.popitem(last=False)
+        return result
+
+    def grade(self, g: Grid) -> Tuple[bool, int, List[str]]:
+        """与 solve_with_logic 返回值相同"""
+        solved, level, steps, _ = self.lookup(g)
+        return solved, level, steps
+
+    def statistics(self, g: Grid) -> dict:
+        """与 get_puzzle_statistics 返回值相同"""
+        return self.lookup(g)[3]
+
+    def info(self) -> dict:
+        total = self.hits + self.disk_hits + self.misses
+        return {
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits + self.disk_hits) / total if total else 0.0,
+            "size": len(self.memory),
+        }
+
+    def clear(self):
+        """清空内存层和计数（文件层保留）"""
+        self.memory.clear()
+        self.hits = self.disk_hits = self.misses = 0
+
+    def commit(self):
+        if self.conn is not None:
+            self.conn.commit()
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.commit()
+            self.conn.close()
+            self.conn = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+if __name__ == "__main__":
+    filename = sys.argv[1] if len(sys.argv) > 1 else "puzzle.txt"
+    path = sys.argv[2] if len(sys.argv) > 2 else None
+    puzzles = read_sudoku_file(filename)
+    with GradeCache(path=path) as cache:
+        for label in ("first pass", "second pass"):
+            start = time.time()
+            for puzzle in puzzles:
+                cache.grade(puzzle)
+            elapsed = time.time() - start
+            print(f"{label}: {elapsed * 1000:.1f} ms, {elapsed / len(puzzles) * 1e6:.1f} us/puzzle")
+        print(cache.info())
@@ -0,0 +1,195 @@
+# sudoku/canonical.py
+# 题目规范形：在重新编号数字、交换行带/列带、带内交换行/列、转置这些等价变换下取字典序最小的形式，
+# 等价（同构）的题目规范形相同。CanonicalIndex 把规范形的哈希存进 sqlite，用来对大题库去重
+#
+#   python canonical.py puzzle.txt
+
+import hashlib
+import sqlite3
+import sys
+from itertools import permutations, product
+from typing import Iterable, Iterator, List, Tuple
+
+from scorer import Grid, parse_sudoku_line
+
+BANDS = [(0, 1, 2), (3, 4, 5), (6, 7, 8)]
+# 分支数超过这个值才做签名去重，分支少时直接扩展更快
+DEDUPE_THRESHOLD = 2048
+
+
+def transpose(g: Grid) -> Grid:
+    return [list(col) for col in zip(*g)]
+
+
+def _first_row_perms(row: List[int]) -> Tuple[Tuple[int, ...], List[Tuple[int, ...]]]:
+    """
+    第一行只看空/非空的形状（同一行数字互不相同，重新编号后总是 1,2,3...），
+    形状最小即：列带按数字个数升序，带内空列在前。返回 (形状, 所有达到它的列排列)
+    """
+    stacks = sorted(range(3), key=lambda s: sum(1 for c in BANDS[s] if row[c]))
+    counts = [sum(1 for c in BANDS[s] if row[c]) for s in stacks]
+    shape = tuple(0 if i % 3 < 3 - counts[i // 3] else 1 for i in range(9))
+
+    # 数字个数相同的列带可以互换
+    groups = []
+    for s, k in zip(stacks, counts):
+        if groups and groups[-1][0] == k:
+            groups[-1][1].append(s)
+        else:
+            groups.append((k, [s]))
+    stack_orders = [sum(combo, ()) for combo in product(*[list(permutations(g)) for _, g in groups])]
+
+    # 带内空列之间、非空列之间可以互换
+    inner = {}
+    for s in range(3):
+        blanks = [c for c in BANDS[s] if not row[c]]
+        filled = [c for c in BANDS[s] if row[c]]
+        inner[s] = [b + f for b in permutations(blanks) for f in permutations(filled)]
+
+    perms = []
+    for order in stack_orders:
+        for parts in product(*[inner[s] for s in order]):
+            perms.append(sum(parts, ()))
+    return shape, perms
+
+
+def _relabel_row(row: List[int], perm: Tuple[int, ...], mapping: List[int], next_label: int):
+    """按列排列读出一行并重新编号，返回 (行, 新映射, 下一个编号)"""
+    out = []
+    for c in perm:
+        v = row[c]
+        if v and not mapping[v]:
+            mapping = mapping[:]
+            mapping[v] = next_label
+            next_label += 1
+        out.append(mapping[v])
+    return tuple(out), mapping, next_label
+
+
+def _row_choices(grid_rows: Tuple[int, ...], pos: int) -> List[int]:
+    """第 pos 行可选的原始行：带首选一个未用过的行带中的行，带内选同一行带剩下的行"""
+    if pos % 3 == 0:
+        used_bands = {r // 3 for r in grid_rows}
+        return [r for b in range(3) if b not in used_bands for r in BANDS[b]]
+    band = grid_rows[-1] // 3
+    return [r for r in BANDS[band] if r not in grid_rows]
+
+
+def _signature(grid: Grid, rows: Tuple[int, ...], perm: Tuple[int, ...], mapping: List[int], next_label: int):
+    """
+    分支之后还能产出的内容：剩余各行按列排列读出，已编号的数字换成编号、未编号的保留原值（+10 区分）。
+    签名相同的分支后续结果完全相同，只需保留一个（大片空白或对称的题会产生大量这样的分支）
+    """
+    def read(r):
+        return tuple(mapping[v] if mapping[v] or not v else v + 10 for v in (grid[r][c] for c in perm))
+
+    used = set(rows)
+    current = tuple(sorted(read(r) for r in BANDS[rows[-1] // 3] if r not in used))
+    rest = tuple(sorted(
+        tuple(sorted(read(r) for r in BANDS[b]))
+        for b in range(3) if not used.intersection(BANDS[b])
+    ))
+    return next_label, current, rest
+
+
+def _dedupe(states):
+    if len(states) <= DEDUPE_THRESHOLD:
+        return states
+    seen = set()
+    out = []
+    for state in states:
+        sig = _signature(*state)
+        if sig not in seen:
+            seen.add(sig)
+            out.append(state)
+    return out
+
+
+def canonical_form(g: Grid) -> str:
+    """返回 81 个字符的规范形（0 表示空格）"""
+    # 第一行：只保留形状最小的 (网格, 行, 列排列)
+    best_shape = None
+    states = []
+    for grid in (g, transpose(g)):
+        for r in range(9):
+            shape, perms = _first_row_perms(grid[r])
+            if best_shape is None or shape < best_shape:
+                best_shape, states = shape, []
+            if shape == best_shape:
+                for perm in perms:
+                    _, mapping, next_label = _relabel_row(grid[r], perm, [0] * 10, 1)
+                    states.append((grid, (r,), perm, mapping, next_label))
+
+    prefix = [best_shape]
+    # 后续各行：逐行扩展，只保留重新编号后这一行最小的分支
+    for pos in range(1, 9):
+        best_row = None
+        next_states = []
+        for grid, rows, perm, mapping, next_label in states:
+            for r in _row_choices(rows, pos):
+                row, new_mapping, new_label = _relabel_row(grid[r], perm, mapping, next_label)
+                if best_row is None or row < best_row:
+                    best_row, next_states = row, []
+                if row == best_row:
+                    next_states.append((grid, rows + (r,), perm, new_mapping, new_label))
+        prefix.append(best_row)
+        states = _dedupe(next_states)
+
+    # 第一行的形状换成编号后的数字
+    first_grid, rows, perm, _, _ = states[0]
+    first, _, _ = _relabel_row(first_grid[rows[0]], perm, [0] * 10, 1)
+    prefix[0] = first
+    return "".join(str(v) for row in prefix for v in row)
+
+
+def canonical_key(g: Grid) -> bytes:
+    """规范形的 16 字节哈希，用作索引键"""
+    return hashlib.blake2b(canonical_form(g).encode(), digest_size=16).digest()
+
+
+class CanonicalIndex:
+    """持久化的规范形索引（sqlite），查询和插入都是一次主键查找"""
+
+    def __init__(self, path: str = ":memory:"):
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("CREATE TABLE IF NOT EXISTS puzzles (key BLOB PRIMARY KEY) WITHOUT ROWID")
+
+    def __len__(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM puzzles").fetchone()[0]
+
+    def __contains__(self, g: Grid) -> bool:
+        return self.conn.execute("SELECT 1 FROM puzzles WHERE key = ?", (canonical_key(g),)).fetchone() is not None
+
+    def add(self, g: Grid) -> bool:
+        """加入索引，返回是否是新题（之前没有同构的题）"""
+        cur = self.conn.execute("INSERT OR IGNORE INTO puzzles (key) VALUES (?)", (canonical_key(g),))
+        return cur.rowcount == 1
+
+    def dedupe(self, puzzles: Iterable[Grid]) -> Iterator[Grid]:
+        """逐个过滤：产出索引里没有同构题的题目，并把它们加入索引"""
+        for g in puzzles:
+            if self.add(g):
+                yield g
+        self.commit()
+
+    def commit(self):
+        self.conn.commit()
+
+    def close(self):
+        self.conn.commit()
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+if __name__ == "__main__":
+    filename = sys.argv[1] if len(sys.argv) > 1 else "puzzle.txt"
+    with open(filename, "r", encoding="utf-8") as f:
+        puzzles = [parse_sudoku_line(line) for line in f if line.strip()]
+    index = CanonicalIndex()
+    unique = sum(1 for _ in index.dedupe(puzzles))
+    print(f"{len(puzzles)} 道题，去重后 {unique} 道")
@@ -2,19 +2,52 @@
 # 每一行用一个 32 位整数表示，每个整数的 9 位表示一行的 9 个格子
 # 9 个数字组成一个字符串，9 行组成一个 81 位的字符串。4*9=36 个字节
 
-# puzzle = '8.17..4..;...1...25;2...3..7.;3......52;....9....;69......3;.4..1...7;75...2...;..8..45.6'
-puzzle = '801700400000100025200030070300000052000090000690000003040010007750002000008004506'
-ints = []
-i = 0
-while i < len(puzzle):
-    chunk = puzzle[i:i+9]
-    ints.append(int(chunk))
-    i += 9
-
-print(puzzle)
-
-print(len(ints))
-int_str = '\r\n'.join(f"{num:09d}" for num in ints)
-print(int_str)
-
-# https://www.sudokuwiki.org/sudoku.htm
+from typing import List
+
+Grid = List[List[int]]
+
+
+def encode_grid(g: Grid) -> List[int]:
+    """把 9x9 网格编码为 9 个整数，每个整数的 9 位十进制数字对应一行"""
+    ints = []
+    for row in g:
+        num = 0
+        for v in row:
+            num = num * 10 + v
+        ints.append(num)
+    return ints
+
+
+def decode_grid(ints) -> Grid:
+    """encode_grid 的逆操作"""
+    g = []
+    for num in ints:
+        row = [0] * 9
+        for c in range(8, -1, -1):
+            num, row[c] = divmod(num, 10)
+        g.append(row)
+    return g
+
+
+def encode_string(puzzle: str) -> List[int]:
+    """把 81 个字符（0 或 . 表示空格）编码为 9 个整数"""
+    puzzle = puzzle.replace(".", "0")
+    ints = []
+    i = 0
+    while i < len(puzzle):
+        chunk = puzzle[i:i+9]
+        ints.append(int(chunk))
+        i += 9
+    return ints
+
+
+if __name__ == "__main__":
+    # puzzle = '8.17..4..;...1...25;2...3..7.;3......52;....9....;69......3;.4..1...7;75...2...;..8..45.6'
+    puzzle = '801700400000100025200030070300000052000090000690000003040010007750002000008004506'
+    ints = encode_string(puzzle)
+
+    print(puzzle)
+
+    print(len(ints))
+    int_str = '\r\n'.join(f"{num:09d}" for num in ints)
+    print(int_str)
@@ -12,7 +12,9 @@
 import random
 from typing import List, Tuple, Optional
 
-Grid = List[List[int]]
+from scorer import Grid, Shape, shape_of
+
+SYMBOLS = "123456789ABCDEFGHIJKLMNOP"  # 10 以上的数字用字母
 
 def print_grid(g: Grid) -> None:
     for r in range(9):
@@ -28,7 +30,7 @@ def print_grid(g: Grid) -> None:
     print()
 
 def grid_to_string(g: Grid) -> str:
-    return ";".join("".join('.' if v==0 else str(v) for v in row) for row in g)
+    return ";".join("".join('.' if v==0 else SYMBOLS[v-1] for v in row) for row in g)
 
 # 检查在 (r,c) 放 val 是否合法
 def is_valid(g: Grid, r: int, c: int, val: int) -> bool:
@@ -41,123 +43,211 @@ def is_valid(g: Grid, r: int, c: int, val: int) -> bool:
                 return False
     return True
 
-# 生成完整解盘（回溯），返回 True 并修改 g
-def generate_full_grid(g: Grid) -> bool:
-    # 找未填位置
-    for i in range(9):
-        for j in range(9):
-            if g[i][j] == 0:
-                nums = list(range(1,10))
-                random.shuffle(nums)
-                for val in nums:
-                    if is_valid(g, i, j, val):
-                        g[i][j] = val
-                        if generate_full_grid(g):
-                            return True
-                        g[i][j] = 0
-                return False
-    return True  # 全填好了
+# ===== 求解 / 计数 =====
+# 盘面展开成 N*N 个 N 位候选掩码（几何见 scorer.Shape），9x9 和 variant.py 的其他尺寸共用
+# 唯一候选数 + 隐性唯一数传播到不动点，再选候选最少的格子分支（MRV）；
+# 比逐格 MRV 回溯快得多（9x9 唯一性检查约 3-10 倍），16x16 基本不用回溯
+
+def _initial_cells(shape: Shape, flat: List[int]) -> Tuple[List[int], List[int]]:
+    """已填格子设为单个位并放进队列，空格为全部数字"""
+    cells = [shape.full] * shape.size
+    queue = []
+    for i, v in enumerate(flat):
+        if v:
+            cells[i] = 1 << (v - 1)
+            queue.append(i)
+    return cells, queue
+
+def _propagate(shape: Shape, cells: List[int], queue: List[int]) -> bool:
+    """唯一候选数 + 隐性唯一数传播到不动点；出现矛盾返回 False"""
+    peers = shape.peers
+    full = shape.full
+    while True:
+        while queue:
+            i = queue.pop()
+            bit = cells[i]
+            for j in peers[i]:
+                m = cells[j]
+                if m & bit:
+                    m ^= bit
+                    if not m:
+                        return False
+                    cells[j] = m
+                    if not m & (m - 1):
+                        queue.append(j)
+        for house in shape.houses:
+            once = twice = 0
+            for j in house:
+                m = cells[j]
+                twice |= once & m
+                once |= m
+            if once != full:
+                return False  # 有数字在这个单元里放不下
+            single = once & ~twice
+            if single:
+                for j in house:
+                    m = cells[j]
+                    if m & single and m & (m - 1):
+                        m &= single
+                        if m & (m - 1):
+                            return False  # 两个数字都只能放在同一格
+                        cells[j] = m
+                        queue.append(j)
+        if not queue:
+            return True
 
-# 求解器：计数解的个数（上限 limit），用于检测唯一解
+def _search(shape: Shape, cells: List[int], queue: List[int], limit: int,
+            rng=None, out: Optional[list] = None, budget: Optional[list] = None) -> int:
+    """数解的个数（到 limit 为止）；rng 打乱分支顺序，out 收集第一个解，budget[0] 为剩余节点数"""
+    if not _propagate(shape, cells, queue):
+        return 0
+    if budget is not None:
+        budget[0] -= 1
+        if budget[0] < 0:
+            return limit  # 超出预算，让调用方放弃
+    best, best_count = -1, shape.n + 1
+    for i, m in enumerate(cells):
+        if m & (m - 1):
+            cnt = m.bit_count()
+            if cnt < best_count:
+                best, best_count = i, cnt
+                if cnt == 2:
+                    break
+    if best < 0:
+        if out is not None and not out:
+            out.append(cells)
+        return 1
+
+    bits = []
+    m = cells[best]
+    while m:
+        bit = m & -m
+        bits.append(bit)
+        m ^= bit
+    if rng is not None:
+        rng.shuffle(bits)
+    total = 0
+    for bit in bits:
+        child = cells[:]
+        child[best] = bit
+        total += _search(shape, child, [best], limit - total, rng, out, budget)
+        if total >= limit:
+            break
+    return total
+
+# 求解器：计数解的个数（上限 limit），用于检测唯一解；给定数字冲突返回 0
 def count_solutions(grid: Grid, limit: int=2) -> int:
-    g = [row[:] for row in grid]
-
-    def dfs_count() -> int:
-        # 找最少候选数的空格（启发式），加速
-        best_r, best_c = -1, -1
-        min_cand = 10
-        for i in range(9):
-            for j in range(9):
-                if g[i][j] == 0:
-                    cands = [v for v in range(1,10) if is_valid(g, i, j, v)]
-                    if len(cands) == 0:
-                        return 0  # 无解
-                    if len(cands) < min_cand:
-                        min_cand = len(cands)
-                        best_r, best_c = i, j
-        if best_r == -1:
-            return 1  # 填满，找到 1 个解
-
-        total = 0
-        for v in range(1,10):
-            if is_valid(g, best_r, best_c, v):
-                g[best_r][best_c] = v
-                cnt = dfs_count()
-                total += cnt
-                g[best_r][best_c] = 0
-                if total >= limit:
-                    return total
-        return total
-
-    return dfs_count()
-
-# 挖空以得到目标 clues（保留格子数），确保唯一解
-def make_puzzle_from_full(full: Grid, clues: int=30, symmetric: bool=False, random_seed: Optional[int]=None) -> Grid:
+    shape = shape_of(grid)
+    cells, queue = _initial_cells(shape, [v for row in grid for v in row])
+    return _search(shape, cells, queue, limit)
+
+# 返回一个解，无解返回 None
+def solve(grid: Grid) -> Optional[Grid]:
+    shape = shape_of(grid)
+    cells, queue = _initial_cells(shape, [v for row in grid for v in row])
+    out = []
+    _search(shape, cells, queue, 1, out=out)
+    if not out:
+        return None
+    n = shape.n
+    flat = [m.bit_length() for m in out[0]]
+    return [flat[r * n:(r + 1) * n] for r in range(n)]
+
+# ===== 生成 =====
+
+# 生成完整解盘（随机顺序分支的搜索），返回 True 并修改 g；g 里已有的数字保留，无解返回 False
+# 偶尔陷入大量回溯时换一次随机重来
+# rng: 随机数生成器（random.Random 实例），默认用 random 模块的全局状态
+def generate_full_grid(g: Grid, rng=None) -> bool:
+    rng = rng or random
+    shape = shape_of(g)
+    n = shape.n
+    flat = [v for row in g for v in row]
+    while True:
+        cells, queue = _initial_cells(shape, flat)
+        out = []
+        budget = [50 * shape.size]
+        _search(shape, cells, queue, 1, rng, out, budget)
+        if out:
+            for i, m in enumerate(out[0]):
+                g[i // n][i % n] = m.bit_length()
+            return True
+        if budget[0] >= 0:
+            return False  # 完整搜过一遍，没有解
+
+def _has_other_solution(shape: Shape, flat: List[int], i: int, v: int) -> bool:
+    """第 i 格填 v 之外的数字是否还有解"""
+    cells, queue = _initial_cells(shape, flat)
+    cells[i] = shape.full & ~(1 << (v - 1))
+    if not cells[i] & (cells[i] - 1):
+        queue.append(i)
+    return _search(shape, cells, queue, 1) > 0
+
+# 挖空以得到目标 clues（保留格子数），确保唯一解；挖不到就停在能保持唯一解的最少处
+# 去掉格子 i 的数字 v 后，只要"格子 i 不是 v"无解，题目就仍然唯一，只需找一个解而不用数到 2 个
+def make_puzzle_from_full(full: Grid, clues: int=30, symmetric: bool=False, random_seed: Optional[int]=None,
+                          rng=None) -> Grid:
+    rng = rng or random
     if random_seed is not None:
-        random.seed(random_seed)
-    puzzle = [row[:] for row in full]
+        rng.seed(random_seed)
+    shape = shape_of(full)
+    n, size = shape.n, shape.size
+    if n == 9:
+        clues = max(17, clues)  # 9x9 最少保留17
+    flat = [v for row in full for v in row]
     # 所有位置列表，随机顺序
-    positions = [(r,c) for r in range(9) for c in range(9)]
-    random.shuffle(positions)
-
-    removed = 0
-    # 总格子数 = 81，目标移除数 = 81 - clues
-    target_remove = max(0, 81 - max(17, min(81, clues)))  # 最少保留17
-    for (r,c) in positions:
-        if removed >= target_remove:
+    positions = list(range(size))
+    rng.shuffle(positions)
+
+    remaining = size
+    for i in positions:
+        if remaining <= clues:
             break
-        if puzzle[r][c] == 0: 
-            continue
-        # 暂存并移除
-        backup = puzzle[r][c]
-        puzzle[r][c] = 0
-
-        # 如果需要对称挖空，可以同时挖对称位（这里用中心对称）
-        symmetric_pos = None
-        backup_sym = None
-        if symmetric:
-            sr, sc = 8 - r, 8 - c
-            symmetric_pos = (sr, sc)
-            if puzzle[sr][sc] != 0:
-                backup_sym = puzzle[sr][sc]
-                puzzle[sr][sc] = 0
-
-        # 检查唯一解
-        sol_count = count_solutions(puzzle, limit=2)
-        if sol_count != 1:
-            # 不唯一或无解，回退
-            puzzle[r][c] = backup
-            if symmetric and symmetric_pos and backup_sym is not None:
-                sr, sc = symmetric_pos
-                puzzle[sr][sc] = backup_sym
+        if flat[i] == 0:
             continue
-
-        # 成功移除
-        removed += 1
-        if symmetric and symmetric_pos and backup_sym is not None and (sr,sc) != (r,c):
-            removed += 1  # 对称位也被移除
-
-    return puzzle
+        # 如果需要对称挖空，同时挖中心对称位
+        j = size - 1 - i
+        if symmetric and j != i and flat[j]:
+            backup = flat[i], flat[j]
+            flat[i] = flat[j] = 0
+            # 同时去掉两格，需要数到 2 个解
+            cells, queue = _initial_cells(shape, flat)
+            if _search(shape, cells, queue, 2) != 1:
+                flat[i], flat[j] = backup  # 不唯一，回退
+                continue
+            remaining -= 2
+        else:
+            v = flat[i]
+            flat[i] = 0
+            if _has_other_solution(shape, flat, i, v):
+                flat[i] = v  # 不唯一，回退
+                continue
+            remaining -= 1
+    return [flat[r * n:(r + 1) * n] for r in range(n)]
 
 # 生成器主函数：外部接口
-def generate_sudoku(clues: int=30, symmetric: bool=False, seed: Optional[int]=None) -> Tuple[Grid, Grid]:
+def generate_sudoku(clues: int=30, symmetric: bool=False, seed: Optional[int]=None, rng=None,
+                    size: int=9) -> Tuple[Grid, Grid]:
     """
     生成数独题目和它的完整解。
     clues: 保留数字个数（常见范围 17..40+；17 是最少线性唯一解数）
     symmetric: 是否尝试保持中心对称挖空
     seed: 随机种子（可选）
+    rng: 随机数生成器（random.Random 实例，可选），多进程生成时每个进程各用一个，不碰全局状态
+    size: 盘面边长，9 以外的尺寸见 variant.py
     返回 (puzzle, solution)
     """
+    rng = rng or random
     if seed is not None:
-        random.seed(seed)
+        rng.seed(seed)
     # 初始空盘
-    full = [[0]*9 for _ in range(9)]
+    full = [[0]*size for _ in range(size)]
     # 生成完整解盘
-    ok = generate_full_grid(full)
+    ok = generate_full_grid(full, rng)
     if not ok:
         raise RuntimeError("生成完整解失败，请重试（非常罕见）")
     solution = [row[:] for row in full]
-    puzzle = make_puzzle_from_full(solution, clues=clues, symmetric=symmetric, random_seed=seed)
+    puzzle = make_puzzle_from_full(solution, clues=clues, symmetric=symmetric, random_seed=seed, rng=rng)
     return puzzle, solution
 
 if __name__ == "__main__":
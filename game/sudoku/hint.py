@@ -0,0 +1,315 @@
+# sudoku/hint.py
+# 提示服务：为每个玩家保存盘面和候选掩码，"下一步提示" 从当前状态接着跑评分技巧，不从原题重新求解
+#
+# 每个会话只存紧凑状态（约 1KB）：题面 bytes、盘面 bytearray、候选掩码 array('H')、玩家笔记 array('H')。
+# 请求到来时临时还原成 Candidates 跑技巧，用完写回，所以一个进程可以同时挂几万个会话。
+# 技巧给出的排除是逻辑推出的，直接保留在会话里（下次提示接着往下推）；
+# 填数类的提示只告诉玩家，不替玩家填，玩家自己 place 之后才写入盘面。
+#
+# 行列下标都从 0 开始。交互方式对应 generate.py 末尾的说明：
+#   点一下填数字 -> place，双击填候选 -> note，长按清除 -> erase
+#
+#   python hint.py [port]     启动 HTTP 服务（JSON）：
+#     POST   /sessions                {"puzzle": "...", "solution": "..."}  -> {"id": ...}
+#     GET    /sessions/<id>
+#     POST   /sessions/<id>/place     {"row": r, "col": c, "digit": v}
+#     POST   /sessions/<id>/note      {"row": r, "col": c, "digit": v}
+#     POST   /sessions/<id>/erase     {"row": r, "col": c}
+#     POST   /sessions/<id>/hint
+#     DELETE /sessions/<id>
+
+import json
+import secrets
+import sys
+import threading
+from array import array
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional, Tuple
+
+from scorer import (ALL_HOUSES, BOX_OF, FULL_MASK, MASK_DIGITS, PEERS, SHAPE, STRATEGIES, Candidates, Grid,
+                    _find_empty_cell)
+
+
+def _parse(puzzle) -> bytes:
+    """接受 9x9 网格、81 字符或分号格式的字符串，返回 81 字节的数字（0 为空格）"""
+    if isinstance(puzzle, str):
+        text = puzzle.strip().replace(";", "").replace(".", "0")
+        if len(text) != 81 or not text.isdigit():
+            raise ValueError("题目必须是 81 个 0-9 或 . 字符")
+        return bytes(ord(ch) - 48 for ch in text)
+    flat = [v for row in puzzle for v in row]
+    if len(flat) != 81 or any(not 0 <= v <= 9 for v in flat):
+        raise ValueError("题目必须是 9x9、取值 0-9 的网格")
+    return bytes(flat)
+
+
+def _cell(r, c) -> int:
+    """行列下标 -> 0-80 的格子编号；越界或不是整数抛 ValueError（负数不能当成从末尾数）"""
+    for name, x in (("row", r), ("col", c)):
+        if not isinstance(x, int) or isinstance(x, bool) or not 0 <= x < 9:
+            raise ValueError(f"{name} 必须是 0-8 的整数: {x!r}")
+    return r * 9 + c
+
+
+def _digit(v) -> int:
+    if not isinstance(v, int) or isinstance(v, bool) or not 1 <= v <= 9:
+        raise ValueError(f"digit 必须是 1-9 的整数: {v!r}")
+    return v
+
+
+class Session:
+    """一个玩家的盘面；cells/used 是 Candidates 的紧凑存档"""
+
+    __slots__ = ("givens", "board", "cells", "used", "filled", "notes", "solution")
+
+    def __init__(self, givens: bytes, solution: Optional[bytes] = None):
+        self.givens = givens
+        self.board = bytearray(givens)
+        self.notes = array("H", bytes(162))
+        self.solution = solution
+        self._rebuild()
+
+    def _rebuild(self):
+        """从盘面重新计算候选（擦掉数字后之前的排除不一定还成立）"""
+        board = self.board
+        used = [0] * 27
+        for i, v in enumerate(board):
+            if v:
+                bit = 1 << (v - 1)
+                r, c = divmod(i, 9)
+                if (used[r] | used[9 + c] | used[18 + BOX_OF[i]]) & bit:
+                    raise ValueError(f"({r},{c}) 的 {v} 与同行/列/宫的数字冲突")
+                used[r] |= bit
+                used[9 + c] |= bit
+                used[18 + BOX_OF[i]] |= bit
+        self.used = array("H", used)
+        self.cells = array("H", [0 if board[i] else
+                                 FULL_MASK & ~(used[i // 9] | used[9 + i % 9] | used[18 + BOX_OF[i]])
+                                 for i in range(81)])
+        self.filled = 81 - board.count(0)
+
+    def load(self) -> Tuple[Grid, Candidates]:
+        board = self.board
+        g = [list(board[i:i + 9]) for i in range(0, 81, 9)]
+        cands = Candidates.__new__(Candidates)
+        cands.shape = SHAPE
+        cands.cells = self.cells.tolist()
+        cands.rows = self.used[0:9].tolist()
+        cands.cols = self.used[9:18].tolist()
+        cands.boxes = self.used[18:27].tolist()
+        cands.dirty = ALL_HOUSES
+        cands.dirty_digits = FULL_MASK
+        cands.filled = self.filled
+        return g, cands
+
+    def save(self, g: Grid, cands: Candidates):
+        self.board = bytearray(v for row in g for v in row)
+        self.cells = array("H", cands.cells)
+        self.used = array("H", cands.rows + cands.cols + cands.boxes)
+        self.filled = cands.filled
+
+    def state(self) -> dict:
+        return {
+            "board": "".join(map(str, self.board)),
+            "givens": "".join(map(str, self.givens)),
+            "notes": {f"{i // 9},{i % 9}": list(MASK_DIGITS[m]) for i, m in enumerate(self.notes) if m},
+            "filled": self.filled,
+        }
+
+
+class HintServer:
+    """会话管理；超过 max_sessions 时淘汰最久没用的会话。所有方法线程安全"""
+
+    def __init__(self, max_sessions: int = 100000):
+        self.max_sessions = max_sessions
+        self.sessions = OrderedDict()
+        self.lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.sessions)
+
+    def _get(self, sid: str) -> Session:
+        session = self.sessions[sid]  # 不存在抛 KeyError
+        self.sessions.move_to_end(sid)
+        return session
+
+    def create(self, puzzle, solution=None) -> str:
+        session = Session(_parse(puzzle), None if solution is None else _parse(solution))
+        with self.lock:
+            sid = secrets.token_urlsafe(9)
+            self.sessions[sid] = session
+            if len(self.sessions) > self.max_sessions:
+                self.sessions.popitem(last=False)
+        return sid
+
+    def close(self, sid: str):
+        with self.lock:
+            self.sessions.pop(sid, None)
+
+    def state(self, sid: str) -> dict:
+        with self.lock:
+            return self._get(sid).state()
+
+    def place(self, sid: str, r: int, c: int, v: int) -> dict:
+        """填数字；与同行/列/宫冲突的数字拒绝，知道答案时附带是否正确"""
+        i = _cell(r, c)
+        v = _digit(v)
+        with self.lock:
+            s = self._get(sid)
+            if s.givens[i]:
+                raise ValueError("不能修改题目给出的数字")
+            if any(s.board[j] == v for j in PEERS[i]):
+                return {"ok": False, "reason": "conflict"}
+            if s.board[i]:
+                self._erase(s, i)
+            bit = 1 << (v - 1)
+            g, cands = s.load()
+            g[r][c] = v
+            cands.place(r, c, v)
+            s.save(g, cands)
+            s.notes[i] = 0
+            for j in PEERS[i]:
+                s.notes[j] &= ~bit
+            result = {"ok": True, "solved": s.filled == 81}
+            if s.solution is not None:
+                result["correct"] = s.solution[i] == v
+            return result
+
+    def _erase(self, s: Session, i: int):
+        s.board[i] = 0
+        s._rebuild()
+
+    def erase(self, sid: str, r: int, c: int) -> dict:
+        i = _cell(r, c)
+        with self.lock:
+            s = self._get(sid)
+            if s.givens[i]:
+                raise ValueError("不能修改题目给出的数字")
+            if s.board[i]:
+                self._erase(s, i)
+            else:
+                s.notes[i] = 0
+            return {"ok": True}
+
+    def note(self, sid: str, r: int, c: int, v: int) -> dict:
+        """切换玩家笔记里的一个候选"""
+        i = _cell(r, c)
+        v = _digit(v)
+        with self.lock:
+            s = self._get(sid)
+            s.notes[i] ^= 1 << (v - 1)
+            return {"ok": True, "notes": list(MASK_DIGITS[s.notes[i]])}
+
+    def hint(self, sid: str) -> dict:
+        """
+        下一步提示，type 为：
+          mistake        玩家填错的格子（需要答案）
+          contradiction  某个空格已经没有候选（之前填错了）
+          place          可以填数：cell, digit
+          eliminate      可以排除候选：eliminations [(r, c, [digits])]，排除结果保留在会话里
+          solved / stuck 已完成 / 现有技巧推不下去
+        """
+        with self.lock:
+            s = self._get(sid)
+            if s.solution is not None:
+                mistakes = [divmod(i, 9) for i, v in enumerate(s.board) if v and v != s.solution[i]]
+                if mistakes:
+                    return {"type": "mistake", "cells": mistakes}
+            if s.filled == 81:
+                return {"type": "solved"}
+            g, cands = s.load()
+            empty = _find_empty_cell(g, cands)
+            if empty >= 0:
+                return {"type": "contradiction", "cell": divmod(empty, 9)}
+
+            before = cands.cells[:]
+            steps = []
+            for strat in STRATEGIES:
+                changed, level = strat(g, cands, steps)
+                if changed:
+                    break
+            else:
+                return {"type": "stuck"}
+
+            hint = {"step": steps[0], "technique": steps[0].split(':')[0].split(' (')[0], "level": level}
+            if cands.filled > s.filled:
+                i = next(i for i in range(81) if g[i // 9][i % 9] != s.board[i])
+                hint.update(type="place", cell=divmod(i, 9), digit=g[i // 9][i % 9])
+            else:
+                s.save(g, cands)
+                hint.update(type="eliminate", eliminations=[
+                    (i // 9, i % 9, list(MASK_DIGITS[before[i] & ~cands.cells[i]]))
+                    for i in range(81) if before[i] != cands.cells[i]])
+            return hint
+
+
+class HintRequestHandler(BaseHTTPRequestHandler):
+    server_version = "SudokuHint/1.0"
+    hints: HintServer = None
+
+    def _reply(self, code: int, body: dict):
+        data = json.dumps(body, ensure_ascii=False).encode()
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _dispatch(self, method: str):
+        parts = [p for p in self.path.split("?")[0].split("/") if p]
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            body = json.loads(self.rfile.read(length) or b"{}")
+            hints = self.hints
+            if parts == ["sessions"] and method == "POST":
+                result = {"id": hints.create(body["puzzle"], body.get("solution"))}
+            elif len(parts) == 2 and parts[0] == "sessions" and method == "GET":
+                result = hints.state(parts[1])
+            elif len(parts) == 2 and parts[0] == "sessions" and method == "DELETE":
+                hints.close(parts[1])
+                result = {"ok": True}
+            elif len(parts) == 3 and parts[0] == "sessions" and method == "POST":
+                sid, action = parts[1], parts[2]
+                if action == "place":
+                    result = hints.place(sid, body["row"], body["col"], body["digit"])
+                elif action == "note":
+                    result = hints.note(sid, body["row"], body["col"], body["digit"])
+                elif action == "erase":
+                    result = hints.erase(sid, body["row"], body["col"])
+                elif action == "hint":
+                    result = hints.hint(sid)
+                else:
+                    return self._reply(404, {"error": f"unknown action {action}"})
+            else:
+                return self._reply(404, {"error": "not found"})
+        except KeyError as e:
+            if len(parts) > 1 and e.args and e.args[0] == parts[1]:
+                return self._reply(404, {"error": "unknown session"})
+            return self._reply(400, {"error": f"missing {e}"})
+        except (ValueError, TypeError, IndexError) as e:
+            return self._reply(400, {"error": str(e)})
+        self._reply(200, result)
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def do_DELETE(self):
+        self._dispatch("DELETE")
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(port: int = 8000, max_sessions: int = 100000):
+    HintRequestHandler.hints = HintServer(max_sessions)
+    server = ThreadingHTTPServer(("", port), HintRequestHandler)
+    print(f"hint server on :{port}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    serve(int(sys.argv[1]) if len(sys.argv) > 1 else 8000)
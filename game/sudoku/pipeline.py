@@ -0,0 +1,75 @@
+# sudoku/pipeline.py
+# 多进程生成题目：每个进程持有一个 random.Random，第 i 道题用 (base_seed, i) 重新播种，
+# 所以同一个 base_seed 的输出与进程数、分块大小无关
+#
+#   python pipeline.py 1000 --clues 22 30 --symmetric --seed 7 -o pack.txt
+
+import argparse
+import random
+import sys
+from typing import Iterator, Optional, Tuple
+
+from generate import Grid, generate_sudoku, grid_to_string
+from pool import imap_ordered
+
+_rng: Optional[random.Random] = None
+
+
+def _init_worker():
+    global _rng
+    _rng = random.Random()
+
+
+def puzzle_seed(base_seed: int, index: int) -> str:
+    """第 index 道题的种子"""
+    return f"{base_seed}:{index}"
+
+
+def generate_one(index: int, clue_range: Tuple[int, int], symmetric: bool, base_seed: int) -> Tuple[Grid, Grid]:
+    """生成第 index 道题，只使用本进程的 _rng"""
+    _rng.seed(puzzle_seed(base_seed, index))
+    clues = _rng.randint(clue_range[0], clue_range[1])
+    return generate_sudoku(clues=clues, symmetric=symmetric, rng=_rng)
+
+
+def _generate_block(task) -> list:
+    start, stop, clue_range, symmetric, base_seed = task
+    return [generate_one(i, clue_range, symmetric, base_seed) for i in range(start, stop)]
+
+
+def generate_stream(count: int, clue_range: Tuple[int, int] = (22, 30), symmetric: bool = False,
+                    base_seed: int = 0, workers: int = 0, chunk_size: int = 16) -> Iterator[Tuple[Grid, Grid]]:
+    """
+    按序号顺序产出 count 个 (puzzle, solution)
+    clue_range: 保留数字个数的闭区间，每道题在区间内随机取
+    workers: 进程数，0 表示 CPU 核数
+    """
+    tasks = ((start, min(start + chunk_size, count), clue_range, symmetric, base_seed)
+             for start in range(0, count, chunk_size))
+    for block in imap_ordered(_generate_block, tasks, workers, initializer=_init_worker):
+        yield from block
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="多进程生成数独题目")
+    parser.add_argument("count", type=int, help="题目数量")
+    parser.add_argument("--clues", type=int, nargs=2, default=(22, 30), metavar=("MIN", "MAX"), help="保留数字个数范围")
+    parser.add_argument("--symmetric", action="store_true", help="中心对称挖空")
+    parser.add_argument("--seed", type=int, default=0, help="基础随机种子")
+    parser.add_argument("--workers", type=int, default=0, help="进程数，默认 CPU 核数")
+    parser.add_argument("--chunk-size", type=int, default=16, help="每个任务包含的题目数")
+    parser.add_argument("-o", "--output", help="输出文件（每行一道题），默认标准输出")
+    args = parser.parse_args(argv)
+
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    try:
+        for puzzle, _ in generate_stream(args.count, tuple(args.clues), args.symmetric,
+                                         args.seed, args.workers, args.chunk_size):
+            out.write(grid_to_string(puzzle) + "\n")
+    finally:
+        if args.output:
+            out.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+# sudoku/pool.py
+# 进程池辅助：按块分发任务，按提交顺序取回结果，同时在途的块数有上限
+
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Callable, Iterable, Iterator, List
+
+
+def iter_chunks(items: Iterable, size: int) -> Iterator[List]:
+    it = iter(items)
+    while True:
+        chunk = list(islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def imap_ordered(fn: Callable, tasks: Iterable, workers: int = 0,
+                 initializer: Callable = None, initargs: tuple = ()) -> Iterator:
+    """
+    在进程池里对每个任务调用 fn，按任务顺序产出返回值
+    workers: 进程数，0 表示 CPU 核数；1 表示在当前进程内执行（同样会调用 initializer）
+    最多 workers*2 个任务在途，任务来自生成器时不会一次性读完
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        if initializer:
+            initializer(*initargs)
+        for task in tasks:
+            yield fn(task)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=initializer, initargs=initargs) as executor:
+        pending = deque()
+        for task in tasks:
+            pending.append(executor.submit(fn, task))
+            if len(pending) >= workers * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
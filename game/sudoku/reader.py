@@ -0,0 +1,150 @@
+# sudoku/reader.py
+# 流式读取题库：按块读文件，整块一次 bytes.translate + np.frombuffer 解码，不逐行 split、不逐字符 int()
+# 支持两种格式（可以混在同一个文件里）：
+#   81 个字符一行：   801700400000100025...       （0 或 . 表示空格）
+#   分号分隔 9 段：   8.17..4..;...1...25;...     （恰好 9 段，每段 9 个字符）
+# 行尾的 \r 忽略；行首行尾的空白按行单独处理（少见，不走整块解码），行内的空白和段数/段长不对都算格式错误
+# 每块产出一个 (k,81) 的 uint8 数组，文件多大都只占一块的内存，读到第一块就可以开始评分
+#
+#   python reader.py puzzle.txt
+
+import sys
+from typing import BinaryIO, Iterator, List, Union
+
+import numpy as np
+
+from scorer import Grid
+
+BLOCK_SIZE = 1 << 22
+NEWLINE = 10
+INVALID = 255
+
+SEMICOLON = 11
+CARRIAGE_RETURN = 12
+
+# '0'-'9' -> 0-9，'.' -> 0，换行保留为 10，分号 11，回车 12，其余字符（包括空白）都映射为非法值；
+# 逐字节一一对应，不删字符，解码后的位置和原始数据的位置相同
+_TABLE = bytearray([INVALID]) * 256
+for _d in range(10):
+    _TABLE[ord("0") + _d] = _d
+_TABLE[ord(".")] = 0
+_TABLE[NEWLINE] = NEWLINE
+_TABLE[ord(";")] = SEMICOLON
+_TABLE[ord("\r")] = CARRIAGE_RETURN
+_TABLE = bytes(_TABLE)
+_OFFSETS = np.arange(81)
+# 分号格式里第 i 个格子在行内的位置（每 9 个字符后面跟一个分号）
+_SEMICOLON_OFFSETS = _OFFSETS + _OFFSETS // 9
+_SEPARATORS = np.arange(9, 80, 10)
+_DIGITS = frozenset("0123456789.")
+
+
+def _parse_line(text: str) -> List[int]:
+    """整块解码没通过的行：去掉行首行尾的空白后按两种格式严格检查，空行返回 []，不合法抛 ValueError"""
+    text = text.strip()
+    if not text:
+        return []
+    if ";" in text:
+        segments = text.split(";")
+        if len(segments) != 9 or any(len(seg) != 9 for seg in segments):
+            raise ValueError("分号格式需要 9 段、每段 9 个字符")
+        flat = "".join(segments)
+    elif len(text) != 81:
+        raise ValueError(f"需要 81 个字符，实际 {len(text)} 个")
+    else:
+        flat = text
+    if not _DIGITS.issuperset(flat):
+        raise ValueError("只能包含 0-9 或 .（行内不能有空白）")
+    return [0 if ch == "." else int(ch) for ch in flat]
+
+
+def _decode(data: bytes, first_line: int) -> np.ndarray:
+    """data 以换行结尾，返回 (k,81) 数组；空行跳过，格式错误抛 ValueError（带行号）"""
+    arr = np.frombuffer(data.translate(_TABLE), dtype=np.uint8)
+    ends = np.flatnonzero(arr == NEWLINE)
+    starts = np.empty_like(ends)
+    starts[0] = 0
+    starts[1:] = ends[:-1] + 1
+    # 去掉行尾的 \r
+    stops = ends - ((ends > starts) & (arr[ends - 1] == CARRIAGE_RETURN))
+    lengths = stops - starts
+
+    # 长度对的行按格式取出 81 格：81 字符行每一位、89 字符行除分隔位之外的每一位都必须是 0-9，
+    # 89 字符行的第 9、19、…、79 位必须是分号；长度固定，所以行内每个字节都检查到了
+    plain = np.flatnonzero(lengths == 81)
+    semicolon = np.flatnonzero(lengths == 89)
+    rows = np.empty((len(ends), 81), dtype=np.uint8)
+    rows[plain] = arr[starts[plain, None] + _OFFSETS]
+    rows[semicolon] = arr[starts[semicolon, None] + _SEMICOLON_OFFSETS]
+    bad = rows.max(axis=1, initial=0) >= 10
+    bad[semicolon] |= (arr[starts[semicolon, None] + _SEPARATORS] != SEMICOLON).any(axis=1)
+    bad |= (lengths != 81) & (lengths != 89)
+
+    # 其余非空行逐行检查（行首行尾的空白、纯空白行在这里放行）
+    fallback = np.flatnonzero(bad & (ends > starts))
+    keep = ~bad
+    for line in fallback.tolist():
+        try:
+            flat = _parse_line(data[starts[line]:ends[line]].decode("utf-8", "replace"))
+        except ValueError as e:
+            raise ValueError(f"第 {first_line + line} 行不是合法的数独：{e}") from None
+        if flat:
+            rows[line] = flat
+            keep[line] = True
+    return rows[keep]
+
+
+def iter_puzzle_blocks(source: Union[str, BinaryIO], block_size: int = BLOCK_SIZE) -> Iterator[np.ndarray]:
+    """按块产出 (k,81) 的 uint8 数组，source 是文件名或以二进制方式打开的文件"""
+    if isinstance(source, str):
+        with open(source, "rb") as f:
+            yield from iter_puzzle_blocks(f, block_size)
+        return
+
+    carry = b""
+    line_no = 1
+    while True:
+        chunk = source.read(block_size)
+        if not chunk:
+            break
+        data = carry + chunk
+        cut = data.rfind(b"\n") + 1
+        if cut == 0:
+            # 一整块都没有换行，继续往后读
+            carry = data
+            continue
+        carry = data[cut:]
+        block = _decode(data[:cut], line_no)
+        line_no += data.count(b"\n", 0, cut)
+        if len(block):
+            yield block
+    if carry.strip():
+        block = _decode(carry + b"\n", line_no)
+        if len(block):
+            yield block
+
+
+def iter_flat_puzzles(source: Union[str, BinaryIO], block_size: int = BLOCK_SIZE) -> Iterator[List[int]]:
+    """逐题产出长度 81 的整数列表（按行展开）"""
+    for block in iter_puzzle_blocks(source, block_size):
+        yield from block.tolist()
+
+
+def iter_puzzles(source: Union[str, BinaryIO], block_size: int = BLOCK_SIZE) -> Iterator[Grid]:
+    """逐题产出 9x9 网格，可以直接交给 solve_with_logic"""
+    for flat in iter_flat_puzzles(source, block_size):
+        yield [flat[i:i + 9] for i in range(0, 81, 9)]
+
+
+if __name__ == "__main__":
+    import time
+    from vector import grade_batch
+
+    filename = sys.argv[1] if len(sys.argv) > 1 else "puzzle.txt"
+    start = time.time()
+    total = solved = 0
+    for block in iter_puzzle_blocks(filename):
+        results = grade_batch(block)
+        total += len(results)
+        solved += sum(1 for r in results if r[0])
+    print(f"{total} 道题，解出 {solved} 道，耗时 {time.time() - start:.3f} 秒")
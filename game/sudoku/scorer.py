@@ -1,9 +1,178 @@
 ## 题目评分器
-from typing import List, Tuple
+import time
+from typing import List, Optional, Tuple
 from itertools import product, combinations
 
 Grid = List[List[int]]
 
+# ===== 位掩码候选数引擎 =====
+# 候选数用 N 位掩码表示：第 v-1 位为 1 表示数字 v 仍是候选
+# 盘面几何（单元、同视格）都放在 Shape 里，各技巧只按 Shape 的表扫描，9x9 只是 Shape(3, 3) 这个实例；
+# variant.py 的 4x4 ... 16x16 用的是同一套 Candidates / 技巧 / solve_with_logic
+
+class Shape:
+    """盘面几何：宫为 box_rows 行 x box_cols 列，N = box_rows * box_cols"""
+
+    def __init__(self, box_rows: int, box_cols: int):
+        n = box_rows * box_cols
+        self.box_rows = box_rows
+        self.box_cols = box_cols
+        self.n = n
+        self.size = n * n
+        self.full = (1 << n) - 1
+        self.box_of = [(i // n) // box_rows * box_rows + (i % n) // box_cols for i in range(n * n)]
+        # 3N 个单元依次是 N 行、N 列、N 宫，宫内格子按行优先
+        self.houses = ([[r * n + c for c in range(n)] for r in range(n)]
+                       + [[r * n + c for r in range(n)] for c in range(n)]
+                       + [[i for i in range(n * n) if self.box_of[i] == b] for b in range(n)])
+        self.house_kinds = ["row"] * n + ["col"] * n + ["box"] * n
+        self.all_houses = (1 << (3 * n)) - 1
+        # 格子所在的三个单元，对应 dirty 掩码中的位
+        self.house_bits = [(1 << (i // n)) | (1 << (n + i % n)) | (1 << (2 * n + self.box_of[i]))
+                           for i in range(n * n)]
+        self.peers = [sorted(set(self.houses[i // n] + self.houses[n + i % n]
+                                 + self.houses[2 * n + self.box_of[i]]) - {i})
+                      for i in range(n * n)]
+        # 同视格的位图，求几个格子共同能看到的格子时直接按位与
+        self.peer_bits = [sum(1 << j for j in self.peers[i]) for i in range(n * n)]
+
+    def __repr__(self) -> str:
+        return f"Shape({self.box_rows}, {self.box_cols})"
+
+
+_SHAPES = {}
+
+def get_shape(n: int, box_rows: Optional[int] = None) -> Shape:
+    """N 阶盘面（表只建一次）；不指定宫的行数时取不超过 sqrt(N) 的最大因子（6 -> 2x3, 12 -> 3x4）"""
+    if box_rows is None:
+        box_rows = max(d for d in range(1, int(n ** 0.5) + 1) if n % d == 0)
+    if n % box_rows or not 1 <= n <= 25:
+        raise ValueError(f"不支持的尺寸: {n}")
+    shape = _SHAPES.get((n, box_rows))
+    if shape is None:
+        shape = _SHAPES[n, box_rows] = Shape(box_rows, n // box_rows)
+    return shape
+
+def shape_of(g: Grid) -> Shape:
+    return get_shape(len(g))
+
+
+SHAPE = get_shape(9)
+# 9x9 的表，供 hint.py / targeted.py 这些只处理标准数独的模块直接使用
+FULL_MASK = SHAPE.full
+ALL_HOUSES = SHAPE.all_houses
+BOX_OF = SHAPE.box_of
+PEERS = SHAPE.peers
+MASK_DIGITS = [tuple(v for v in range(1, 10) if m >> (v - 1) & 1) for m in range(1 << 9)]
+
+
+class Candidates:
+    """
+    基于位掩码的候选数引擎，shape 默认按盘面大小取
+    cells[r*N+c] 是格子的候选掩码（已填格子为 0），
+    rows/cols/boxes 是每行、每列、每宫已使用数字的掩码，随 place() 增量维护；
+    dirty / dirty_digits 记录自上次读取以来候选发生变化的单元（3N 位）和数字（N 位），filled 是已填格子数
+    """
+
+    __slots__ = ("shape", "cells", "rows", "cols", "boxes", "dirty", "dirty_digits", "filled")
+
+    def __init__(self, g: Grid, shape: Optional[Shape] = None):
+        shape = shape or shape_of(g)
+        n = shape.n
+        box_of = shape.box_of
+        self.shape = shape
+        self.dirty = shape.all_houses
+        self.dirty_digits = shape.full
+        self.filled = 0
+        self.rows = [0] * n
+        self.cols = [0] * n
+        self.boxes = [0] * n
+        for r in range(n):
+            for c in range(n):
+                v = g[r][c]
+                if v:
+                    self.filled += 1
+                    bit = 1 << (v - 1)
+                    self.rows[r] |= bit
+                    self.cols[c] |= bit
+                    self.boxes[box_of[r * n + c]] |= bit
+        self.cells = [0] * shape.size
+        for r in range(n):
+            for c in range(n):
+                if g[r][c] == 0:
+                    i = r * n + c
+                    self.cells[i] = shape.full & ~(self.rows[r] | self.cols[c] | self.boxes[box_of[i]])
+
+    def copy(self) -> "Candidates":
+        other = Candidates.__new__(Candidates)
+        other.shape = self.shape
+        other.cells = self.cells[:]
+        other.rows = self.rows[:]
+        other.cols = self.cols[:]
+        other.boxes = self.boxes[:]
+        other.dirty = self.dirty
+        other.dirty_digits = self.dirty_digits
+        other.filled = self.filled
+        return other
+
+    def mask(self, r: int, c: int) -> int:
+        return self.cells[r * self.shape.n + c]
+
+    def count(self, r: int, c: int) -> int:
+        return self.cells[r * self.shape.n + c].bit_count()
+
+    def has(self, r: int, c: int, v: int) -> bool:
+        return self.cells[r * self.shape.n + c] >> (v - 1) & 1 == 1
+
+    def values(self, r: int, c: int) -> List[int]:
+        """按升序返回格子的候选数字"""
+        return list(_digits(self.cells[r * self.shape.n + c]))
+
+    def remove(self, r: int, c: int, v: int) -> bool:
+        """删除单个候选，返回是否真的删掉了"""
+        return self.remove_mask(r, c, 1 << (v - 1))
+
+    def remove_mask(self, r: int, c: int, mask: int) -> bool:
+        """删除掩码中的全部候选，返回是否有候选被删掉"""
+        return self.remove_cell(r * self.shape.n + c, mask)
+
+    def remove_cell(self, i: int, mask: int) -> bool:
+        """按格子下标删除掩码中的全部候选，各技巧内部用这个"""
+        m = self.cells[i]
+        if m & mask:
+            self.cells[i] = m & ~mask
+            self.dirty |= self.shape.house_bits[i]
+            self.dirty_digits |= m & mask
+            return True
+        return False
+
+    def take_dirty(self) -> Tuple[int, int]:
+        """取出并清空 (dirty, dirty_digits)"""
+        dirty, digits = self.dirty, self.dirty_digits
+        self.dirty = self.dirty_digits = 0
+        return dirty, digits
+
+    def place(self, r: int, c: int, v: int):
+        """在 (r,c) 填入 v：更新已用掩码，并从同行、同列、同宫格中移除 v"""
+        shape = self.shape
+        bit = 1 << (v - 1)
+        cells = self.cells
+        house_bits = shape.house_bits
+        i = r * shape.n + c
+        self.rows[r] |= bit
+        self.cols[c] |= bit
+        self.boxes[shape.box_of[i]] |= bit
+        self.dirty_digits |= cells[i] | bit
+        cells[i] = 0
+        self.filled += 1
+        dirty = house_bits[i]
+        for j in shape.peers[i]:
+            if cells[j] & bit:
+                cells[j] &= ~bit
+                dirty |= house_bits[j]
+        self.dirty |= dirty
+
+
 def print_grid(g: Grid):
     """打印数独网格"""
     for r in range(9):
@@ -32,15 +201,23 @@ def is_valid(g: Grid, r: int, c: int, v: int) -> bool:
     return True
 
 def get_candidates(g: Grid) -> List[List[List[int]]]:
-    """计算每个空格的候选数字"""
+    """计算每个空格的候选数字（列表形式）"""
     cands = [[[] for _ in range(9)] for _ in range(9)]
     for r,c in product(range(9), repeat=2):
         if g[r][c] == 0:
             cands[r][c] = [v for v in range(1,10) if is_valid(g,r,c,v)]
     return cands
 
-def update_candidates(g: Grid, cands: List[List[List[int]]], r: int, c: int, v: int):
+def get_candidate_masks(g: Grid) -> Candidates:
+    """计算每个空格的候选数字（位掩码形式），各 apply_* 技巧都运行在它上面"""
+    return Candidates(g)
+
+def update_candidates(g: Grid, cands, r: int, c: int, v: int):
     """当位置(r,c)确定为v时，更新所有相关候选数字"""
+    if isinstance(cands, Candidates):
+        cands.place(r, c, v)
+        return
+
     # 清除该位置的候选数字
     cands[r][c] = []
     
@@ -60,473 +237,589 @@ def update_candidates(g: Grid, cands: List[List[List[int]]], r: int, c: int, v:
             if v in cands[i][j]:
                 cands[i][j].remove(v)
 
+def _lowest_digit(mask: int) -> int:
+    """掩码中最小的数字"""
+    return (mask & -mask).bit_length()
+
+def _digits(mask: int) -> Tuple[int, ...]:
+    """掩码中的数字，按升序"""
+    out = []
+    while mask:
+        bit = mask & -mask
+        out.append(bit.bit_length())
+        mask ^= bit
+    return tuple(out)
+
+def _single_positions(masks) -> int:
+    """一个单元（行/列/宫）内恰好只出现一次的候选数字掩码"""
+    once = twice = 0
+    for m in masks:
+        twice |= once & m
+        once |= m
+    return once & ~twice
+
+def _mask_indexes(mask: int) -> List[int]:
+    """掩码中置位的下标（0 起），按升序"""
+    return [d - 1 for d in _digits(mask)]
+
+def _bit_cells(bits: int) -> List[int]:
+    """格子位图中的格子下标，按升序"""
+    out = []
+    while bits:
+        low = bits & -bits
+        out.append(low.bit_length() - 1)
+        bits ^= low
+    return out
+
+def _rc(n: int, i: int) -> str:
+    """格子下标 -> 步骤文字里的 (行,列)，从 1 开始"""
+    return f"({i // n + 1},{i % n + 1})"
+
 # ===== 基础技巧 =====
+# 每个技巧都是 (g, cands, steps, houses, digits) -> (changed, level)，几何全部取自 cands.shape；
+# houses（3N 位）/ digits（N 位）是增量模式传入的变化范围，技巧只扫和它们有关的部分，默认 -1 表示全部
 
-def apply_naked_single(g, cands, steps):
+def _place_naked_single(g, cands, i, steps):
+    r, c = divmod(i, cands.shape.n)
+    v = _lowest_digit(cands.cells[i])
+    g[r][c] = v
+    update_candidates(g, cands, r, c, v)
+    steps.append(f"Naked Single: ({r+1},{c+1}) = {v}")
+    return True, 1
+
+def _place_hidden_single(g, cands, h, single, steps):
+    shape = cands.shape
+    v = _lowest_digit(single)
+    bit = 1 << (v - 1)
+    i = next(i for i in shape.houses[h] if cands.cells[i] & bit)
+    r, c = divmod(i, shape.n)
+    g[r][c] = v
+    update_candidates(g, cands, r, c, v)
+    steps.append(f"Hidden Single ({shape.house_kinds[h]}): ({r+1},{c+1}) = {v}")
+    return True, 2
+
+def apply_naked_single(g, cands, steps, houses=-1, digits=-1):
     """唯一候选数法 - 某个格子只有一个候选数字"""
-    for r,c in product(range(9), repeat=2):
-        if g[r][c]==0 and len(cands[r][c])==1:
-            v = cands[r][c][0]
-            g[r][c] = v
-            update_candidates(g, cands, r, c, v)
-            steps.append(f"Naked Single: ({r+1},{c+1}) = {v}")
-            return True, 1
+    for i, m in enumerate(cands.cells):
+        if m and not m & (m - 1):
+            return _place_naked_single(g, cands, i, steps)
     return False, 0
 
-def apply_hidden_single(g, cands, steps):
-    """隐性唯一数 - 某个数字在行/列/宫格中只能放在一个位置"""
-    # 检查行
-    for r in range(9):
-        for v in range(1,10):
-            cells = [c for c in range(9) if g[r][c]==0 and v in cands[r][c]]
-            if len(cells)==1:
-                c = cells[0]
-                g[r][c] = v
-                update_candidates(g, cands, r, c, v)
-                steps.append(f"Hidden Single (row): ({r+1},{c+1}) = {v}")
-                return True, 2
-    
-    # 检查列
-    for c in range(9):
-        for v in range(1,10):
-            cells = [r for r in range(9) if g[r][c]==0 and v in cands[r][c]]
-            if len(cells)==1:
-                r = cells[0]
-                g[r][c] = v
-                update_candidates(g, cands, r, c, v)
-                steps.append(f"Hidden Single (col): ({r+1},{c+1}) = {v}")
-                return True, 2
-    
-    # 检查宫格
-    for box_r in range(3):
-        for box_c in range(3):
-            for v in range(1,10):
-                cells = []
-                for r in range(box_r*3, box_r*3+3):
-                    for c in range(box_c*3, box_c*3+3):
-                        if g[r][c]==0 and v in cands[r][c]:
-                            cells.append((r,c))
-                if len(cells)==1:
-                    r, c = cells[0]
-                    g[r][c] = v
-                    update_candidates(g, cands, r, c, v)
-                    steps.append(f"Hidden Single (box): ({r+1},{c+1}) = {v}")
-                    return True, 2
-    
+def apply_hidden_single(g, cands, steps, houses=-1, digits=-1):
+    """隐性唯一数 - 某个数字在行/列/宫格中只能放在一个位置（依次检查行、列、宫格）"""
+    cells = cands.cells
+    for h, house in enumerate(cands.shape.houses):
+        single = _single_positions([cells[i] for i in house])
+        if single:
+            return _place_hidden_single(g, cands, h, single, steps)
     return False, 0
 
 # ===== 中级技巧 =====
 
-def apply_naked_pair(g, cands, steps):
-    """裸对数 - 两个格子有相同的两个候选数字，可以从其他格子中排除这些数字"""
-    # 检查行
-    for r in range(9):
-        pairs = [(c,tuple(sorted(cands[r][c]))) for c in range(9) if len(cands[r][c])==2 and g[r][c]==0]
-        for i in range(len(pairs)):
-            for j in range(i+1, len(pairs)):
-                if pairs[i][1]==pairs[j][1]:
-                    eliminated = False
-                    for c in range(9):
-                        if c not in (pairs[i][0], pairs[j][0]) and g[r][c]==0:
-                            before_len = len(cands[r][c])
-                            cands[r][c] = [x for x in cands[r][c] if x not in pairs[i][1]]
-                            if len(cands[r][c]) < before_len:
-                                eliminated = True
-                    if eliminated:
-                        steps.append(f"Naked Pair (row {r+1}): cells ({r+1},{pairs[i][0]+1}) and ({r+1},{pairs[j][0]+1}) = {pairs[i][1]}")
-                        return True, 3
-    
-    # 检查列
-    for c in range(9):
-        pairs = [(r,tuple(sorted(cands[r][c]))) for r in range(9) if len(cands[r][c])==2 and g[r][c]==0]
-        for i in range(len(pairs)):
-            for j in range(i+1, len(pairs)):
-                if pairs[i][1]==pairs[j][1]:
-                    eliminated = False
-                    for r in range(9):
-                        if r not in (pairs[i][0], pairs[j][0]) and g[r][c]==0:
-                            before_len = len(cands[r][c])
-                            cands[r][c] = [x for x in cands[r][c] if x not in pairs[i][1]]
-                            if len(cands[r][c]) < before_len:
-                                eliminated = True
-                    if eliminated:
-                        steps.append(f"Naked Pair (col {c+1}): cells ({pairs[i][0]+1},{c+1}) and ({pairs[j][0]+1},{c+1}) = {pairs[i][1]}")
-                        return True, 3
-    
+def apply_naked_pair(g, cands, steps, houses=-1, digits=-1):
+    """裸对数 - 两个格子有相同的两个候选数字，可以从其他格子中排除这些数字（只查行和列）"""
+    shape = cands.shape
+    n = shape.n
+    cells = cands.cells
+    for h in range(2 * n):
+        if not houses >> h & 1:
+            continue
+        house = shape.houses[h]
+        pairs = [i for i in house if cells[i].bit_count() == 2]
+        for a, b in combinations(pairs, 2):
+            if cells[a] == cells[b]:
+                mask = cells[a]
+                eliminated = False
+                for i in house:
+                    if i != a and i != b and cands.remove_cell(i, mask):
+                        eliminated = True
+                if eliminated:
+                    steps.append(f"Naked Pair ({shape.house_kinds[h]} {h % n + 1}): cells {_rc(n, a)} and {_rc(n, b)} = {_digits(mask)}")
+                    return True, 3
+    return False, 0
+
+def apply_hidden_pair(g, cands, steps, houses=-1, digits=-1):
+    """隐性对数 - 两个数字在某个单元中都只能放在相同的两个格子，这两个格子的其他候选可以排除"""
+    shape = cands.shape
+    n = shape.n
+    cells = cands.cells
+    for h, house in enumerate(shape.houses):
+        if not houses >> h & 1:
+            continue
+        # 每个数字在该单元中的位置掩码（第 k 位表示单元内第 k 个格子）
+        pos = [0] * (n + 1)
+        for k, i in enumerate(house):
+            m = cells[i]
+            while m:
+                bit = m & -m
+                m ^= bit
+                pos[bit.bit_length()] |= 1 << k
+        for d1 in range(1, n):
+            if pos[d1].bit_count() != 2:
+                continue
+            for d2 in range(d1 + 1, n + 1):
+                if pos[d2] != pos[d1]:
+                    continue
+                keep = (1 << (d1 - 1)) | (1 << (d2 - 1))
+                i1, i2 = (house[k] for k in _mask_indexes(pos[d1]))
+                eliminated = False
+                for i in (i1, i2):
+                    if cands.remove_cell(i, shape.full & ~keep):
+                        eliminated = True
+                if eliminated:
+                    steps.append(f"Hidden Pair ({shape.house_kinds[h]} {h % n + 1}): cells {_rc(n, i1)} and {_rc(n, i2)} = {(d1, d2)}")
+                    return True, 4
     return False, 0
 
-def apply_pointing_pair(g, cands, steps):
+def apply_pointing_pair(g, cands, steps, houses=-1, digits=-1):
     """宫格行列排除 - 如果某个数字在宫格中只能出现在同一行或同一列，则可以从该行或列的其他宫格中排除"""
-    for box_r in range(3):
-        for box_c in range(3):
-            for v in range(1, 10):
-                # 找到该宫格中包含数字v的所有位置
-                positions = []
-                for r in range(box_r*3, box_r*3+3):
-                    for c in range(box_c*3, box_c*3+3):
-                        if g[r][c] == 0 and v in cands[r][c]:
-                            positions.append((r, c))
-                
-                if len(positions) >= 2:
-                    # 检查是否都在同一行
-                    if len(set(pos[0] for pos in positions)) == 1:
-                        row = positions[0][0]
-                        eliminated = False
-                        for c in range(9):
-                            if c < box_c*3 or c >= box_c*3+3:  # 不在当前宫格
-                                if g[row][c] == 0 and v in cands[row][c]:
-                                    cands[row][c].remove(v)
-                                    eliminated = True
-                        if eliminated:
-                            steps.append(f"Pointing Pair: digit {v} in box ({box_r+1},{box_c+1}) eliminates from row {row+1}")
-                            return True, 4
-                    
-                    # 检查是否都在同一列
-                    if len(set(pos[1] for pos in positions)) == 1:
-                        col = positions[0][1]
-                        eliminated = False
-                        for r in range(9):
-                            if r < box_r*3 or r >= box_r*3+3:  # 不在当前宫格
-                                if g[r][col] == 0 and v in cands[r][col]:
-                                    cands[r][col].remove(v)
-                                    eliminated = True
-                        if eliminated:
-                            steps.append(f"Pointing Pair: digit {v} in box ({box_r+1},{box_c+1}) eliminates from col {col+1}")
-                            return True, 4
-    
+    shape = cands.shape
+    n = shape.n
+    cells = cands.cells
+    stacks = n // shape.box_cols
+    for b in range(n):
+        house = shape.houses[2 * n + b]
+        box_r, box_c = divmod(b, stacks)
+        for v in range(1, n + 1):
+            bit = 1 << (v - 1)
+            if not digits & bit:
+                continue
+            # 该宫格中包含数字 v 的所有位置
+            positions = [i for i in house if cells[i] & bit]
+            if len(positions) < 2:
+                continue
+            # 依次检查是否都在同一行、同一列
+            for kind in (0, 1):
+                lines = {i // n if kind == 0 else i % n for i in positions}
+                if len(lines) != 1:
+                    continue
+                line = lines.pop()
+                eliminated = False
+                for i in shape.houses[kind * n + line]:
+                    if shape.box_of[i] != b and cands.remove_cell(i, bit):
+                        eliminated = True
+                if eliminated:
+                    steps.append(f"Pointing Pair: digit {v} in box ({box_r+1},{box_c+1}) eliminates from {shape.house_kinds[kind * n]} {line+1}")
+                    return True, 4
     return False, 0
 
-def apply_box_line_reduction(g, cands, steps):
+def apply_box_line_reduction(g, cands, steps, houses=-1, digits=-1):
     """宫格排除 - 如果某个数字在行或列中只能出现在某个宫格内，则可以从该宫格的其他位置排除"""
-    # 检查行
-    for r in range(9):
-        for v in range(1, 10):
-            positions = [c for c in range(9) if g[r][c] == 0 and v in cands[r][c]]
-            if len(positions) >= 2:
-                # 检查是否都在同一个宫格
-                boxes = set(c // 3 for c in positions)
-                if len(boxes) == 1:
-                    box_c = positions[0] // 3
-                    box_r = r // 3
-                    eliminated = False
-                    for br in range(box_r*3, box_r*3+3):
-                        for bc in range(box_c*3, box_c*3+3):
-                            if br != r and g[br][bc] == 0 and v in cands[br][bc]:
-                                cands[br][bc].remove(v)
-                                eliminated = True
-                    if eliminated:
-                        steps.append(f"Box-Line Reduction: digit {v} in row {r+1} eliminates from box ({box_r+1},{box_c+1})")
-                        return True, 4
-    
-    # 检查列
-    for c in range(9):
-        for v in range(1, 10):
-            positions = [r for r in range(9) if g[r][c] == 0 and v in cands[r][c]]
-            if len(positions) >= 2:
-                # 检查是否都在同一个宫格
-                boxes = set(r // 3 for r in positions)
-                if len(boxes) == 1:
-                    box_r = positions[0] // 3
-                    box_c = c // 3
-                    eliminated = False
-                    for br in range(box_r*3, box_r*3+3):
-                        for bc in range(box_c*3, box_c*3+3):
-                            if bc != c and g[br][bc] == 0 and v in cands[br][bc]:
-                                cands[br][bc].remove(v)
-                                eliminated = True
-                    if eliminated:
-                        steps.append(f"Box-Line Reduction: digit {v} in col {c+1} eliminates from box ({box_r+1},{box_c+1})")
-                        return True, 4
-    
+    shape = cands.shape
+    n = shape.n
+    cells = cands.cells
+    stacks = n // shape.box_cols
+    # 先查行，再查列
+    for h in range(2 * n):
+        house = shape.houses[h]
+        for v in range(1, n + 1):
+            bit = 1 << (v - 1)
+            if not digits & bit:
+                continue
+            positions = [i for i in house if cells[i] & bit]
+            if len(positions) < 2:
+                continue
+            # 检查是否都在同一个宫格
+            boxes = {shape.box_of[i] for i in positions}
+            if len(boxes) != 1:
+                continue
+            b = boxes.pop()
+            eliminated = False
+            for i in shape.houses[2 * n + b]:
+                if i not in house and cands.remove_cell(i, bit):
+                    eliminated = True
+            if eliminated:
+                box_r, box_c = divmod(b, stacks)
+                steps.append(f"Box-Line Reduction: digit {v} in {shape.house_kinds[h]} {h % n + 1} eliminates from box ({box_r+1},{box_c+1})")
+                return True, 4
     return False, 0
 
-def apply_naked_triple(g, cands, steps):
-    """裸三数组 - 三个格子共同拥有相同的三个候选数字"""
-    # 检查行
-    for r in range(9):
-        cells = [(c, tuple(sorted(cands[r][c]))) for c in range(9) if 2 <= len(cands[r][c]) <= 3 and g[r][c] == 0]
-        for combo in combinations(cells, 3):
-            all_values = set()
-            for _, values in combo:
-                all_values.update(values)
-            if len(all_values) == 3:
+def apply_naked_triple(g, cands, steps, houses=-1, digits=-1):
+    """裸三数组 - 三个格子共同拥有相同的三个候选数字（只查行）"""
+    shape = cands.shape
+    n = shape.n
+    cells = cands.cells
+    for r in range(n):
+        if not houses >> r & 1:
+            continue
+        house = shape.houses[r]
+        row_cells = [i for i in house if 2 <= cells[i].bit_count() <= 3]
+        for combo in combinations(row_cells, 3):
+            all_values = cells[combo[0]] | cells[combo[1]] | cells[combo[2]]
+            if all_values.bit_count() == 3:
                 eliminated = False
-                for c in range(9):
-                    if c not in [cell[0] for cell in combo] and g[r][c] == 0:
-                        before_len = len(cands[r][c])
-                        cands[r][c] = [x for x in cands[r][c] if x not in all_values]
-                        if len(cands[r][c]) < before_len:
-                            eliminated = True
+                for i in house:
+                    if i not in combo and cands.remove_cell(i, all_values):
+                        eliminated = True
                 if eliminated:
-                    cols = [cell[0]+1 for cell in combo]
-                    steps.append(f"Naked Triple (row {r+1}): cells {cols} = {sorted(all_values)}")
+                    steps.append(f"Naked Triple (row {r+1}): cells {[i % n + 1 for i in combo]} = {list(_digits(all_values))}")
                     return True, 5
-    
     return False, 0
 
 # ===== 高级技巧 =====
 
-def apply_xwing(g, cands, steps):
-    """X-Wing 模式 - 在两行（或两列）中，某个数字只能出现在相同的两列（或两行）中"""
-    # 检查行中的X-Wing
-    for v in range(1, 10):
-        row_positions = {}
-        for r in range(9):
-            cols = [c for c in range(9) if g[r][c] == 0 and v in cands[r][c]]
-            if len(cols) == 2:
-                key = tuple(cols)
-                if key not in row_positions:
-                    row_positions[key] = []
-                row_positions[key].append(r)
-        
-        for cols, rows in row_positions.items():
-            if len(rows) == 2:
-                # 找到X-Wing，从这两列的其他行中排除该数字
+def _line_positions(cells, house, bit: int) -> int:
+    """数字在一行（列）中可放位置的掩码，第 k 位对应单元内第 k 个格子"""
+    m = 0
+    for k, i in enumerate(house):
+        if cells[i] & bit:
+            m |= 1 << k
+    return m
+
+def _fish(cands, steps, digits, size: int, name: str, level: int):
+    """X-Wing（size=2）/ Swordfish（size=3）：size 条线的候选位置掩码相同且恰好 size 个位置，先查行再查列"""
+    shape = cands.shape
+    n = shape.n
+    cells = cands.cells
+    for base, kind, other in ((0, "rows", "cols"), (n, "cols", "rows")):
+        for v in range(1, n + 1):
+            bit = 1 << (v - 1)
+            if not digits & bit:
+                continue
+            lines = {}
+            for line in range(n):
+                m = _line_positions(cells, shape.houses[base + line], bit)
+                if 2 <= m.bit_count() <= size:
+                    lines.setdefault(m, []).append(line)
+            for m, found in lines.items():
+                if len(found) != size or m.bit_count() != size:
+                    continue
+                # 从交叉的这几条线的其他位置排除该数字
+                cross = _mask_indexes(m)
                 eliminated = False
-                for r in range(9):
-                    if r not in rows:
-                        for c in cols:
-                            if g[r][c] == 0 and v in cands[r][c]:
-                                cands[r][c].remove(v)
-                                eliminated = True
+                for line in range(n):
+                    if line in found:
+                        continue
+                    house = shape.houses[base + line]
+                    for k in cross:
+                        if cands.remove_cell(house[k], bit):
+                            eliminated = True
                 if eliminated:
-                    steps.append(f"X-Wing: digit {v} in rows {[r+1 for r in rows]} cols {[c+1 for c in cols]}")
-                    return True, 6
-    
-    # 检查列中的X-Wing
-    for v in range(1, 10):
-        col_positions = {}
-        for c in range(9):
-            rows = [r for r in range(9) if g[r][c] == 0 and v in cands[r][c]]
-            if len(rows) == 2:
-                key = tuple(rows)
-                if key not in col_positions:
-                    col_positions[key] = []
-                col_positions[key].append(c)
-        
-        for rows, cols in col_positions.items():
-            if len(cols) == 2:
-                # 找到X-Wing，从这两行的其他列中排除该数字
+                    steps.append(f"{name}: digit {v} in {kind} {[x+1 for x in found]} {other} {[k+1 for k in cross]}")
+                    return True, level
+    return False, 0
+
+def apply_xwing(g, cands, steps, houses=-1, digits=-1):
+    """X-Wing 模式 - 在两行（或两列）中，某个数字只能出现在相同的两列（或两行）中"""
+    return _fish(cands, steps, digits, 2, "X-Wing", 6)
+
+def apply_swordfish(g, cands, steps, houses=-1, digits=-1):
+    """Swordfish 模式 - X-Wing的扩展，涉及三行三列"""
+    return _fish(cands, steps, digits, 3, "Swordfish", 7)
+
+def apply_xywing(g, cands, steps, houses=-1, digits=-1):
+    """XY-Wing 模式 - pincers 只在 pivot 的同行、同列里找"""
+    shape = cands.shape
+    n = shape.n
+    cells = cands.cells
+    # 寻找pivot点（有两个候选数字的格子）
+    for p, pivot in enumerate(cells):
+        if pivot.bit_count() != 2:
+            continue
+        r, c = divmod(p, n)
+        # pivot 和 pincers 都在第 r 行或第 c 列，这两个单元都没变化时不会出现新的 XY-Wing
+        if not (houses >> r & 1 or houses >> (n + c) & 1):
+            continue
+        # 寻找pincers（与pivot共享一行或一列，且有两个候选数字、恰好共享一个候选），先同行后同列
+        pincers = [i for i in shape.houses[r] + shape.houses[n + c]
+                   if i != p and cells[i].bit_count() == 2 and (cells[i] & pivot).bit_count() == 1]
+        for x, a in enumerate(pincers):
+            for b in pincers[x + 1:]:
+                common1 = pivot & cells[a]
+                common2 = pivot & cells[b]
+                if common1 == common2:
+                    continue
+                remaining = cells[a] & ~common1
+                if remaining != cells[b] & ~common2:
+                    continue
+                # 从能同时看到两个pincers的格子中排除（只看同行同列）
+                (r1, c1), (r2, c2) = divmod(a, n), divmod(b, n)
                 eliminated = False
-                for c in range(9):
-                    if c not in cols:
-                        for r in rows:
-                            if g[r][c] == 0 and v in cands[r][c]:
-                                cands[r][c].remove(v)
-                                eliminated = True
+                for i in range(shape.size):
+                    rr, cc = divmod(i, n)
+                    if ((rr == r1 or cc == c1) and (rr == r2 or cc == c2) and i not in (p, a, b)
+                            and cands.remove_cell(i, remaining)):
+                        eliminated = True
                 if eliminated:
-                    steps.append(f"X-Wing: digit {v} in cols {[c+1 for c in cols]} rows {[r+1 for r in rows]}")
-                    return True, 6
-    
+                    steps.append(f"XY-Wing: pivot ({r+1},{c+1}), pincers ({r1+1},{c1+1}) ({r2+1},{c2+1})")
+                    return True, 8
     return False, 0
 
-def apply_swordfish(g, cands, steps):
-    """Swordfish 模式 - X-Wing的扩展，涉及三行三列"""
-    # 检查行中的Swordfish
-    for v in range(1, 10):
-        row_positions = {}
-        for r in range(9):
-            cols = [c for c in range(9) if g[r][c] == 0 and v in cands[r][c]]
-            if 2 <= len(cols) <= 3:
-                key = tuple(sorted(cols))
-                if key not in row_positions:
-                    row_positions[key] = []
-                row_positions[key].append(r)
-        
-        # 寻找三行三列的组合
-        for cols, rows in row_positions.items():
-            if len(rows) == 3 and len(cols) == 3:
-                # 验证这确实形成Swordfish（每行最多在这三列中有候选数字）
-                valid_swordfish = True
-                for r in rows:
-                    row_cols = [c for c in range(9) if g[r][c] == 0 and v in cands[r][c]]
-                    if not set(row_cols).issubset(set(cols)):
-                        valid_swordfish = False
-                        break
-                
-                if valid_swordfish:
-                    # 从这三列的其他行中排除该数字
-                    eliminated = False
-                    for r in range(9):
-                        if r not in rows:
-                            for c in cols:
-                                if g[r][c] == 0 and v in cands[r][c]:
-                                    cands[r][c].remove(v)
-                                    eliminated = True
-                    if eliminated:
-                        steps.append(f"Swordfish: digit {v} in rows {[r+1 for r in rows]} cols {[c+1 for c in cols]}")
-                        return True, 7
-    
-    # 检查列中的Swordfish
-    for v in range(1, 10):
-        col_positions = {}
-        for c in range(9):
-            rows = [r for r in range(9) if g[r][c] == 0 and v in cands[r][c]]
-            if 2 <= len(rows) <= 3:
-                key = tuple(sorted(rows))
-                if key not in col_positions:
-                    col_positions[key] = []
-                col_positions[key].append(c)
-        
-        # 寻找三列三行的组合
-        for rows, cols in col_positions.items():
-            if len(cols) == 3 and len(rows) == 3:
-                # 验证这确实形成Swordfish
-                valid_swordfish = True
-                for c in cols:
-                    col_rows = [r for r in range(9) if g[r][c] == 0 and v in cands[r][c]]
-                    if not set(col_rows).issubset(set(rows)):
-                        valid_swordfish = False
-                        break
-                
-                if valid_swordfish:
-                    # 从这三行的其他列中排除该数字
-                    eliminated = False
-                    for c in range(9):
-                        if c not in cols:
-                            for r in rows:
-                                if g[r][c] == 0 and v in cands[r][c]:
-                                    cands[r][c].remove(v)
-                                    eliminated = True
-                    if eliminated:
-                        steps.append(f"Swordfish: digit {v} in cols {[c+1 for c in cols]} rows {[r+1 for r in rows]}")
-                        return True, 7
-    
+def apply_xyzwing(g, cands, steps, houses=-1, digits=-1):
+    """XYZ-Wing 模式 - pivot 有三个候选 xyz，两个能看到它的双值格 xz、yz，三者都能看到的格子可以排除 z"""
+    shape = cands.shape
+    n = shape.n
+    cells = cands.cells
+    peer_bits = shape.peer_bits
+    for p, pivot in enumerate(cells):
+        if pivot.bit_count() != 3 or not shape.house_bits[p] & houses:
+            continue
+        wings = [i for i in shape.peers[p] if cells[i].bit_count() == 2 and cells[i] & ~pivot == 0]
+        for a, b in combinations(wings, 2):
+            if cells[a] == cells[b] or cells[a] | cells[b] != pivot:
+                continue
+            z = cells[a] & cells[b]
+            eliminated = False
+            for i in _bit_cells(peer_bits[p] & peer_bits[a] & peer_bits[b]):
+                if cands.remove_cell(i, z):
+                    eliminated = True
+            if eliminated:
+                steps.append(f"XYZ-Wing: pivot {_rc(n, p)}, pincers {_rc(n, a)} {_rc(n, b)}, digit {_lowest_digit(z)}")
+                return True, 9
     return False, 0
 
-def apply_xywing(g, cands, steps):
-    """XY-Wing 模式"""
-    # 寻找pivot点（有两个候选数字的格子）
-    for r in range(9):
-        for c in range(9):
-            if g[r][c] == 0 and len(cands[r][c]) == 2:
-                pivot_cands = set(cands[r][c])
-                # 寻找pincers（与pivot共享一行或一列，且有两个候选数字）
-                pincers = []
-                
-                # 同行的pincers
-                for c2 in range(9):
-                    if c2 != c and g[r][c2] == 0 and len(cands[r][c2]) == 2:
-                        if len(set(cands[r][c2]).intersection(pivot_cands)) == 1:
-                            pincers.append((r, c2, set(cands[r][c2])))
-                
-                # 同列的pincers
-                for r2 in range(9):
-                    if r2 != r and g[r2][c] == 0 and len(cands[r2][c]) == 2:
-                        if len(set(cands[r2][c]).intersection(pivot_cands)) == 1:
-                            pincers.append((r2, c, set(cands[r2][c])))
-                
-                # 检查是否形成XY-Wing
-                for i, (r1, c1, cands1) in enumerate(pincers):
-                    for j, (r2, c2, cands2) in enumerate(pincers[i+1:], i+1):
-                        common_with_pivot1 = pivot_cands.intersection(cands1)
-                        common_with_pivot2 = pivot_cands.intersection(cands2)
-                        
-                        if (len(common_with_pivot1) == 1 and len(common_with_pivot2) == 1 and 
-                            common_with_pivot1 != common_with_pivot2):
-                            # 找到了XY-Wing
-                            remaining1 = cands1 - common_with_pivot1
-                            remaining2 = cands2 - common_with_pivot2
-                            
-                            if remaining1 == remaining2 and len(remaining1) == 1:
-                                target_digit = list(remaining1)[0]
-                                # 从能同时看到两个pincers的格子中排除target_digit
-                                eliminated = False
-                                for rr in range(9):
-                                    for cc in range(9):
-                                        if (g[rr][cc] == 0 and target_digit in cands[rr][cc] and
-                                            ((rr == r1 or cc == c1) and (rr == r2 or cc == c2)) and
-                                            (rr, cc) not in [(r, c), (r1, c1), (r2, c2)]):
-                                            cands[rr][cc].remove(target_digit)
-                                            eliminated = True
-                                
-                                if eliminated:
-                                    steps.append(f"XY-Wing: pivot ({r+1},{c+1}), pincers ({r1+1},{c1+1}) ({r2+1},{c2+1})")
-                                    return True, 8
-    
+def apply_unique_rectangle(g, cands, steps, houses=-1, digits=-1):
+    """唯一矩形（类型 1）- 跨两个宫的矩形中三个角是同一对候选 ab，第四个角不能是 a 或 b（依赖唯一解）"""
+    shape = cands.shape
+    n = shape.n
+    cells = cands.cells
+    for r1, r2 in combinations(range(n), 2):
+        if not (houses >> r1 & 1 or houses >> r2 & 1):
+            continue
+        same_band = r1 // shape.box_rows == r2 // shape.box_rows
+        for c1, c2 in combinations(range(n), 2):
+            # 只能跨两个宫：两行同一行带或两列同一列带，但不能同时满足
+            if same_band == (c1 // shape.box_cols == c2 // shape.box_cols):
+                continue
+            corners = [r1*n+c1, r1*n+c2, r2*n+c1, r2*n+c2]
+            pairs = [i for i in corners if cells[i].bit_count() == 2]
+            if len(pairs) != 3:
+                continue
+            ab = cells[pairs[0]]
+            if cells[pairs[1]] != ab or cells[pairs[2]] != ab:
+                continue
+            extra = next(i for i in corners if i not in pairs)
+            if cells[extra] & ab != ab:
+                continue
+            if cands.remove_cell(extra, ab):
+                steps.append(f"Unique Rectangle: rows {[r1+1, r2+1]} cols {[c1+1, c2+1]} = {_digits(ab)}, eliminates from {_rc(n, extra)}")
+                return True, 10
     return False, 0
 
-def apply_simple_coloring(g, cands, steps):
-    """简单着色法"""
-    for v in range(1, 10):
+def apply_simple_coloring(g, cands, steps, houses=-1, digits=-1):
+    """简单着色法 - 沿强链接（单元内只有两个位置）把候选交替染成两色"""
+    shape = cands.shape
+    n = shape.n
+    cells = cands.cells
+    peer_bits = shape.peer_bits
+    for v in range(1, n + 1):
+        bit = 1 << (v - 1)
+        if not digits & bit:
+            continue
         # 找到所有只有两个候选位置的单元（强链接）
-        strong_links = []
-        
-        # 检查行
-        for r in range(9):
-            positions = [c for c in range(9) if g[r][c] == 0 and v in cands[r][c]]
+        links = {}
+        for house in shape.houses:
+            positions = [i for i in house if cells[i] & bit]
             if len(positions) == 2:
-                strong_links.append(((r, positions[0]), (r, positions[1])))
-        
-        # 检查列
-        for c in range(9):
-            positions = [r for r in range(9) if g[r][c] == 0 and v in cands[r][c]]
-            if len(positions) == 2:
-                strong_links.append(((positions[0], c), (positions[1], c)))
-        
-        # 检查宫格
-        for box_r in range(3):
-            for box_c in range(3):
-                positions = []
-                for r in range(box_r*3, box_r*3+3):
-                    for c in range(box_c*3, box_c*3+3):
-                        if g[r][c] == 0 and v in cands[r][c]:
-                            positions.append((r, c))
-                if len(positions) == 2:
-                    strong_links.append((positions[0], positions[1]))
-        
-        if strong_links:
-            # 构建着色图并寻找矛盾
-            # 这里给出简化实现
-            pass
-    
+                a, b = positions
+                links.setdefault(a, set()).add(b)
+                links.setdefault(b, set()).add(a)
+
+        seen = set()
+        for start in sorted(links):
+            if start in seen:
+                continue
+            # 给这个连通分量染色
+            color = {start: 0}
+            queue = [start]
+            while queue:
+                i = queue.pop()
+                for j in links[i]:
+                    if j not in color:
+                        color[j] = 1 - color[i]
+                        queue.append(j)
+            seen.update(color)
+            groups = [[i for i in color if color[i] == k] for k in (0, 1)]
+            if len(color) < 3:
+                continue
+
+            # 同色的两个格子互相能看到：这个颜色全部为假
+            for k in (0, 1):
+                bits = sum(1 << i for i in groups[k])
+                if any(peer_bits[i] & bits for i in groups[k]):
+                    for i in groups[k]:
+                        cands.remove_cell(i, bit)
+                    steps.append(f"Simple Coloring (wrap): digit {v}, color of {_rc(n, min(groups[k]))} is false")
+                    return True, 11
+
+            # 能同时看到两种颜色的其他格子可以排除 v
+            see0 = 0
+            for i in groups[0]:
+                see0 |= peer_bits[i]
+            see1 = 0
+            for i in groups[1]:
+                see1 |= peer_bits[i]
+            eliminated = []
+            for i in _bit_cells(see0 & see1):
+                if i not in color and cands.remove_cell(i, bit):
+                    eliminated.append(i)
+            if eliminated:
+                cells_str = " ".join(_rc(n, i) for i in eliminated)
+                steps.append(f"Simple Coloring (trap): digit {v} eliminates from {cells_str}")
+                return True, 11
+
     return False, 0
 
+# ===== 增量扫描 =====
+
+class HouseScanCache:
+    """
+    增量模式下缓存每个单元的唯一数扫描结果，只重扫变化过的单元
+    naked[r]: 第 r 行第一个只剩一个候选的格子下标（没有则为 -1）
+    hidden[h]: 第 h 个单元中只出现一次的候选数字掩码
+    """
+
+    __slots__ = ("shape", "naked", "hidden")
+
+    def __init__(self, shape: Shape = SHAPE):
+        self.shape = shape
+        self.naked = [-1] * shape.n
+        self.hidden = [0] * (3 * shape.n)
+
+    def refresh(self, g: Grid, cands: Candidates, dirty: int) -> int:
+        """重扫 dirty 中的单元，返回第一个无候选的空格下标（没有则为 -1）"""
+        cells = cands.cells
+        n = self.shape.n
+        empty_cell = -1
+        while dirty:
+            h = (dirty & -dirty).bit_length() - 1
+            dirty &= dirty - 1
+            house = self.shape.houses[h]
+            self.hidden[h] = _single_positions([cells[i] for i in house])
+            if h < n:
+                self.naked[h] = next((i for i in house if cells[i] and not cells[i] & (cells[i] - 1)), -1)
+                if empty_cell == -1:
+                    empty_cell = next((i for i in house if cells[i] == 0 and g[h][i % n] == 0), -1)
+        return empty_cell
+
+def _incremental_strategies(cache: HouseScanCache):
+    """唯一数改为查缓存，其余技巧保持不变"""
+
+    def naked_single(g, cands, steps, houses=-1, digits=-1):
+        for i in cache.naked:
+            if i >= 0:
+                return _place_naked_single(g, cands, i, steps)
+        return False, 0
+
+    def hidden_single(g, cands, steps, houses=-1, digits=-1):
+        for h, single in enumerate(cache.hidden):
+            if single:
+                return _place_hidden_single(g, cands, h, single, steps)
+        return False, 0
+
+    return [naked_single, hidden_single] + STRATEGIES[2:]
+
 # ===== 主求解器 =====
-def solve_with_logic(grid: Grid):
-    """使用逻辑技巧求解数独"""
+
+STRATEGIES = [
+    apply_naked_single,         # 1 - 唯一候选数
+    apply_hidden_single,        # 2 - 隐性唯一数
+    apply_naked_pair,           # 3 - 裸对数
+    apply_hidden_pair,          # 4 - 隐性对数
+    apply_pointing_pair,        # 4 - 指向对数
+    apply_box_line_reduction,   # 4 - 宫格排除
+    apply_naked_triple,         # 5 - 裸三数组
+    apply_xwing,               # 6 - X-Wing
+    apply_swordfish,           # 7 - 剑鱼
+    apply_xywing,              # 8 - XY-Wing
+    apply_xyzwing,              # 9 - XYZ-Wing
+    apply_unique_rectangle,     # 10 - 唯一矩形
+    apply_simple_coloring,      # 11 - 简单着色法
+]
+
+STRATEGY_NAMES = [strat.__name__ for strat in STRATEGIES]
+# 评分器版本：任何技巧的判定、扫描顺序或 steps 文本有改动（结果可能不同）时手动加一，
+# 持久化的评分结果（cache.py 的文件层）靠它失效
+GRADER_VERSION = 1
+STRATEGY_LEVELS = [1, 2, 3, 4, 4, 4, 5, 6, 7, 8, 9, 10, 11]
+
+def _strategy_count(max_level: Optional[int]) -> int:
+    """等级不超过 max_level 的技巧个数（STRATEGIES 按等级排好序）"""
+    if max_level is None:
+        return len(STRATEGIES)
+    return sum(1 for lv in STRATEGY_LEVELS if lv <= max_level)
+
+def _find_empty_cell(g: Grid, cands: Candidates) -> int:
+    """第一个没有候选数字的空格下标（没有则为 -1）"""
+    n = cands.shape.n
+    for i, m in enumerate(cands.cells):
+        if m == 0 and g[i // n][i % n] == 0:
+            return i
+    return -1
+
+def _stats_entry(stats: dict, name: str) -> dict:
+    entry = stats.get(name)
+    if entry is None:
+        entry = stats[name] = {"calls": 0, "skipped": 0, "hits": 0, "time": 0.0}
+    return entry
+
+def solve_with_logic(grid: Grid, incremental: bool = False, stats: Optional[dict] = None,
+                     max_level: Optional[int] = None):
+    """
+    使用逻辑技巧求解数独，候选数状态在各轮之间保留（前一轮的消除结果继续有效）
+    盘面尺寸按 grid 的行数取（见 get_shape），9x9 以外的盘面由 variant.py 解析和生成
+    incremental: 增量调度，难度等级和 steps 与默认模式完全一致：
+        - 唯一数和无候选检查只重扫变化过的单元
+        - 每个技巧记下上次失败之后有变化的单元和数字，没有变化就跳过，有变化只扫这部分
+          （技巧失败后只有它读到的候选变了才可能成功，按原顺序只扫变化部分找到的第一处与全扫相同）
+    stats: 传入 dict 时按技巧名记录 {"calls", "skipped", "hits", "time"}（耗时单位秒）
+    max_level: 只用等级不超过它的技巧。能在这个等级内解出的题结果与不限制时完全一样
+        （更高的技巧只在低级技巧全部失败时才会被调用），需要更高技巧的题会提前停下、返回未解出
+    """
     g = [row[:] for row in grid]
     steps = []
     hardest = 0
-    max_iterations = 1000  # 防止无限循环
-    iteration = 0
     
-    strategies = [
-        apply_naked_single,         # 1 - 唯一候选数
-        apply_hidden_single,        # 2 - 隐性唯一数
-        apply_naked_pair,           # 3 - 裸对数
-        #apply_hidden_pair,          # 4 - 隐性对数
-        apply_pointing_pair,        # 4 - 指向对数
-        apply_box_line_reduction,   # 4 - 宫格排除
-        apply_naked_triple,         # 5 - 裸三数组
-        apply_xwing,               # 6 - X-Wing
-        apply_swordfish,           # 7 - 剑鱼
-        apply_xywing,              # 8 - XY-Wing
-        #apply_xyzw,                # 9 - XYZ-Wing
-        #apply_unique_rectangle,     # 10 - 唯一矩形
-        apply_simple_coloring,      # 11 - 简单着色法
-    ]
+    cands = get_candidate_masks(g)
+    shape = cands.shape
+    max_iterations = max(1000, shape.size * 10)  # 防止无限循环
+    if incremental:
+        cache = HouseScanCache(shape)
+        strategies = _incremental_strategies(cache)
+        pending_houses = [0] * len(strategies)
+        pending_digits = [0] * len(strategies)
+    else:
+        strategies = STRATEGIES
+    strategies = strategies[:_strategy_count(max_level)]
     
-    while iteration < max_iterations:
-        iteration += 1
-        
+    for _ in range(max_iterations):
         # 检查是否已完成
-        if all(all(cell != 0 for cell in row) for row in g):
+        if cands.filled == shape.size:
             return True, hardest, steps
         
-        # 重新计算候选数字
-        cands = get_candidates(g)
-        
         # 检查是否有空格没有候选数字（无解）
-        for r in range(9):
-            for c in range(9):
-                if g[r][c] == 0 and len(cands[r][c]) == 0:
-                    return False, hardest, steps + [f"No solution: cell ({r+1},{c+1}) has no candidates"]
+        if incremental:
+            houses, digits = cands.take_dirty()
+            for k in range(len(strategies)):
+                pending_houses[k] |= houses
+                pending_digits[k] |= digits
+            empty_cell = cache.refresh(g, cands, houses)
+        else:
+            empty_cell = _find_empty_cell(g, cands)
+        if empty_cell >= 0:
+            return False, hardest, steps + [f"No solution: cell {_rc(shape.n, empty_cell)} has no candidates"]
         
         # 尝试应用策略
         progress_made = False
-        for strat in strategies:
-            changed, level = strat(g, cands, steps)
+        for k, strat in enumerate(strategies):
+            entry = None if stats is None else _stats_entry(stats, STRATEGY_NAMES[k])
+            if incremental:
+                if not pending_houses[k]:
+                    if entry:
+                        entry["skipped"] += 1
+                    continue
+                start = time.perf_counter() if entry else 0.0
+                changed, level = strat(g, cands, steps, pending_houses[k], pending_digits[k])
+                if not changed:
+                    # 已全部扫过，下次只需看之后的变化
+                    pending_houses[k] = pending_digits[k] = 0
+            else:
+                start = time.perf_counter() if entry else 0.0
+                changed, level = strat(g, cands, steps)
+            if entry:
+                entry["calls"] += 1
+                entry["hits"] += changed
+                entry["time"] += time.perf_counter() - start
             if changed:
                 hardest = max(hardest, level)
                 progress_made = True
@@ -537,8 +830,35 @@ def solve_with_logic(grid: Grid):
             break
     
     # 检查是否完成
-    completed = all(all(cell != 0 for cell in row) for row in g)
-    return completed, hardest, steps
+    return cands.filled == shape.size, hardest, steps
+
+def solve_with_stats(grid: Grid, incremental: bool = True):
+    """求解并返回 (solved, level, steps, stats)，stats 见 solve_with_logic"""
+    stats = {}
+    solved, level, steps = solve_with_logic(grid, incremental=incremental, stats=stats)
+    return solved, level, steps, stats
+
+def collect_strategy_stats(puzzles: List[Grid], incremental: bool = True) -> dict:
+    """对一批题目累计各技巧的调用统计"""
+    stats = {}
+    for puzzle in puzzles:
+        solve_with_logic(puzzle, incremental=incremental, stats=stats)
+    return stats
+
+def print_strategy_report(stats: dict):
+    """按技巧顺序打印调用次数、跳过次数、命中率和耗时占比"""
+    total_time = sum(entry["time"] for entry in stats.values()) or 1e-12
+    print(f"{'Strategy':<26}{'calls':>8}{'skipped':>9}{'hits':>8}{'hit%':>8}"
+          f"{'time(ms)':>11}{'share':>8}{'us/call':>9}")
+    for name in STRATEGY_NAMES:
+        entry = stats.get(name)
+        if entry is None:
+            continue
+        calls = entry["calls"]
+        hit_rate = entry["hits"] / calls * 100 if calls else 0.0
+        per_call = entry["time"] / calls * 1e6 if calls else 0.0
+        print(f"{name:<26}{calls:>8}{entry['skipped']:>9}{entry['hits']:>8}{hit_rate:>7.1f}%"
+              f"{entry['time'] * 1000:>11.2f}{entry['time'] / total_time * 100:>7.1f}%{per_call:>9.1f}")
 
 def difficulty_label(level: int) -> str:
     """根据技巧等级返回难度标签"""
@@ -608,6 +928,43 @@ def get_puzzle_statistics(grid: Grid) -> dict:
         'max_box_filled': max(box_counts),
     }
 
+def technique_counts(steps: List[str]) -> dict:
+    """统计每种技巧的使用次数（按步骤冒号前的名称）"""
+    counts = {}
+    for step in steps:
+        technique = step.split(':')[0]
+        counts[technique] = counts.get(technique, 0) + 1
+    return counts
+
+# 技巧掩码的位顺序，只能在末尾追加，已存盘的掩码依赖这个顺序
+TECHNIQUE_NAMES = [
+    "Naked Single",
+    "Hidden Single",
+    "Naked Pair",
+    "Pointing Pair",
+    "Box-Line Reduction",
+    "Naked Triple",
+    "X-Wing",
+    "Swordfish",
+    "XY-Wing",
+    "Simple Coloring",
+    "Hidden Pair",
+    "XYZ-Wing",
+    "Unique Rectangle",
+]
+
+def technique_mask(steps: List[str]) -> int:
+    """把用到的技巧压成位掩码，位序见 TECHNIQUE_NAMES"""
+    mask = 0
+    for step in steps:
+        name = step.split(':')[0].split(' (')[0]
+        if name in TECHNIQUE_NAMES:
+            mask |= 1 << TECHNIQUE_NAMES.index(name)
+    return mask
+
+def technique_names(mask: int) -> List[str]:
+    return [name for i, name in enumerate(TECHNIQUE_NAMES) if mask >> i & 1]
+
 def print_detailed_analysis(puzzle, solved, level, steps, final_grid=None):
     """打印详细的分析结果"""
     stats = get_puzzle_statistics(puzzle)
@@ -623,14 +980,8 @@ def print_detailed_analysis(puzzle, solved, level, steps, final_grid=None):
     print(f"🔧 使用步骤数: {len(steps)}")
     
     if steps:
-        # 统计使用的技巧
-        technique_counts = {}
-        for step in steps:
-            technique = step.split(':')[0]
-            technique_counts[technique] = technique_counts.get(technique, 0) + 1
-        
         print(f"\n🛠️  使用的技巧:")
-        for technique, count in sorted(technique_counts.items()):
+        for technique, count in sorted(technique_counts(steps).items()):
             print(f"   {technique}: {count}次")
         
         print(f"\n📝 详细步骤 (前15步):")
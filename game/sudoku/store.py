@@ -0,0 +1,139 @@
+# sudoku/store.py
+# 定长二进制题库：每条记录 80 字节，可 mmap 后按下标随机访问
+#
+# 文件头 16 字节: magic(4s) version(H) record_size(H) count(Q)
+# 记录 80 字节:   puzzle(9I) solution(9I) level(B) clues(B) 填充(2x) techniques(I)
+# puzzle/solution 用 convert.py 的编码：每行一个整数，9 位十进制数字对应 9 个格子
+
+import mmap
+import struct
+from collections import namedtuple
+from typing import Iterator, Optional
+
+from convert import decode_grid, encode_grid
+from generate import generate_sudoku
+from scorer import Grid, parse_sudoku_line, solve_with_logic, technique_mask
+
+MAGIC = b"SDKB"
+VERSION = 1
+HEADER = struct.Struct("<4sHHQ")
+RECORD = struct.Struct("<9I9IBBxxI")
+
+PuzzleRecord = namedtuple("PuzzleRecord", ["puzzle", "solution", "level", "clues", "techniques"])
+
+
+class PuzzleStoreWriter:
+    """顺序写入题库，关闭时回填记录数"""
+
+    def __init__(self, filename: str):
+        self.f = open(filename, "wb")
+        self.count = 0
+        self.f.write(HEADER.pack(MAGIC, VERSION, RECORD.size, 0))
+
+    def add(self, puzzle: Grid, solution: Optional[Grid] = None, level: int = 0, techniques: int = 0):
+        """追加一条记录，solution 未知时存全 0"""
+        clues = sum(1 for row in puzzle for v in row if v)
+        sol = encode_grid(solution) if solution else [0] * 9
+        self.f.write(RECORD.pack(*encode_grid(puzzle), *sol, level, clues, techniques))
+        self.count += 1
+
+    def close(self):
+        if self.f.closed:
+            return
+        self.f.seek(0)
+        self.f.write(HEADER.pack(MAGIC, VERSION, RECORD.size, self.count))
+        self.f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class PuzzleStore:
+    """只读题库，mmap 映射整个文件，记录按需解码"""
+
+    def __init__(self, filename: str):
+        self.f = open(filename, "rb")
+        self.mm = mmap.mmap(self.f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, record_size, count = HEADER.unpack_from(self.mm, 0)
+        if magic != MAGIC:
+            raise ValueError(f"不是数独题库文件: {filename}")
+        if version != VERSION or record_size != RECORD.size:
+            raise ValueError(f"不支持的题库版本: {version}")
+        self.count = count
+
+    def __len__(self) -> int:
+        return self.count
+
+    def raw(self, index: int) -> tuple:
+        """返回未解码的记录：18 个行编码整数 + level, clues, techniques"""
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError(index)
+        return RECORD.unpack_from(self.mm, HEADER.size + index * RECORD.size)
+
+    def __getitem__(self, index: int) -> PuzzleRecord:
+        fields = self.raw(index)
+        solution = decode_grid(fields[9:18]) if any(fields[9:18]) else None
+        return PuzzleRecord(decode_grid(fields[:9]), solution, fields[18], fields[19], fields[20])
+
+    def puzzle(self, index: int) -> Grid:
+        return decode_grid(self.raw(index)[:9])
+
+    def __iter__(self) -> Iterator[PuzzleRecord]:
+        for i in range(self.count):
+            yield self[i]
+
+    def close(self):
+        self.mm.close()
+        self.f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def grade_record(puzzle: Grid) -> tuple:
+    """评分一道题，返回 (level, techniques)"""
+    _, level, steps = solve_with_logic(puzzle, incremental=True)
+    return level, technique_mask(steps)
+
+
+def write_generated(filename: str, count: int, clues: int = 30, symmetric: bool = False,
+                    seed: Optional[int] = None, grade: bool = True) -> int:
+    """用 generate_sudoku 生成 count 道题写入题库，grade 为 True 时同时写入难度和技巧掩码"""
+    with PuzzleStoreWriter(filename) as writer:
+        for i in range(count):
+            puzzle, solution = generate_sudoku(clues=clues, symmetric=symmetric,
+                                               seed=None if seed is None else seed + i)
+            level, techniques = grade_record(puzzle) if grade else (0, 0)
+            writer.add(puzzle, solution, level, techniques)
+        return writer.count
+
+
+def convert_text_file(src: str, dst: str, grade: bool = False) -> int:
+    """把分号格式的文本题库转成二进制题库（文本里没有解，solution 存全 0）"""
+    with open(src, "r", encoding="utf-8") as f, PuzzleStoreWriter(dst) as writer:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            puzzle = parse_sudoku_line(line)
+            level, techniques = grade_record(puzzle) if grade else (0, 0)
+            writer.add(puzzle, None, level, techniques)
+        return writer.count
+
+
+if __name__ == "__main__":
+    from scorer import difficulty_label, technique_names
+
+    n = convert_text_file("puzzle.txt", "puzzle.bin", grade=True)
+    with PuzzleStore("puzzle.bin") as store:
+        print(f"{n} 道题, 文件 {len(store.mm)} 字节")
+        rec = store[42]
+        print(rec.puzzle[0], rec.clues, difficulty_label(rec.level), technique_names(rec.techniques))
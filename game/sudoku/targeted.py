@@ -0,0 +1,148 @@
+# sudoku/targeted.py
+# 按难度定向生成：挖空时每挖掉一格就评一次分，
+# 难度超出目标档位（或逻辑技巧解不出）则把这一格填回去（回溯）换下一个位置，落进档位即停止
+#
+# 评分只用不超过档位上限的技巧（solve_with_logic 的 max_level），需要更高技巧的题不再去跑高级技巧；
+# 多解的题先用 count_solutions 筛掉（比逻辑求解卡住再扫一遍所有技巧便宜得多）
+#
+# 沿用上一次的评分：求解器总是先填唯一候选数，唯一候选数填到不动点的结果与填的顺序无关。
+# 新题只靠唯一候选数就能把挖掉的格子填回去时，它的不动点包含原题、也就和原题的不动点相同，
+# 之后两边的求解过程完全一样，所以新题的结果就是 (原题的结果, max(原等级, 1))，不用重新评分
+#
+#   python targeted.py Hard 10
+
+import random
+import sys
+from typing import List, Optional, Tuple
+
+from generate import Grid, count_solutions, generate_full_grid, grid_to_string
+from scorer import PEERS, Candidates, difficulty_label, solve_with_logic
+
+MAX_LEVEL = 11
+# 各难度最多保留的数字个数，参考 generate.py 开头的经验范围
+MAX_CLUES = {"Easy": 45, "Medium": 35, "Hard": 30, "Expert": 27, "Master": 25}
+
+
+def level_band(label: str) -> Tuple[int, int]:
+    """difficulty_label 对应的技巧等级闭区间"""
+    levels = [lv for lv in range(MAX_LEVEL + 1) if difficulty_label(lv) == label]
+    if not levels:
+        raise ValueError(f"未知难度: {label}")
+    return levels[0], levels[-1]
+
+
+def grade(puzzle: Grid, max_level: Optional[int] = None) -> Tuple[bool, int]:
+    solved, level, _ = solve_with_logic(puzzle, incremental=True, max_level=max_level)
+    return solved, level
+
+
+def _filled_by_naked_singles(puzzle: Grid, cells: List[Tuple[int, int]]) -> bool:
+    """只填唯一候选数能否把 cells 全部填上"""
+    cands = Candidates(puzzle)
+    masks = cands.cells
+    left = {r * 9 + c for r, c in cells}
+    stack = [i for i, m in enumerate(masks) if m and not m & (m - 1)]
+    while stack:
+        i = stack.pop()
+        m = masks[i]
+        if not m:
+            continue    # 已经填过
+        cands.place(i // 9, i % 9, m.bit_length())
+        left.discard(i)
+        if not left:
+            return True
+        for j in PEERS[i]:
+            m = masks[j]
+            if m and not m & (m - 1):
+                stack.append(j)
+    return False
+
+
+def _unique_in_band(puzzle: Grid, hi: int) -> Tuple[bool, int]:
+    """(是否唯一解且用不超过 hi 的技巧逻辑解出, 等级)"""
+    if count_solutions(puzzle, limit=2) != 1:
+        return False, 0
+    return grade(puzzle, max_level=hi)
+
+
+def dig_for_band(full: Grid, band: Tuple[int, int], min_clues: int = 17, max_clues: int = 81,
+                 symmetric: bool = False, rng=None) -> Optional[Tuple[Grid, int]]:
+    """
+    从完整解盘挖空，直到评分落入 band 且保留数字不超过 max_clues，返回 (puzzle, level)；
+    挖完所有位置仍未达到则返回 None。逻辑技巧解不出的题算作超出档位，返回的题一定能逻辑解出
+    """
+    rng = rng or random
+    lo, hi = band
+    puzzle = [row[:] for row in full]
+    positions = [(r, c) for r in range(9) for c in range(9)]
+    rng.shuffle(positions)
+    clues = 81
+    level = 0   # 当前 puzzle 的等级，它一直是唯一解、逻辑可解的
+
+    for (r, c) in positions:
+        if clues <= min_clues:
+            break
+        if puzzle[r][c] == 0:
+            continue
+        removed: List[Tuple[int, int]] = [(r, c)]
+        sr, sc = 8 - r, 8 - c
+        if symmetric and (sr, sc) != (r, c) and puzzle[sr][sc] != 0:
+            removed.append((sr, sc))
+        if clues - len(removed) < min_clues:
+            continue    # 对称的一对会挖到 min_clues 以下，换下一个位置
+        for (i, j) in removed:
+            puzzle[i][j] = 0
+
+        if _filled_by_naked_singles(puzzle, removed):
+            ok, new_level = True, max(level, 1)
+        else:
+            ok, new_level = _unique_in_band(puzzle, hi)
+        if ok and new_level > hi:
+            ok = False
+        if not ok:
+            # 多解、超出目标档位或解不出，回溯
+            for (i, j) in removed:
+                puzzle[i][j] = full[i][j]
+            continue
+
+        level = new_level
+        clues -= len(removed)
+        if level >= lo and clues <= max_clues:
+            return puzzle, level
+
+    return None
+
+
+def generate_targeted(label: str, min_clues: int = 17, max_clues: Optional[int] = None, symmetric: bool = False,
+                      seed: Optional[int] = None, rng=None, max_attempts: int = 50):
+    """
+    生成难度标签为 label 的题目，返回 (puzzle, solution, level, attempts)，
+    max_clues 默认取 MAX_CLUES[label]；
+    attempts 是用掉的完整解盘数；max_attempts 次都没挖到目标档位时返回 None
+    """
+    rng = rng or random
+    if seed is not None:
+        rng.seed(seed)
+    band = level_band(label)
+    if max_clues is None:
+        max_clues = MAX_CLUES[label]
+    for attempt in range(1, max_attempts + 1):
+        full = [[0] * 9 for _ in range(9)]
+        generate_full_grid(full, rng)
+        result = dig_for_band(full, band, min_clues, max_clues, symmetric, rng)
+        if result:
+            puzzle, level = result
+            return puzzle, full, level, attempt
+    return None
+
+
+if __name__ == "__main__":
+    label = sys.argv[1] if len(sys.argv) > 1 else "Medium"
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    for idx in range(count):
+        result = generate_targeted(label, seed=idx)
+        if result is None:
+            print(f"# {label}: 未生成")
+            continue
+        puzzle, _, level, attempts = result
+        print(grid_to_string(puzzle), level, difficulty_label(level), attempts)
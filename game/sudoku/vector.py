@@ -0,0 +1,145 @@
+# sudoku/vector.py
+# 批量唯一数传播：N 个盘面的候选数放进一个 (N,9,9,9) 的布尔张量 cands[n, r, c, d]，
+# 所有盘面同时做唯一候选数 / 隐性唯一数。只靠唯一数解不完的盘面回退到 solve_with_logic
+#
+# 结果与 solve_with_logic 一致：
+# - 唯一候选数能填的格子集合与填写顺序无关，一次全部填入与逐个填入到达同一个不动点
+# - solve_with_logic 只在没有唯一候选数时才用隐性唯一数，这里也一样，所以等级（1 或 2）和步数相同
+# - 出现矛盾或卡住的盘面直接交给 solve_with_logic 重新评分
+
+from typing import List, Tuple
+
+import numpy as np
+
+from scorer import solve_with_logic
+
+DIGITS = np.arange(1, 10, dtype=np.int8)
+
+
+def candidate_tensor(grids: np.ndarray) -> np.ndarray:
+    """grids: (N,9,9) 整数数组，0 为空格；返回 (N,9,9,9) 候选张量"""
+    n = len(grids)
+    onehot = grids[..., None] == DIGITS
+    row_used = onehot.any(axis=2)                                       # (N,9,9) [n,r,d]
+    col_used = onehot.any(axis=1)                                       # (N,9,9) [n,c,d]
+    box_used = onehot.reshape(n, 3, 3, 3, 3, 9).any(axis=(2, 4))        # (N,3,3,9)
+    box_used = box_used.repeat(3, axis=1).repeat(3, axis=2)             # (N,9,9,9)
+    empty = (grids == 0)[..., None]
+    return empty & ~row_used[:, :, None, :] & ~col_used[:, None, :, :] & ~box_used
+
+
+def _box_sum(x: np.ndarray) -> np.ndarray:
+    """(K,9,9,9) 按宫求和并铺回每个格子，返回 (K,9,9,9)"""
+    k = len(x)
+    box = x.reshape(k, 3, 3, 3, 3, 9).sum(axis=(2, 4), dtype=np.int8)
+    return box.repeat(3, axis=1).repeat(3, axis=2)
+
+
+def _hidden_singles(cands: np.ndarray) -> np.ndarray:
+    """在行、列或宫中只剩一个位置的 (格子, 数字)"""
+    row_once = cands.sum(axis=2, dtype=np.int8) == 1                    # [k,r,d]
+    col_once = cands.sum(axis=1, dtype=np.int8) == 1                    # [k,c,d]
+    box_once = _box_sum(cands) == 1
+    return cands & (row_once[:, :, None, :] | col_once[:, None, :, :] | box_once)
+
+
+def _place(grids: np.ndarray, cands: np.ndarray, placed: np.ndarray) -> np.ndarray:
+    """
+    把 placed (K,9,9,9) 中的数字填进盘面并更新候选，返回每个盘面是否出现矛盾
+    （同一格两个数字，或同一单元同一数字填了两次）
+    """
+    per_cell = placed.sum(axis=3, dtype=np.int8)
+    row_cnt = placed.sum(axis=2, dtype=np.int8)
+    col_cnt = placed.sum(axis=1, dtype=np.int8)
+    box_cnt = _box_sum(placed)
+    conflict = ((per_cell > 1).any(axis=(1, 2)) | (row_cnt > 1).any(axis=(1, 2))
+                | (col_cnt > 1).any(axis=(1, 2)) | (box_cnt > 1).any(axis=(1, 2, 3)))
+
+    filled = per_cell > 0
+    grids += np.where(filled, placed.argmax(axis=3) + 1, 0).astype(grids.dtype)
+    cands &= ~filled[..., None]
+    cands &= ~(row_cnt > 0)[:, :, None, :]
+    cands &= ~(col_cnt > 0)[:, None, :, :]
+    cands &= ~(box_cnt > 0)
+    return conflict
+
+
+def propagate_singles(grids: np.ndarray):
+    """
+    对所有盘面做唯一数传播（原地修改 grids）
+    返回 (done, used_hidden, steps, failed)：
+    done 解完的盘面，used_hidden 用过隐性唯一数，steps 填入的格子数，failed 出现矛盾或卡住
+    """
+    n = len(grids)
+    steps = np.zeros(n, dtype=np.int32)
+    used_hidden = np.zeros(n, dtype=bool)
+    failed = np.zeros(n, dtype=bool)
+
+    # 工作集只保留还没结束的盘面，ids 是它们在输入中的下标
+    ids = np.flatnonzero((grids == 0).any(axis=(1, 2)))
+    g = grids[ids]
+    c = candidate_tensor(g)
+
+    while len(ids):
+        counts = c.sum(axis=3, dtype=np.int8)
+        dead = ((g == 0) & (counts == 0)).any(axis=(1, 2))
+        naked = c & (counts == 1)[..., None]
+        has_naked = naked.any(axis=(1, 2, 3))
+
+        # 有唯一候选数的盘面只填唯一候选数，没有的才找隐性唯一数
+        placed = naked
+        need_hidden = np.flatnonzero(~has_naked)
+        has_hidden = np.zeros(len(ids), dtype=bool)
+        if len(need_hidden):
+            hidden = _hidden_singles(c[need_hidden])
+            placed[need_hidden] = hidden
+            has_hidden[need_hidden] = hidden.any(axis=(1, 2, 3))
+
+        stuck = dead | ~(has_naked | has_hidden)
+        placed[stuck] = False
+        conflict = _place(g, c, placed)
+
+        steps[ids] += placed.sum(axis=(1, 2, 3), dtype=np.int32)
+        used_hidden[ids] |= has_hidden & ~stuck
+        failed[ids] |= stuck | conflict
+
+        finished = stuck | conflict | ~(g == 0).any(axis=(1, 2))
+        if finished.any():
+            grids[ids[finished]] = g[finished]
+            keep = ~finished
+            ids, g, c = ids[keep], g[keep], c[keep]
+
+    done = ~failed & ~(grids == 0).any(axis=(1, 2))
+    return done, used_hidden, steps, failed
+
+
+def grade_batch(puzzles) -> List[Tuple[bool, int, int]]:
+    """
+    批量评分，返回每道题的 (solved, level, 步数)，与 solve_with_logic 的结果一致
+    puzzles: 9x9 网格的列表，或 reader.iter_puzzle_blocks 产出的 (k,81) 数组
+    """
+    grids = np.array(puzzles, dtype=np.int8).reshape(-1, 9, 9)
+    done, used_hidden, steps, _ = propagate_singles(grids)
+    results = []
+    for i, puzzle in enumerate(puzzles):
+        if done[i]:
+            level = 0 if steps[i] == 0 else (2 if used_hidden[i] else 1)
+            results.append((True, level, int(steps[i])))
+        else:
+            # 需要更高级的技巧（或有矛盾），交给逐步求解器
+            if isinstance(puzzle, np.ndarray):
+                puzzle = puzzle.reshape(9, 9).tolist()
+            solved, level, trace = solve_with_logic(puzzle, incremental=True)
+            results.append((solved, level, len(trace)))
+    return results
+
+
+if __name__ == "__main__":
+    import time
+    from scorer import read_sudoku_file
+
+    puzzles = read_sudoku_file("puzzle.txt")
+    start = time.time()
+    results = grade_batch(puzzles)
+    print(f"{len(puzzles)} 道题，耗时 {time.time() - start:.3f} 秒")
+    print(f"唯一数直接解出: {sum(1 for r in results if r[0])}")